@@ -1,29 +1,312 @@
 import os
-from dotenv import load_dotenv
 import json
-import openai
-from groq import Groq
-load_dotenv()
+import hashlib
 import re
-import streamlit as st
+import time
+import logging
+import telemetry
+from app_config import get_setting, get_bool_setting
+from text_compactor import compact_resume_text, count_tokens, DEFAULT_TOKEN_BUDGET
+from rule_extractor import (
+    KNOWN_BPO_COMPANIES, NORTHEAST_STATES, RULES_VERSION, extract_contact_fields, find_fresher_reason, rule_based_verdict,
+    is_audit_sample, merge_rule_fields
+)
+from rate_limiter import call_with_retry, get_limiter
+from service_clients import get_client
 
-openai.api_key = st.secrets["OPENAI_API_KEY"]
+logger = logging.getLogger(__name__)
 
-client = Groq(api_key= st.secrets["LLMA_API_KEY"])
+# The Groq and OpenAI clients come from service_clients, built on first use (or injected by the benchmark)
 
-# LLM Resume Analysis by two LLMs one after another, first one will analyze and second one will return structured output
-def llm_resume_analysis(resume_extracted_text):
-    prompt = f""" 
+# Models used by the two-stage analysis chain
+ANALYZER_MODEL = "deepseek-r1-distill-llama-70b"
+STRUCTURING_MODEL = "gpt-4o"
+
+# System prompt of the first (analyzer) LLM
+ANALYZER_SYSTEM_PROMPT = "## Role and Task: \nYou are a **Senior Hiring Manager** in a **BPO company specializing in US debt collection** (based in India). Your task is to **review, analyze, and evaluate** applicants' resumes based on the specified hiring requirements. You must categorize candidates into one of three levels and provide a clear explanation of your decision.\n\n## Hiring Requirement:\nRole: Voice Agent  \nProcess: International voice processes (e.g., debt collection or loan services)\n\n## Candidate Categorization:\n\n1) **Good (Highly Preferred):**  \nExperience: Prior work experience in international voice processes (preferably in debt collection).  \nAdded Advantage: Experience in recognized BPO or debt collection firms, such as: " + ", ".join(KNOWN_BPO_COMPANIES) + " etc. as a voice agent role \n\n2) **Average (Moderately Suitable):**  \nMinimum 6 months of work experience in sales or customer service roles (any domain).\n\n3) **Non-Qualified (Unsuitable):**  \n- Less than 6 months of relevant experience or  \n- Fresher (no prior work experience) or  \n- Resume does not align with voice process job requirements.\n\n**Special Considerations/Remarks:** Identify applicants from Northeast India, specifically from any of these states: " + ", ".join(NORTHEAST_STATES) + "\n\n## Evaluation Criteria & Explanation:\n- Categorize the candidate into one of the three levels based on their resume.  \n- Justify the classification with a brief explanation, mentioning relevant experience, skills, and suitability for the role.  \n- Add special remarks if applicable (Northeast India origin).  \n\n**Additional Information:**  \n- Mention the candidate's **name**, **mobile number** (if available in the resume, otherwise N/A), and **email** (if available in the resume, otherwise N/A). \n\n---\n\n**Important:**  \nDo not invent or assume any details, Don't make things up by yourself. All information, analysis, and evaluation provided must strictly be based on the resume data given as input. If no resume data is provided, fill all the required fields (such as name, mobile number, email, category, justification etc.) as **\"N/A\"**."
+
+# System prompt of the second (structuring) LLM
+STRUCTURING_SYSTEM_PROMPT = "# Role, Goal and Task : \nYou are an LLM agent tasked with extracting key information from candidate resume descriptions. Given the candidate details, your job is to parse the text and return a JSON object that strictly follows the provided schema. The resume description may include evaluation details such as candidate name, mobile number, email, categorization, justification, and any special remarks.\n\n #### Important:Do not invent or assume any details, Don't make things up by yourself. All information and extracted details must strictly be based on the resume data given as input. If no resume data is provided, fill all the required fields/json keys (such as name, mobile number, email, category, justification etc.) as **N/A**.\n\n ## Requirements:\n1. Extract the candidate's name and assign it to the key \"name\".\n2. Extract the candidate's mobile number and assign it to the key \"mobile\".  If mobile number not found in resume, mention \"N/A\".\n3. Extract the candidate's email and assign it to the key \"email\".  If email not found in resume, mention \"N/A\".\n4. Extract the categorization information and map it to the key \"category\". The value must be one of the following:\n   - \"unsuitable\" (for non-qualified candidates)\n   - \"average\" (for moderately suitable candidates)\n   - \"good\" (for highly preferred candidates)\n5. Extract the justification details and assign them to the key \"justification\".\n6. Extract any special remarks and assign them to the key \"special_remarks\". The value must be either \"northeast\" or \"other_state\".  \"special_remarks\" describes where the candidate is from. Incase, if its not mentioned clearly or not found in resume, always choose \"other_state\" value. \n7. Return only a valid JSON object with these keys and no additional information.\n8. Do not include any commentary, explanations, or extra text in the output.\n\n ## Example expected JSON output:\n{\n  \"name\": \"Rahul Sharma\",\n  \"mobile\": \"8910463080\",\n  \"email\": \"N/A\",\n  \"category\": \"unsuitable\",\n  \"justification\": \"Rahul Sharma's resume indicates 2 years and 4 months of experience, primarily as a Business Analyst at Astra Business Services Private Limited. However, his role focused on data analysis and process optimization rather than direct voice process or debt collection experience. His sales experience, though relevant, was only 4 months, which is insufficient to meet the Average category's requirement of at least 6 months in sales or customer service.\",\n  \"special_remarks\": \"other_state\"\n}\n\nEnsure that the output JSON exactly follows this structure and contains no extra keys.\n"
+
+# JSON schema the structuring LLM must follow
+CANDIDATE_RESUME_JSON_SCHEMA = {
+  "name": "candidate_resume",
+  "strict": True,
+  "schema": {
+    "type": "object",
+    "required": [
+      "name",
+      "mobile",
+      "email",
+      "category",
+      "justification",
+      "special_remarks"
+    ],
+    "properties": {
+      "name": {
+        "type": "string",
+        "description": "The name of the candidate."
+      },
+      "mobile": {
+        "type": "string",
+        "description": "The mobile number of the candidate."
+      },
+      "email": {
+        "type": "string",
+        "description": "The email of the candidate."
+      },
+      "category": {
+        "enum": [
+          "unsuitable",
+          "average",
+          "good"
+        ],
+        "type": "string",
+        "description": "Categorization of the candidate's suitability."
+      },
+      "justification": {
+        "type": "string",
+        "description": "Details explaining the categorization of the candidate."
+      },
+      "special_remarks": {
+        "enum": [
+          "northeast",
+          "other_state"
+        ],
+        "type": "string",
+        "description": "Notes regarding the candidate's location."
+      }
+    },
+    "additionalProperties": False
+  }
+}
+
+# Analysis modes: "two_stage" (analyzer LLM -> structuring LLM) or "single_pass" (one call returning the schema)
+ANALYSIS_MODES = ("two_stage", "single_pass")
+ANALYSIS_MODE = get_setting("ANALYSIS_MODE", "two_stage")
+
+# Model used by the single-pass mode, it must support json_schema structured outputs
+SINGLE_PASS_MODEL = get_setting("SINGLE_PASS_MODEL", "gpt-4o")
+
+# System prompt of the single-pass mode: the hiring manager's judgment plus the output contract
+SINGLE_PASS_SYSTEM_PROMPT = ANALYZER_SYSTEM_PROMPT + """
+
+## Output format:
+Return only a JSON object with the keys "name", "mobile", "email", "category", "justification" and "special_remarks".
+- "mobile" and "email": as written in the resume, otherwise "N/A".
+- "category": "good" (highly preferred), "average" (moderately suitable) or "unsuitable" (non-qualified).
+- "justification": a brief explanation of the categorization.
+- "special_remarks": "northeast" if the candidate is clearly from one of the listed Northeast states, otherwise "other_state".
+Do not include any commentary or extra text outside the JSON object."""
+
+# USD per 1M (input, output) tokens, used for the per-run cost estimate
+MODEL_PRICING = {
+    "deepseek-r1-distill-llama-70b": (0.75, 0.99),
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4o-mini": (0.15, 0.60),
+}
+
+# Resume text is normalized and compacted to this many tokens before the LLM calls (0 only normalizes)
+TEXT_TOKEN_BUDGET = int(get_setting("TEXT_TOKEN_BUDGET", DEFAULT_TOKEN_BUDGET))
+
+# Cap on the analyzer's output, <think> reasoning included
+ANALYZER_MAX_COMPLETION_TOKENS = int(get_setting("ANALYZER_MAX_COMPLETION_TOKENS", 3072))
+
+# Cap of the one retry when the reasoning used up ANALYZER_MAX_COMPLETION_TOKENS before any answer
+ANALYZER_RETRY_MAX_COMPLETION_TOKENS = int(get_setting("ANALYZER_RETRY_MAX_COMPLETION_TOKENS", 2 * ANALYZER_MAX_COMPLETION_TOKENS))
+
+# Clearly unsuitable (fresher) resumes are classified by the rules without an LLM call; RULE_AUDIT_RATE of
+# them still go to the LLM to measure how often it agrees
+RULE_SHORT_CIRCUIT = get_bool_setting("RULE_SHORT_CIRCUIT", True)
+RULE_AUDIT_RATE = float(get_setting("RULE_AUDIT_RATE", 0.05))
+
+def analysis_fingerprint(mode=None):
+    """Fingerprint of everything that shapes a verdict; changing a prompt, model or mode invalidates cached verdicts"""
+    mode = mode or ANALYSIS_MODE
+    if mode == "single_pass":
+        parts = [mode, SINGLE_PASS_MODEL, SINGLE_PASS_SYSTEM_PROMPT, CANDIDATE_RESUME_JSON_SCHEMA, TEXT_TOKEN_BUDGET,
+                 RULES_VERSION, RULE_SHORT_CIRCUIT]
+    else:
+        parts = [ANALYZER_MODEL, ANALYZER_SYSTEM_PROMPT, STRUCTURING_MODEL, STRUCTURING_SYSTEM_PROMPT, CANDIDATE_RESUME_JSON_SCHEMA,
+                 TEXT_TOKEN_BUDGET, ANALYZER_MAX_COMPLETION_TOKENS, ANALYZER_RETRY_MAX_COMPLETION_TOKENS, RULES_VERSION,
+                 RULE_SHORT_CIRCUIT]
+    return hashlib.sha256(json.dumps(parts, sort_keys=True).encode("utf-8")).hexdigest()
+
+# Output tokens reserved for the structuring and single-pass calls
+STRUCTURING_MAX_COMPLETION_TOKENS = 2048
+
+def estimate_tokens(text):
+    """Token count used for rate limiting"""
+    return count_tokens(text)
+
+def completion_total_tokens(completion):
+    """Total tokens reported by a chat completion, if available"""
+    usage = getattr(completion, "usage", None)
+    return getattr(usage, "total_tokens", None)
+
+def record_llm_call(stats, model, completion, started):
+    """Add the latency, token usage and estimated cost of one completion to `stats` and to the current span"""
+    usage = getattr(completion, "usage", None)
+    prompt_tokens = getattr(usage, "prompt_tokens", None) or 0
+    completion_tokens = getattr(usage, "completion_tokens", None) or 0
+    input_price, output_price = MODEL_PRICING.get(model, (0.0, 0.0))
+    cost = (prompt_tokens * input_price + completion_tokens * output_price) / 1_000_000
+    telemetry.set_attributes(model=model, prompt_tokens=prompt_tokens, completion_tokens=completion_tokens, cost_usd=cost)
+    if stats is None:
+        return
+
+    stats.setdefault("calls", []).append({
+        "model": model,
+        "latency_seconds": time.monotonic() - started,
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "cost_usd": cost,
+    })
+    stats["prompt_tokens"] = stats.get("prompt_tokens", 0) + prompt_tokens
+    stats["completion_tokens"] = stats.get("completion_tokens", 0) + completion_tokens
+    stats["cost_usd"] = stats.get("cost_usd", 0.0) + cost
+
+def call_llm(span_name, stats, limiter, func, **kwargs):
+    """call_with_retry() of one completion request (`kwargs`), timed as a trace span and recorded with record_llm_call()"""
+    model = kwargs["model"]
+    with telemetry.span(span_name, model=model):
+        started = time.monotonic()
+        completion = call_with_retry(limiter, func, **kwargs)
+        record_llm_call(stats, model, completion, started)
+    return completion
+
+def build_user_prompt(resume_extracted_text):
+    return f""" 
     Below is the resume details of the applicant. \n
     {resume_extracted_text}
 """
-    # First LLM will analyze the resume and return the analysis
-    completion = client.chat.completions.create(
-    model="deepseek-r1-distill-llama-70b",
+
+# LLM Resume Analysis, either in a single structured call or by two LLMs one after another
+def llm_resume_analysis(resume_extracted_text, mode=None, stats=None):
+    """Analyze a resume and return the `candidate_resume` dictionary.
+
+    `mode` is "single_pass" or "two_stage" (default ANALYSIS_MODE). A failed single-pass call falls back to
+    the two-stage chain. The text is compacted to TEXT_TOKEN_BUDGET tokens first. Contact fields and the
+    northeast flag come from the deterministic rules where they find them, and clear freshers are classified
+    by the rules alone (mode "rules"). If `stats` is a dict it receives the mode used, latency, token counts
+    (resume text before/after compaction, prompt, completion, reasoning), cost and the per-field agreement
+    between the rules and the LLM.
+    """
+    mode = mode or ANALYSIS_MODE
+    if stats is None:
+        stats = {}
+    started = time.monotonic()
+
+    rule_fields = extract_contact_fields(resume_extracted_text)
+    rule_verdict, fresher_reason = rule_classification(resume_extracted_text, rule_fields)
+    if rule_verdict is not None:
+        stats["mode"] = "rules"
+        stats["latency_seconds"] = time.monotonic() - started
+        logger.info(f"Classified {rule_verdict['name']} by rules: {fresher_reason}")
+        return rule_verdict
+
+    # Tokens/min bound the throughput: send only the normalized, prioritized part of the resume
+    resume_text = compact_resume_text(resume_extracted_text, TEXT_TOKEN_BUDGET)
+    stats["text_tokens"] = count_tokens(resume_extracted_text)
+    stats["compacted_tokens"] = count_tokens(resume_text)
+
+    structured_output = None
+    if mode == "single_pass":
+        try:
+            structured_output = single_pass_analysis(resume_text, stats)
+            stats["mode"] = "single_pass"
+        except Exception as e:
+            stats["fallback_reason"] = str(e)
+
+    if structured_output is None:
+        structured_output = two_stage_analysis(resume_text, stats)
+        stats["mode"] = "two_stage"
+    stats["latency_seconds"] = time.monotonic() - started
+
+    structured_output, stats["rule_agreement"] = merge_rule_fields(structured_output, rule_fields)
+    if fresher_reason:
+        # Audited rule classification: did the LLM also find the candidate unsuitable?
+        stats["rule_agreement"]["category"] = structured_output.get("category") == "unsuitable"
+
+    logger.info(
+        f"Analyzed {structured_output.get('name', 'N/A')} ({stats['mode']}): resume text {stats['text_tokens']} -> "
+        f"{stats['compacted_tokens']} tokens, prompt {stats.get('prompt_tokens', 0)}, completion "
+        f"{stats.get('completion_tokens', 0)} (reasoning {stats.get('reasoning_tokens', 0)}) tokens"
+    )
+    return structured_output
+
+def rule_classification(resume_extracted_text, rule_fields):
+    """Return (rule-based verdict, reason) for a clearly unsuitable resume.
+
+    The verdict is None when the LLM has to judge the resume, including the audited share of rule
+    classifications (whose reason is still returned).
+    """
+    fresher_reason = find_fresher_reason(resume_extracted_text) if RULE_SHORT_CIRCUIT else None
+    if fresher_reason and not is_audit_sample(resume_extracted_text, RULE_AUDIT_RATE):
+        return rule_based_verdict(rule_fields, fresher_reason), fresher_reason
+    return None, fresher_reason
+
+def build_single_pass_request(resume_extracted_text):
+    """Chat-completion request body of the single-pass mode (also used for batch submissions)"""
+    return {
+        "model": SINGLE_PASS_MODEL,
+        "messages": [
+            {
+                "role": "system",
+                "content": SINGLE_PASS_SYSTEM_PROMPT
+            },
+            {
+                "role": "user",
+                "content": build_user_prompt(resume_extracted_text)
+            }
+        ],
+        "response_format": {
+            "type": "json_schema",
+            "json_schema": CANDIDATE_RESUME_JSON_SCHEMA
+        },
+        "temperature": 0.6,
+        "max_completion_tokens": STRUCTURING_MAX_COMPLETION_TOKENS,
+    }
+
+def parse_structured_output(content):
+    """Decode a candidate_resume JSON answer, raising if a required field is empty"""
+    structured_output = json.loads(content)
+
+    # An empty field means the model could not follow the schema
+    missing_fields = [field for field in CANDIDATE_RESUME_JSON_SCHEMA["schema"]["required"] if not structured_output.get(field)]
+    if missing_fields:
+        raise ValueError(f"Structured analysis missing required fields: {', '.join(missing_fields)}")
+    return structured_output
+
+# One model reads the resume and directly returns the strict candidate_resume JSON
+def single_pass_analysis(resume_extracted_text, stats=None):
+    request = build_single_pass_request(resume_extracted_text)
+    response = call_llm(
+        "llm.single_pass", stats,
+        get_limiter("openai"),
+        get_client("openai").chat.completions.create,
+        tokens=estimate_tokens(SINGLE_PASS_SYSTEM_PROMPT + request["messages"][1]["content"]) + STRUCTURING_MAX_COMPLETION_TOKENS,
+        usage_tokens=completion_total_tokens,
+        **request
+    )
+    return parse_structured_output(response.choices[0].message.content)
+
+def run_analyzer(prompt, max_completion_tokens, stats=None):
+    """One analyzer call; returns (answer, reasoning), with the <think> reasoning stripped from the answer.
+
+    The answer is empty when the reasoning used up `max_completion_tokens` (its <think> block is then unclosed).
+    """
+    completion = call_llm(
+    "llm.analyzer", stats,
+    get_limiter("groq"),
+    get_client("groq").chat.completions.create,
+    tokens=estimate_tokens(ANALYZER_SYSTEM_PROMPT + prompt) + max_completion_tokens,
+    usage_tokens=completion_total_tokens,
+    model=ANALYZER_MODEL,
     messages=[
         {
             "role": "system",
-            "content": "## Role and Task: \nYou are a **Senior Hiring Manager** in a **BPO company specializing in US debt collection** (based in India). Your task is to **review, analyze, and evaluate** applicants' resumes based on the specified hiring requirements. You must categorize candidates into one of three levels and provide a clear explanation of your decision.\n\n## Hiring Requirement:\nRole: Voice Agent  \nProcess: International voice processes (e.g., debt collection or loan services)\n\n## Candidate Categorization:\n\n1) **Good (Highly Preferred):**  \nExperience: Prior work experience in international voice processes (preferably in debt collection).  \nAdded Advantage: Experience in recognized BPO or debt collection firms, such as: Astra Business Services Private Limited, GLOBAL VANTEDGE, iQor, IDC Technologies, Provana, Encore Capital Group, American Express (Amex), Genpact, iEnergizer, Teleperformance, Personiv, Fusion CX, HCLTech, Barclays MIS, Accenture etc. as a voice agent role \n\n2) **Average (Moderately Suitable):**  \nMinimum 6 months of work experience in sales or customer service roles (any domain).\n\n3) **Non-Qualified (Unsuitable):**  \n- Less than 6 months of relevant experience or  \n- Fresher (no prior work experience) or  \n- Resume does not align with voice process job requirements.\n\n**Special Considerations/Remarks:** Identify applicants from Northeast India, specifically from any of these states: Arunachal Pradesh, Assam, Manipur, Meghalaya, Mizoram, Nagaland, Tripura\n\n## Evaluation Criteria & Explanation:\n- Categorize the candidate into one of the three levels based on their resume.  \n- Justify the classification with a brief explanation, mentioning relevant experience, skills, and suitability for the role.  \n- Add special remarks if applicable (Northeast India origin).  \n\n**Additional Information:**  \n- Mention the candidate's **name**, **mobile number** (if available in the resume, otherwise N/A), and **email** (if available in the resume, otherwise N/A). \n\n---\n\n**Important:**  \nDo not invent or assume any details, Don't make things up by yourself. All information, analysis, and evaluation provided must strictly be based on the resume data given as input. If no resume data is provided, fill all the required fields (such as name, mobile number, email, category, justification etc.) as **\"N/A\"**."
+            "content": ANALYZER_SYSTEM_PROMPT
         },
         {
             "role": "user",
@@ -32,28 +315,60 @@ def llm_resume_analysis(resume_extracted_text):
     ],
     temperature=0.6,
     top_p=0.95,
+    # Caps the <think> reasoning along with the answer
+    max_completion_tokens=max_completion_tokens,
     stream=False,
     stop=None,
     )
 
     analyzer_llm_response = completion.choices[0].message.content
 
-    # Remove the <think> tag and its content using a regex
-    cleaned_response = re.sub(r'<think>.*?</think>', '', analyzer_llm_response, flags=re.DOTALL)
+    # Remove the <think> tag and its content using a regex (unclosed when the reasoning hit the token cap)
+    reasoning = re.findall(r'<think>(.*?)(?:</think>|$)', analyzer_llm_response, flags=re.DOTALL)
+    cleaned_response = re.sub(r'<think>.*?(</think>|$)', '', analyzer_llm_response, flags=re.DOTALL)
+    if stats is not None:
+        stats["reasoning_tokens"] = stats.get("reasoning_tokens", 0) + sum(count_tokens(part) for part in reasoning)
+    return cleaned_response.strip(), "\n".join(part.strip() for part in reasoning).strip()
 
-    # Optionally, strip extra whitespace from the result
-    cleaned_response = cleaned_response.strip()
+# first one will analyze and second one will return structured output
+def two_stage_analysis(resume_extracted_text, stats=None):
+    """Analyze a resume with the reasoning analyzer, then turn its answer into the candidate_resume JSON.
+
+    When the reasoning uses up ANALYZER_MAX_COMPLETION_TOKENS before any answer, the analyzer is retried once
+    with ANALYZER_RETRY_MAX_COMPLETION_TOKENS; if it is cut off again, its reasoning is structured instead.
+    Either way `stats["analyzer_fallback"]` records it ("retried" or "truncated_reasoning").
+    """
+    prompt = build_user_prompt(resume_extracted_text)
+    # First LLM will analyze the resume and return the analysis
+    cleaned_response, reasoning = run_analyzer(prompt, ANALYZER_MAX_COMPLETION_TOKENS, stats)
+    if not cleaned_response:
+        logger.warning(f"Analyzer reasoning used up {ANALYZER_MAX_COMPLETION_TOKENS} completion tokens, retrying with {ANALYZER_RETRY_MAX_COMPLETION_TOKENS}")
+        cleaned_response, reasoning = run_analyzer(prompt, ANALYZER_RETRY_MAX_COMPLETION_TOKENS, stats)
+        fallback = "retried"
+        if not cleaned_response:
+            # The reasoning already weighs the resume against the categories: the structuring model can read it
+            cleaned_response = reasoning
+            fallback = "truncated_reasoning"
+        if stats is not None:
+            stats["analyzer_fallback"] = fallback
+    if not cleaned_response:
+        raise ValueError(f"Analyzer returned neither an answer nor reasoning within {ANALYZER_RETRY_MAX_COMPLETION_TOKENS} completion tokens")
 
     # pass the cleaned_response to the second llm for structured output generation
-    response = openai.chat.completions.create(
-    model="gpt-4o",
+    response = call_llm(
+    "llm.structuring", stats,
+    get_limiter("openai"),
+    get_client("openai").chat.completions.create,
+    tokens=estimate_tokens(STRUCTURING_SYSTEM_PROMPT + cleaned_response) + STRUCTURING_MAX_COMPLETION_TOKENS,
+    usage_tokens=completion_total_tokens,
+    model=STRUCTURING_MODEL,
     messages=[
     {
       "role": "system",
       "content": [
         {
           "type": "text",
-          "text": "# Role, Goal and Task : \nYou are an LLM agent tasked with extracting key information from candidate resume descriptions. Given the candidate details, your job is to parse the text and return a JSON object that strictly follows the provided schema. The resume description may include evaluation details such as candidate name, mobile number, email, categorization, justification, and any special remarks.\n\n #### Important:Do not invent or assume any details, Don't make things up by yourself. All information and extracted details must strictly be based on the resume data given as input. If no resume data is provided, fill all the required fields/json keys (such as name, mobile number, email, category, justification etc.) as **N/A**.\n\n ## Requirements:\n1. Extract the candidate's name and assign it to the key \"name\".\n2. Extract the candidate's mobile number and assign it to the key \"mobile\".  If mobile number not found in resume, mention \"N/A\".\n3. Extract the candidate's email and assign it to the key \"email\".  If email not found in resume, mention \"N/A\".\n4. Extract the categorization information and map it to the key \"category\". The value must be one of the following:\n   - \"unsuitable\" (for non-qualified candidates)\n   - \"average\" (for moderately suitable candidates)\n   - \"good\" (for highly preferred candidates)\n5. Extract the justification details and assign them to the key \"justification\".\n6. Extract any special remarks and assign them to the key \"special_remarks\". The value must be either \"northeast\" or \"other_state\".  \"special_remarks\" describes where the candidate is from. Incase, if its not mentioned clearly or not found in resume, always choose \"other_state\" value. \n7. Return only a valid JSON object with these keys and no additional information.\n8. Do not include any commentary, explanations, or extra text in the output.\n\n ## Example expected JSON output:\n{\n  \"name\": \"Rahul Sharma\",\n  \"mobile\": \"8910463080\",\n  \"email\": \"N/A\",\n  \"category\": \"unsuitable\",\n  \"justification\": \"Rahul Sharma's resume indicates 2 years and 4 months of experience, primarily as a Business Analyst at Astra Business Services Private Limited. However, his role focused on data analysis and process optimization rather than direct voice process or debt collection experience. His sales experience, though relevant, was only 4 months, which is insufficient to meet the Average category's requirement of at least 6 months in sales or customer service.\",\n  \"special_remarks\": \"other_state\"\n}\n\nEnsure that the output JSON exactly follows this structure and contains no extra keys.\n"
+          "text": STRUCTURING_SYSTEM_PROMPT
         }
       ]
     },
@@ -69,61 +384,11 @@ def llm_resume_analysis(resume_extracted_text):
   ],
   response_format={
     "type": "json_schema",
-    "json_schema": {
-      "name": "candidate_resume",
-      "strict": True,
-      "schema": {
-        "type": "object",
-        "required": [
-          "name",
-          "mobile",
-          "email",
-          "category",
-          "justification",
-          "special_remarks"
-        ],
-        "properties": {
-          "name": {
-            "type": "string",
-            "description": "The name of the candidate."
-          },
-          "mobile": {
-            "type": "string",
-            "description": "The mobile number of the candidate."
-          },
-          "email": {
-            "type": "string",
-            "description": "The email of the candidate."
-          },
-          "category": {
-            "enum": [
-              "unsuitable",
-              "average",
-              "good"
-            ],
-            "type": "string",
-            "description": "Categorization of the candidate's suitability."
-          },
-          "justification": {
-            "type": "string",
-            "description": "Details explaining the categorization of the candidate."
-          },
-          "special_remarks": {
-            "enum": [
-              "northeast",
-              "other_state"
-            ],
-            "type": "string",
-            "description": "Notes regarding the candidate's location."
-          }
-        },
-        "additionalProperties": False
-      }
-    }
+    "json_schema": CANDIDATE_RESUME_JSON_SCHEMA
   },
 
     temperature=1,
-    max_completion_tokens=2048,
+    max_completion_tokens=STRUCTURING_MAX_COMPLETION_TOKENS,
     top_p=1,
     frequency_penalty=0,
     presence_penalty=0
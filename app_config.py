@@ -0,0 +1,50 @@
+import os
+import json
+from dotenv import load_dotenv
+
+# Streamlit is optional: the engine, CLI and workers also run without it
+try:
+    import streamlit as st
+except ImportError:
+    st = None
+
+# Load environment variables
+load_dotenv()
+
+_MISSING = object()
+
+
+def _secrets():
+    """st.secrets as a plain mapping, or {} outside Streamlit / without a secrets.toml"""
+    if st is None:
+        return {}
+    try:
+        return {key: st.secrets[key] for key in st.secrets}
+    except Exception:
+        return {}
+
+
+def get_setting(name, default=_MISSING):
+    """Read a setting from the environment, falling back to st.secrets, then `default`"""
+    value = os.environ.get(name)
+    if value is not None:
+        return value
+    value = _secrets().get(name, _MISSING)
+    if value is not _MISSING:
+        return value
+    if default is _MISSING:
+        raise KeyError(f"Missing setting {name}: set it as an environment variable or in .streamlit/secrets.toml")
+    return default
+
+
+def get_section(name):
+    """Read a nested settings section: a JSON object in the environment variable NAME, or the [name] secrets table"""
+    value = os.environ.get(name.upper())
+    if value:
+        return json.loads(value)
+    section = _secrets().get(name, {})
+    return {key: dict(item) if hasattr(item, "keys") else item for key, item in dict(section).items()}
+
+
+def get_bool_setting(name, default):
+    return str(get_setting(name, default)).lower() in ("1", "true", "yes")
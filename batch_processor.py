@@ -0,0 +1,242 @@
+import os
+import io
+import json
+import time
+
+from LLM_Analyzer import build_single_pass_request, parse_structured_output, TEXT_TOKEN_BUDGET, MODEL_PRICING, SINGLE_PASS_MODEL
+from text_compactor import compact_resume_text, count_tokens
+from service_clients import get_client
+
+# OpenAI batch limits: 50,000 requests and 200 MB per input file
+MAX_REQUESTS_PER_FILE = 50000
+MAX_BYTES_PER_FILE = 190 * 1024 * 1024
+
+BATCH_ENDPOINT = "/v1/chat/completions"
+TERMINAL_STATUSES = {"completed", "failed", "expired", "cancelled"}
+
+# Batch requests are billed at half the price of the same interactive requests
+BATCH_PRICE_FACTOR = 0.5
+
+
+def build_batch_request(custom_id, resume_extracted_text):
+    """One JSONL line of a batch input file, carrying the single-pass analysis request on the compacted text"""
+    return {
+        "custom_id": custom_id,
+        "method": "POST",
+        "url": BATCH_ENDPOINT,
+        "body": build_single_pass_request(compact_resume_text(resume_extracted_text, TEXT_TOKEN_BUDGET)),
+    }
+
+
+def write_batch_files(resume_texts, directory, max_requests=MAX_REQUESTS_PER_FILE, max_bytes=MAX_BYTES_PER_FILE):
+    """Write {custom_id: extracted text} as JSONL batch input files, split at the provider limits.
+
+    Returns the list of file paths.
+    """
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    handle = None
+    request_count = 0
+    byte_count = 0
+
+    for custom_id, text in resume_texts.items():
+        line = (json.dumps(build_batch_request(custom_id, text)) + "\n").encode("utf-8")
+        if handle is None or request_count >= max_requests or byte_count + len(line) > max_bytes:
+            if handle is not None:
+                handle.close()
+            path = os.path.join(directory, f"batch_input_{len(paths):04d}.jsonl")
+            handle = open(path, "wb")
+            paths.append(path)
+            request_count = 0
+            byte_count = 0
+        handle.write(line)
+        request_count += 1
+        byte_count += len(line)
+
+    if handle is not None:
+        handle.close()
+    return paths
+
+
+def parse_batch_output(lines):
+    """Yield (custom_id, result, error, usage) for each line of a batch output file.
+
+    `result` is the validated candidate_resume dictionary, or None with `error` explaining why. `usage` is
+    the token usage reported for the request ({} if none).
+    """
+    for line in lines:
+        if not line.strip():
+            continue
+        record = json.loads(line)
+        custom_id = record.get("custom_id")
+        if record.get("error"):
+            yield custom_id, None, str(record["error"].get("message", record["error"])), {}
+            continue
+
+        response = record.get("response") or {}
+        usage = (response.get("body") or {}).get("usage") or {}
+        if response.get("status_code") != 200:
+            yield custom_id, None, f"HTTP {response.get('status_code')}", usage
+            continue
+        try:
+            content = response["body"]["choices"][0]["message"]["content"]
+            yield custom_id, parse_structured_output(content), None, usage
+        except Exception as e:
+            yield custom_id, None, str(e), usage
+
+
+def batch_usage_stats(usage):
+    """Token counts and estimated cost of one batch request, from the `usage` of its output line"""
+    prompt_tokens = usage.get("prompt_tokens", 0)
+    completion_tokens = usage.get("completion_tokens", 0)
+    input_price, output_price = MODEL_PRICING.get(SINGLE_PASS_MODEL, (0.0, 0.0))
+    return {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "cost_usd": (prompt_tokens * input_price + completion_tokens * output_price) * BATCH_PRICE_FACTOR / 1_000_000,
+    }
+
+
+class OpenAIBatchProvider:
+    """Submits batch input files to the OpenAI Batch API"""
+
+    def __init__(self, client=None):
+        self.client = client if client is not None else get_client("openai")
+
+    def submit(self, path):
+        with open(path, "rb") as f:
+            input_file = self.client.files.create(file=f, purpose="batch")
+        batch = self.client.batches.create(
+            input_file_id=input_file.id,
+            endpoint=BATCH_ENDPOINT,
+            completion_window="24h"
+        )
+        return batch.id
+
+    def status(self, batch_id):
+        """Return (status, output_file_id, error_file_id) of a batch"""
+        batch = self.client.batches.retrieve(batch_id)
+        return batch.status, batch.output_file_id, batch.error_file_id
+
+    def read_file(self, file_id):
+        return self.client.files.content(file_id).text.splitlines()
+
+
+class MockBatchProvider:
+    """Local stand-in for a batch provider, so the batch flow runs without network access.
+
+    Every request is answered by `responder(request_body)`, which returns the assistant message content.
+    Batches report "in_progress" for `polls_until_complete` polls before completing.
+    """
+
+    def __init__(self, responder=None, polls_until_complete=1):
+        self.responder = responder or self.default_responder
+        self.polls_until_complete = polls_until_complete
+        self._batches = {}
+        self._files = {}
+
+    @staticmethod
+    def default_responder(body):
+        return json.dumps({
+            "name": "N/A",
+            "mobile": "N/A",
+            "email": "N/A",
+            "category": "unsuitable",
+            "justification": "Mock batch response.",
+            "special_remarks": "other_state",
+        })
+
+    def submit(self, path):
+        batch_id = f"mock_batch_{len(self._batches)}"
+        output = io.StringIO()
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                request = json.loads(line)
+                content = self.responder(request["body"])
+                usage = {
+                    "prompt_tokens": sum(count_tokens(message["content"]) for message in request["body"]["messages"]),
+                    "completion_tokens": count_tokens(content),
+                }
+                output.write(json.dumps({
+                    "id": f"{batch_id}_{request['custom_id']}",
+                    "custom_id": request["custom_id"],
+                    "response": {
+                        "status_code": 200,
+                        "body": {"choices": [{"message": {"role": "assistant", "content": content}}], "usage": usage},
+                    },
+                    "error": None,
+                }) + "\n")
+        self._files[f"{batch_id}_output"] = output.getvalue()
+        self._batches[batch_id] = 0
+        return batch_id
+
+    def status(self, batch_id):
+        self._batches[batch_id] += 1
+        if self._batches[batch_id] <= self.polls_until_complete:
+            return "in_progress", None, None
+        return "completed", f"{batch_id}_output", None
+
+    def read_file(self, file_id):
+        return self._files[file_id].splitlines()
+
+
+def run_batch_analysis(resume_texts, provider, directory, poll_interval=30, on_status=None):
+    """Analyze {custom_id: extracted text} through batch jobs and wait for them to finish.
+
+    `on_status(batch_id, status)` is called after every poll. Returns {custom_id: (result, error, usage)};
+    requests missing from the output (failed or expired batches) are reported with an error.
+    The input files hold the resume texts, so they are deleted once the results are in, or on failure.
+    """
+    paths = write_batch_files(resume_texts, directory)
+    try:
+        outcomes = _wait_for_batches(provider, [provider.submit(path) for path in paths], poll_interval, on_status)
+    finally:
+        remove_batch_files(paths, directory)
+
+    for custom_id in resume_texts:
+        outcomes.setdefault(custom_id, (None, "no result returned by the batch job", {}))
+    return outcomes
+
+
+def _wait_for_batches(provider, pending, poll_interval, on_status):
+    outcomes = {}
+    while pending:
+        still_pending = []
+        for batch_id in pending:
+            status, output_file_id, error_file_id = provider.status(batch_id)
+            if on_status is not None:
+                on_status(batch_id, status)
+            if status not in TERMINAL_STATUSES:
+                still_pending.append(batch_id)
+                continue
+            for file_id in (output_file_id, error_file_id):
+                if file_id:
+                    for custom_id, result, error, usage in parse_batch_output(provider.read_file(file_id)):
+                        outcomes[custom_id] = (result, error, usage)
+        pending = still_pending
+        if pending:
+            time.sleep(poll_interval)
+    return outcomes
+
+
+def remove_batch_files(paths, directory):
+    """Delete batch input files, then their directory if nothing else is left in it"""
+    for path in paths:
+        if os.path.exists(path):
+            os.remove(path)
+    if os.path.isdir(directory) and not os.listdir(directory):
+        os.rmdir(directory)
+
+
+def remove_batch_directories_older_than(root, cutoff):
+    """Delete the batch directories under `root` last modified before `cutoff` (a timestamp), e.g. left by a
+    worker that was killed while its batches ran"""
+    if not os.path.isdir(root):
+        return 0
+    removed = 0
+    for name in os.listdir(root):
+        directory = os.path.join(root, name)
+        if os.path.isdir(directory) and os.path.getmtime(directory) < cutoff:
+            remove_batch_files([os.path.join(directory, file_name) for file_name in os.listdir(directory)], directory)
+            removed += 1
+    return removed
@@ -0,0 +1,213 @@
+"""Offline benchmark of the ingest -> parse -> analyze -> save pipeline, against the fakes of fake_services.
+
+    python benchmark.py                                          # 10, 100 and 1,000 synthetic resumes
+    python benchmark.py --sizes 100 --error-rate 0.05 --rate-limit-rate 0.05
+    python benchmark.py --output bench.json --baseline last.json # exit 1 on a regression
+
+Each size runs in its own process with its own cache, index and job store, so its peak RSS and timings
+don't carry over from another run. No API key or network access is needed.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import logging
+import subprocess
+import tempfile
+
+from synthetic_resumes import write_resume_zip
+from telemetry import percentile
+
+DEFAULT_SIZES = (10, 100, 1000)
+
+# Median latency in seconds of each fake service
+DEFAULT_LATENCIES = {"llamaparse": 0.5, "groq": 0.4, "openai": 0.3, "supabase": 0.02}
+
+# Client-side quotas of the benchmark runs, high enough that the pipeline rather than the quota is measured
+BENCHMARK_RATE_LIMITS = {
+    "llamaparse": {"requests_per_minute": 6000, "tokens_per_minute": None},
+    "groq": {"requests_per_minute": 6000, "tokens_per_minute": None},
+    "openai": {"requests_per_minute": 6000, "tokens_per_minute": None},
+    "supabase": {"requests_per_minute": 60000, "tokens_per_minute": None},
+}
+
+# Result fields compared against a baseline, and whether higher values are better
+REGRESSION_METRICS = {"resumes_per_minute": True, "p95_seconds": False, "p99_seconds": False, "peak_rss_mb": False}
+
+
+def benchmark_environment(workdir, rate_limits):
+    """Settings of a benchmark run: every store under `workdir`, placeholder credentials for the fakes"""
+    env = dict(os.environ)
+    env.update({
+        "CACHE_PATH": os.path.join(workdir, "cache.sqlite3"),
+        "DEDUP_PATH": os.path.join(workdir, "dedup.sqlite3"),
+        "JOB_DB_PATH": os.path.join(workdir, "jobs.sqlite3"),
+        "JOBS_DIRECTORY": os.path.join(workdir, "jobs"),
+        "TRACE_DIRECTORY": os.path.join(workdir, "traces"),
+        "BATCH_DIRECTORY": os.path.join(workdir, "batches"),
+        "RATE_LIMITS": json.dumps(rate_limits),
+    })
+    for name in ("SUPABASE_URL", "SUPABASE_KEY", "OPENAI_API_KEY", "LLMA_API_KEY", "LLAMA_CLOUD_API_KEY"):
+        env[name] = "http://supabase.benchmark" if name == "SUPABASE_URL" else "benchmark"
+    return env
+
+
+def run_single(args):
+    """Process one synthetic ZIP against the fakes and print its result as JSON (in the child process)"""
+    # The engine reads its settings on import, from the environment prepared by the parent
+    import resume_engine
+    from fake_services import install_fake_services, ServiceBehavior
+
+    behaviors = {
+        name: ServiceBehavior(
+            latency_seconds=latency * args.latency_scale, error_rate=args.error_rate, rate_limit_rate=args.rate_limit_rate,
+            requests_per_minute=args.quota_per_minute, retry_after_seconds=args.retry_after, seed=args.seed + i
+        )
+        for i, (name, latency) in enumerate(DEFAULT_LATENCIES.items())
+    }
+    install_fake_services(behaviors)
+
+    job_store = resume_engine.get_job_store()
+    with open(args.zip_path, "rb") as zip_file:
+        job = resume_engine.submit_job(zip_file, os.path.basename(args.zip_path), job_store, analysis_mode=args.mode)
+    job = job_store.claim_job(job["job_id"], worker_id="benchmark")
+    started = time.perf_counter()
+    summary = resume_engine.run_claimed_job(job, job_store)
+    wall_seconds = time.perf_counter() - started
+
+    # Tail latency of whole resumes, from the "resume" spans of the run's trace
+    latencies = []
+    with open(summary["telemetry"]["trace_path"], encoding="utf-8") as trace:
+        for line in trace:
+            span = json.loads(line)
+            if span["name"] == "resume":
+                latencies.append((span["end_time_unix_nano"] - span["start_time_unix_nano"]) / 1e9)
+
+    tiers = {}
+    for job_file in job_store.get_files(job["job_id"]):
+        tiers[job_file["tier"] or "none"] = tiers.get(job_file["tier"] or "none", 0) + 1
+
+    memory = summary["memory"]
+    result = {
+        "files": summary["success_count"] + summary["error_count"],
+        "succeeded": summary["success_count"],
+        "failed": summary["error_count"],
+        "wall_seconds": round(wall_seconds, 2),
+        "resumes_per_minute": round(summary["success_count"] / wall_seconds * 60, 1),
+        "p50_seconds": percentile(latencies, 50),
+        "p95_seconds": percentile(latencies, 95),
+        "p99_seconds": percentile(latencies, 99),
+        "max_seconds": max(latencies, default=None),
+        "peak_rss_mb": memory["process_peak_rss_mb"] or memory["peak_rss_mb"],
+        "peak_in_flight_mb": memory["peak_in_flight_mb"],
+        "cost_usd": summary["telemetry"]["cost_usd"],
+        "tiers": tiers,
+        "stages": {
+            name: {key: stage[key] for key in ("count", "p50_seconds", "p95_seconds", "errors", "retries")}
+            for name, stage in summary["telemetry"]["stages"].items()
+        },
+        "services": {name: behavior.report() for name, behavior in behaviors.items()},
+    }
+    print(json.dumps(result))
+    return 0
+
+
+def run_size(size, args, root):
+    """Generate a ZIP of `size` resumes and benchmark it in a child process"""
+    workdir = os.path.join(root, f"size_{size}")
+    os.makedirs(workdir)
+    zip_path = os.path.join(workdir, f"resumes_{size}.zip")
+    contents = write_resume_zip(zip_path, size, seed=args.seed)
+
+    command = [
+        sys.executable, os.path.abspath(__file__), "--single", zip_path, "--seed", str(args.seed),
+        "--latency-scale", str(args.latency_scale), "--error-rate", str(args.error_rate),
+        "--rate-limit-rate", str(args.rate_limit_rate), "--retry-after", str(args.retry_after),
+    ]
+    if args.quota_per_minute is not None:
+        command += ["--quota-per-minute", str(args.quota_per_minute)]
+    if args.mode:
+        command += ["--mode", args.mode]
+    completed = subprocess.run(
+        command, env=benchmark_environment(workdir, args.rate_limits), cwd=os.path.dirname(os.path.abspath(__file__)),
+        stdout=subprocess.PIPE, text=True
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"Benchmark of {size} files failed with exit code {completed.returncode}")
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    result["contents"] = contents
+    return result
+
+
+def find_regressions(results, baseline, tolerance):
+    """Metrics of `results` that are more than `tolerance` worse than in `baseline`"""
+    regressions = []
+    for size, result in results.items():
+        previous = baseline.get(size)
+        if previous is None:
+            continue
+        for metric, higher_is_better in REGRESSION_METRICS.items():
+            old, new = previous.get(metric), result.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            if (-change if higher_is_better else change) > tolerance:
+                regressions.append(f"{size} files: {metric} {old} -> {new} ({change:+.0%})")
+    return regressions
+
+
+def print_report(results):
+    header = f"{'files':>6} {'ok':>6} {'failed':>6} {'resumes/min':>12} {'p50 s':>8} {'p95 s':>8} {'p99 s':>8} {'peak RSS MB':>12}"
+    print(header)
+    for size, result in results.items():
+        print(
+            f"{size:>6} {result['succeeded']:>6} {result['failed']:>6} {result['resumes_per_minute']:>12.1f} "
+            f"{result['p50_seconds'] or 0:>8.2f} {result['p95_seconds'] or 0:>8.2f} {result['p99_seconds'] or 0:>8.2f} "
+            f"{result['peak_rss_mb'] or 0:>12.1f}"
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline benchmark of the resume pipeline")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES), help="Numbers of resumes to benchmark")
+    parser.add_argument("--mode", choices=("two_stage", "single_pass"), default=None, help="LLM analysis mode")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--latency-scale", type=float, default=1.0, help="Multiplier of the default service latencies")
+    parser.add_argument("--error-rate", type=float, default=0.01, help="Share of calls failing with a 503")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.01, help="Share of calls answered with a 429")
+    parser.add_argument("--quota-per-minute", type=int, default=None, help="Requests/min each fake serves before 429s")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After seconds of the fake 429s")
+    parser.add_argument("--rate-limits", type=json.loads, default=BENCHMARK_RATE_LIMITS, help="Client quotas (JSON)")
+    parser.add_argument("--output", "-o", help="Write the results as JSON")
+    parser.add_argument("--baseline", help="Results JSON of an earlier run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative regression against the baseline")
+    parser.add_argument("--single", metavar="ZIP_PATH", dest="zip_path", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.zip_path:
+        logging.basicConfig(level=logging.WARNING)
+        return run_single(args)
+
+    with tempfile.TemporaryDirectory(prefix="resume_benchmark_") as root:
+        results = {}
+        for size in args.sizes:
+            print(f"Benchmarking {size} files...", file=sys.stderr)
+            results[str(size)] = run_size(size, args, root)
+    print_report(results)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = find_regressions(results, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"Regression: {regression}", file=sys.stderr)
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
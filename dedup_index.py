@@ -0,0 +1,176 @@
+import os
+import re
+import json
+import time
+import random
+import sqlite3
+import hashlib
+import threading
+from array import array
+
+DEFAULT_DEDUP_PATH = os.path.join(".cache", "dedup.sqlite3")
+
+# MinHash signature size and LSH banding: 16 bands of 8 rows find pairs above ~0.7 Jaccard similarity
+NUM_PERM = 128
+BANDS = 16
+
+# Estimated Jaccard similarity of the word shingles above which a resume is a near-duplicate; candidates
+# sharing a mobile number or email only need the lower contact threshold (e.g. a re-exported or lightly edited CV)
+DEFAULT_THRESHOLD = 0.85
+DEFAULT_CONTACT_THRESHOLD = 0.6
+
+SHINGLE_WORDS = 5
+MAX_CANDIDATES = 200
+
+_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+_rng = random.Random(1)
+_PERMUTATIONS = [(_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(NUM_PERM)]
+
+
+def _hash64(value):
+    return int.from_bytes(hashlib.blake2b(value.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def shingles(text, size=SHINGLE_WORDS):
+    """Set of hashed word n-grams of the text, ignoring case, punctuation and layout"""
+    words = re.findall(r"[a-z0-9]+", text.lower())
+    if len(words) < size:
+        return {_hash64(" ".join(words))} if words else set()
+    return {_hash64(" ".join(words[i:i + size])) for i in range(len(words) - size + 1)}
+
+
+def minhash_signature(text):
+    """MinHash signature of the text's shingles, as an array of NUM_PERM 32-bit values"""
+    hashes = shingles(text)
+    if not hashes:
+        return array("I", [_MAX_HASH] * NUM_PERM)
+    return array("I", (min((a * h + b) % _PRIME for h in hashes) & _MAX_HASH for a, b in _PERMUTATIONS))
+
+
+def signature_similarity(first, second):
+    """Estimated Jaccard similarity of two signatures"""
+    return sum(x == y for x, y in zip(first, second)) / len(first)
+
+
+def band_buckets(signature):
+    """LSH bucket of each band of the signature"""
+    rows = len(signature) // BANDS
+    return [
+        (band, _hash64(signature[band * rows:(band + 1) * rows].tobytes().hex()) >> 1)
+        for band in range(BANDS)
+    ]
+
+
+def contact_keys(fields):
+    """Index keys of the normalized mobile/email of a resume"""
+    return [f"{field}:{fields[field]}" for field in ("mobile", "email") if fields.get(field)]
+
+
+class DuplicateIndex:
+    """Persistent MinHash LSH index of analyzed resumes, for reusing the verdict of near-duplicates.
+
+    Every saved analysis is indexed by its LSH band buckets and its mobile/email. A lookup only reads the
+    resumes sharing a bucket or a contact key (indexed SQLite lookups), so its cost doesn't grow with the
+    number of indexed resumes. Verdicts are only reused within the same analysis fingerprint.
+    """
+
+    def __init__(self, path=DEFAULT_DEDUP_PATH, threshold=DEFAULT_THRESHOLD, contact_threshold=DEFAULT_CONTACT_THRESHOLD):
+        self.path = path
+        self.threshold = threshold
+        self.contact_threshold = contact_threshold
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS documents (
+                    doc_id INTEGER PRIMARY KEY,
+                    content_hash TEXT NOT NULL,
+                    fingerprint TEXT NOT NULL,
+                    run_id TEXT NOT NULL,
+                    signature BLOB NOT NULL,
+                    verdict TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    UNIQUE (content_hash, fingerprint)
+                )"""
+            )
+            self._conn.execute("CREATE TABLE IF NOT EXISTS lsh_buckets (band INTEGER NOT NULL, bucket INTEGER NOT NULL, doc_id INTEGER NOT NULL)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_lsh_buckets ON lsh_buckets (band, bucket)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_lsh_buckets_doc ON lsh_buckets (doc_id)")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS contact_keys (contact TEXT NOT NULL, doc_id INTEGER NOT NULL)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_contact_keys ON contact_keys (contact)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_contact_keys_doc ON contact_keys (doc_id)")
+
+    def find(self, signature, contacts, fingerprint, exclude_hash=None):
+        """Best near-duplicate of a resume: {"content_hash", "run_id", "verdict", "similarity"} or None"""
+        buckets = band_buckets(signature)
+        keys = contact_keys(contacts)
+        with self._lock:
+            bucket_docs = self._conn.execute(
+                f"""SELECT DISTINCT doc_id FROM lsh_buckets WHERE (band, bucket) IN (VALUES {", ".join(["(?, ?)"] * len(buckets))})
+                    LIMIT {MAX_CANDIDATES}""",
+                [value for bucket in buckets for value in bucket]
+            ).fetchall()
+            contact_docs = self._conn.execute(
+                f"SELECT DISTINCT doc_id FROM contact_keys WHERE contact IN ({', '.join('?' * len(keys))}) LIMIT {MAX_CANDIDATES}", keys
+            ).fetchall() if keys else []
+            contact_doc_ids = {row[0] for row in contact_docs}
+            doc_ids = {row[0] for row in bucket_docs} | contact_doc_ids
+            rows = self._conn.execute(
+                f"""SELECT doc_id, content_hash, run_id, signature, verdict FROM documents
+                    WHERE fingerprint = ? AND doc_id IN ({', '.join('?' * len(doc_ids))})""",
+                [fingerprint, *doc_ids]
+            ).fetchall() if doc_ids else []
+
+        best = None
+        for doc_id, content_hash, run_id, stored_signature, verdict in rows:
+            if content_hash == exclude_hash:
+                continue
+            similarity = signature_similarity(signature, array("I", stored_signature))
+            threshold = self.contact_threshold if doc_id in contact_doc_ids else self.threshold
+            if similarity >= threshold and (best is None or similarity > best["similarity"]):
+                best = {"content_hash": content_hash, "run_id": run_id, "verdict": json.loads(verdict), "similarity": similarity}
+        return best
+
+    def add(self, content_hash, run_id, signature, contacts, fingerprint, verdict):
+        """Index the saved analysis of a resume (replacing an older entry for the same file and fingerprint)"""
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT doc_id FROM documents WHERE content_hash = ? AND fingerprint = ?", (content_hash, fingerprint)
+            ).fetchone()
+            if row is not None:
+                self._remove(row[0])
+            doc_id = self._conn.execute(
+                """INSERT INTO documents (content_hash, fingerprint, run_id, signature, verdict, created_at)
+                   VALUES (?, ?, ?, ?, ?, ?)""",
+                (content_hash, fingerprint, run_id, signature.tobytes(), json.dumps(verdict), time.time())
+            ).lastrowid
+            self._conn.executemany(
+                "INSERT INTO lsh_buckets (band, bucket, doc_id) VALUES (?, ?, ?)",
+                [(band, bucket, doc_id) for band, bucket in band_buckets(signature)]
+            )
+            self._conn.executemany(
+                "INSERT INTO contact_keys (contact, doc_id) VALUES (?, ?)", [(key, doc_id) for key in contact_keys(contacts)]
+            )
+
+    def _remove(self, doc_id):
+        self._conn.execute("DELETE FROM lsh_buckets WHERE doc_id = ?", (doc_id,))
+        self._conn.execute("DELETE FROM contact_keys WHERE doc_id = ?", (doc_id,))
+        self._conn.execute("DELETE FROM documents WHERE doc_id = ?", (doc_id,))
+
+    def remove_older_than(self, cutoff):
+        """Drop entries indexed before `cutoff` (a timestamp), e.g. once their runs are purged"""
+        with self._lock, self._conn:
+            doc_ids = [row[0] for row in self._conn.execute("SELECT doc_id FROM documents WHERE created_at < ?", (cutoff,))]
+            for doc_id in doc_ids:
+                self._remove(doc_id)
+        return len(doc_ids)
+
+    def count(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
@@ -0,0 +1,325 @@
+"""Local stand-ins for LlamaParse, Groq, OpenAI and Supabase, for running the pipeline without network access.
+
+Each fake follows the small part of the client API the engine uses, and goes through a ServiceBehavior that
+adds latency, random failures and 429s. Install them with install_fake_services().
+"""
+import re
+import json
+import time
+import random
+import datetime
+import threading
+from collections import deque
+from types import SimpleNamespace
+
+from rule_extractor import extract_contact_fields
+from text_compactor import count_tokens
+import service_clients
+
+# Keywords the fake analyzer uses to pick a category
+GOOD_PATTERN = re.compile(r"\b(debt collection|collections?|international voice|us process|loan recovery)\b", re.I)
+AVERAGE_PATTERN = re.compile(r"\b(customer service|customer support|sales|telecaller|call cent(?:er|re))\b", re.I)
+
+# Synthetic PDFs carry their text hex-encoded in the document info, so scanned (image-only) ones can be "parsed"
+SYNTHETIC_TEXT_PATTERN = re.compile(rb"/SyntheticText <([0-9a-fA-F]*)>")
+PDF_TEXT_PATTERN = re.compile(rb"\(((?:\\.|[^\\)])*)\) Tj")
+
+
+class FakeServiceError(Exception):
+    """HTTP error of a fake service, shaped like the SDK errors rate_limiter inspects"""
+
+    def __init__(self, status_code, message, retry_after=None):
+        super().__init__(f"Error code: {status_code} - {message}")
+        self.status_code = status_code
+        headers = {"retry-after": str(retry_after)} if retry_after is not None else {}
+        self.response = SimpleNamespace(status_code=status_code, headers=headers)
+
+
+class ServiceBehavior:
+    """Latency, failure and quota model of one fake service.
+
+    Every call sleeps a log-normally distributed latency with median `latency_seconds` (`jitter` is the
+    sigma), then fails with a 503 at `error_rate` or with a 429 at `rate_limit_rate`. With
+    `requests_per_minute` set, calls beyond that quota in the last minute are answered with a 429 and a
+    Retry-After header. Counts of calls, failures and 429s are kept for the benchmark report.
+    """
+
+    def __init__(self, latency_seconds=0.0, jitter=0.3, error_rate=0.0, rate_limit_rate=0.0, requests_per_minute=None,
+                 retry_after_seconds=1.0, seed=None):
+        self.latency_seconds = latency_seconds
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.requests_per_minute = requests_per_minute
+        self.retry_after_seconds = retry_after_seconds
+        self.calls = 0
+        self.errors = 0
+        self.rate_limited = 0
+        self._random = random.Random(seed)
+        self._recent = deque()
+        self._lock = threading.Lock()
+
+    def call(self):
+        """Account for one call: sleep its latency, then raise if it fails"""
+        with self._lock:
+            self.calls += 1
+            now = time.monotonic()
+            while self._recent and now - self._recent[0] > 60:
+                self._recent.popleft()
+            over_quota = self.requests_per_minute is not None and len(self._recent) >= self.requests_per_minute
+            if not over_quota:
+                self._recent.append(now)
+            draw = self._random.random()
+            latency = self.latency_seconds * self._random.lognormvariate(0, self.jitter) if self.latency_seconds else 0.0
+
+        if over_quota or draw < self.rate_limit_rate:
+            with self._lock:
+                self.rate_limited += 1
+            raise FakeServiceError(429, "Rate limit reached", retry_after=self.retry_after_seconds)
+        time.sleep(latency)
+        if draw < self.rate_limit_rate + self.error_rate:
+            with self._lock:
+                self.errors += 1
+            raise FakeServiceError(503, "Service unavailable")
+
+    def report(self):
+        with self._lock:
+            return {"calls": self.calls, "errors": self.errors, "rate_limited": self.rate_limited}
+
+
+def synthetic_pdf_text(file_data):
+    """Text of a PDF written by synthetic_resumes, from its embedded copy or its text operators"""
+    match = SYNTHETIC_TEXT_PATTERN.search(file_data)
+    if match:
+        return bytes.fromhex(match.group(1).decode("ascii")).decode("utf-8")
+    lines = [re.sub(rb"\\(.)", rb"\1", line).decode("latin-1") for line in PDF_TEXT_PATTERN.findall(file_data)]
+    return "\n".join(lines)
+
+
+def fake_verdict(text):
+    """Deterministic candidate_resume verdict of a resume text"""
+    fields = extract_contact_fields(text)
+    if GOOD_PATTERN.search(text):
+        category, justification = "good", "Experience in international voice or debt collection processes."
+    elif AVERAGE_PATTERN.search(text):
+        category, justification = "average", "Experience in customer service or sales roles."
+    else:
+        category, justification = "unsuitable", "No voice process, customer service or sales experience."
+    return {
+        "name": fields["name"] or "N/A",
+        "mobile": fields["mobile"] or "N/A",
+        "email": fields["email"] or "N/A",
+        "category": category,
+        "justification": justification,
+        "special_remarks": fields["special_remarks"] or "other_state",
+    }
+
+
+def message_text(message):
+    content = message["content"]
+    if isinstance(content, list):
+        return "".join(part.get("text", "") for part in content)
+    return content
+
+
+def completion(content, messages):
+    """Chat completion object with the usage counts of a real one"""
+    prompt_tokens = sum(count_tokens(message_text(message)) for message in messages)
+    completion_tokens = count_tokens(content)
+    return SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(role="assistant", content=content), finish_reason="stop")],
+        usage=SimpleNamespace(
+            prompt_tokens=prompt_tokens, completion_tokens=completion_tokens, total_tokens=prompt_tokens + completion_tokens
+        ),
+    )
+
+
+class _Completions:
+    def __init__(self, behavior, respond):
+        self.behavior = behavior
+        self.respond = respond
+
+    def create(self, messages, **kwargs):
+        self.behavior.call()
+        return completion(self.respond(messages, kwargs), messages)
+
+
+class FakeGroq:
+    """Groq client whose analyzer model reasons in <think> tags, then writes its evaluation as "Key: value" lines"""
+
+    def __init__(self, behavior=None):
+        self.behavior = behavior or ServiceBehavior()
+        self.chat = SimpleNamespace(completions=_Completions(self.behavior, self.respond))
+
+    @staticmethod
+    def respond(messages, kwargs):
+        verdict = fake_verdict(message_text(messages[-1]))
+        lines = [f"{key}: {value}" for key, value in verdict.items()]
+        return "<think>Reviewing the candidate's experience and location.</think>\n" + "\n".join(lines)
+
+
+class FakeOpenAI:
+    """OpenAI client answering the structuring call (from the analyzer's "Key: value" lines) and the single-pass
+    call (from the resume text) with candidate_resume JSON"""
+
+    def __init__(self, behavior=None):
+        self.behavior = behavior or ServiceBehavior()
+        self.chat = SimpleNamespace(completions=_Completions(self.behavior, self.respond))
+
+    @staticmethod
+    def respond(messages, kwargs):
+        text = message_text(messages[-1])
+        pairs = dict(re.findall(r"^(\w+): (.*)$", text, flags=re.M))
+        if set(pairs) >= {"name", "mobile", "email", "category", "justification", "special_remarks"}:
+            return json.dumps({key: pairs[key] for key in ("name", "mobile", "email", "category", "justification", "special_remarks")})
+        return json.dumps(fake_verdict(text))
+
+
+class FakeLlamaParse:
+    """LlamaParse parser returning the text of synthetic resumes as one document"""
+
+    def __init__(self, behavior=None):
+        self.behavior = behavior or ServiceBehavior()
+
+    def load_data(self, file_source, extra_info=None):
+        self.behavior.call()
+        if not isinstance(file_source, bytes):
+            raise FakeServiceError(400, "The fake parser only reads file bytes")
+        return [SimpleNamespace(text=synthetic_pdf_text(file_source), metadata=dict(extra_info or {}))]
+
+    def __call__(self):
+        # Also serves as its own parser factory for service_clients
+        return self
+
+
+class _Query:
+    """Chainable table query of FakeSupabase; filters, ordering and limits apply on execute()"""
+
+    def __init__(self, database, table):
+        self.database = database
+        self.table = table
+        self.action = "select"
+        self.rows = None
+        self.conflict_columns = None
+        self.filters = []
+        self.order_column = None
+        self.row_limit = None
+
+    def select(self, columns="*"):
+        self.action = "select"
+        return self
+
+    def insert(self, rows):
+        self.action, self.rows = "insert", rows if isinstance(rows, list) else [rows]
+        return self
+
+    def upsert(self, rows, on_conflict=None):
+        self.action, self.rows = "upsert", rows if isinstance(rows, list) else [rows]
+        self.conflict_columns = on_conflict.split(",") if on_conflict else None
+        return self
+
+    def delete(self):
+        self.action = "delete"
+        return self
+
+    def eq(self, column, value):
+        self.filters.append(lambda row: row.get(column) == value)
+        return self
+
+    def gt(self, column, value):
+        self.filters.append(lambda row: row.get(column) is not None and row[column] > value)
+        return self
+
+    def in_(self, column, values):
+        self.filters.append(lambda row: row.get(column) in values)
+        return self
+
+    def lt(self, column, value):
+        self.filters.append(lambda row: row.get(column) is not None and row[column] < value)
+        return self
+
+    def order(self, column, desc=False):
+        self.order_column = (column, desc)
+        return self
+
+    def limit(self, count):
+        self.row_limit = count
+        return self
+
+    def execute(self):
+        self.database.behavior.call()
+        return SimpleNamespace(data=self.database.run(self))
+
+
+class FakeSupabase:
+    """In-memory Supabase client: storage uploads (409 on an existing path) and the table queries of the engine"""
+
+    def __init__(self, behavior=None):
+        self.behavior = behavior or ServiceBehavior()
+        self.tables = {}
+        self.objects = {}
+        self._next_id = 1
+        self._lock = threading.Lock()
+        self.storage = SimpleNamespace(from_=self._bucket)
+
+    def _bucket(self, bucket):
+        def upload(path, file_data, file_options=None):
+            self.behavior.call()
+            with self._lock:
+                if (bucket, path) in self.objects:
+                    raise FakeServiceError(409, "The resource already exists (Duplicate)")
+                # Only the size is kept, the benchmark must not hold every uploaded file in memory
+                self.objects[(bucket, path)] = len(file_data)
+            return SimpleNamespace(path=path)
+        return SimpleNamespace(upload=upload)
+
+    def table(self, name):
+        return _Query(self, name)
+
+    def run(self, query):
+        with self._lock:
+            rows = self.tables.setdefault(query.table, [])
+            if query.action in ("insert", "upsert"):
+                written = []
+                for row in query.rows:
+                    existing = None
+                    if query.conflict_columns:
+                        key = [row.get(column) for column in query.conflict_columns]
+                        existing = next((r for r in rows if [r.get(column) for column in query.conflict_columns] == key), None)
+                    if existing is not None:
+                        existing.update(row)
+                        written.append(dict(existing))
+                        continue
+                    stored = dict(row, id=self._next_id, created_at=datetime.datetime.now(datetime.timezone.utc).isoformat())
+                    self._next_id += 1
+                    rows.append(stored)
+                    written.append(dict(stored))
+                return written
+
+            selected = [row for row in rows if all(check(row) for check in query.filters)]
+            if query.action == "delete":
+                self.tables[query.table] = [row for row in rows if row not in selected]
+                return [dict(row) for row in selected]
+            if query.order_column:
+                column, desc = query.order_column
+                selected.sort(key=lambda row: row.get(column), reverse=desc)
+            if query.row_limit is not None:
+                selected = selected[:query.row_limit]
+            return [dict(row) for row in selected]
+
+
+def install_fake_services(behaviors=None):
+    """Replace the service clients with fakes; `behaviors` maps a service name to its ServiceBehavior.
+
+    Returns {service name: fake client}.
+    """
+    behaviors = behaviors or {}
+    fakes = {
+        "llamaparse": FakeLlamaParse(behaviors.get("llamaparse")),
+        "groq": FakeGroq(behaviors.get("groq")),
+        "openai": FakeOpenAI(behaviors.get("openai")),
+        "supabase": FakeSupabase(behaviors.get("supabase")),
+    }
+    for name, fake in fakes.items():
+        service_clients.set_client(name, fake)
+    return fakes
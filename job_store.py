@@ -0,0 +1,321 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+
+# Default location of the job database and of the saved ZIP archives
+DEFAULT_JOB_DB_PATH = os.path.join(".cache", "jobs.sqlite3")
+DEFAULT_JOBS_DIRECTORY = os.path.join(".cache", "jobs")
+
+# Per-file stages, in pipeline order. The storage upload runs alongside them and is tracked by `url`.
+STAGES = ("pending", "parsed", "analyzed", "saved")
+
+# Job statuses: waiting for a worker, claimed by a worker, all files saved, finished with failed files
+JOB_STATUSES = ("queued", "running", "completed", "incomplete")
+
+# A running job whose worker has not sent a heartbeat for this long is considered abandoned
+DEFAULT_STALE_SECONDS = 120
+
+# Columns added after the first version of the jobs table
+JOB_COLUMN_MIGRATIONS = {
+    "force_reprocess": "INTEGER NOT NULL DEFAULT 0",
+    "worker_id": "TEXT",
+    "heartbeat_at": "REAL",
+    "summary": "TEXT",
+    "tenant": "TEXT NOT NULL DEFAULT 'default'",
+    "priority": "INTEGER NOT NULL DEFAULT 0",
+    "total_files": "INTEGER NOT NULL DEFAULT 0",
+    "started_at": "REAL",
+}
+
+# Columns added after the first version of the job_files table
+JOB_FILE_COLUMN_MIGRATIONS = {
+    "fallback_reason": "TEXT",
+}
+
+# Files of a job that are not saved yet. A job is "small" by this count, so a requeued large job with few
+# files left is claimed (and scheduled) as small.
+REMAINING_FILES = "(SELECT COUNT(*) FROM job_files WHERE job_files.job_id = jobs.job_id AND job_files.stage != 'saved')"
+
+# Claim order of the work queue: priority, then small jobs, then the tenant running the fewest jobs, then age
+CLAIM_ORDER = f"""priority DESC, {REMAINING_FILES} <= :small_job_files DESC,
+    (SELECT COUNT(*) FROM jobs AS running WHERE running.tenant = jobs.tenant AND running.status = 'running') ASC,
+    created_at"""
+
+
+class JobStore:
+    """Durable SQLite record of processing jobs and the stage reached by each of their files.
+
+    A job's ZIP archive is kept on disk next to the database, so an interrupted job can be resumed
+    after a Streamlit rerun or a restart, processing only the files that were not saved yet.
+    The jobs table doubles as the work queue: workers (in any process sharing the database file)
+    claim queued jobs and abandoned running jobs with claim_next_job(), in CLAIM_ORDER.
+
+    The queue is single-host. The database runs in WAL mode, whose shared-memory index doesn't work across
+    machines, so the file must be on a local disk, not on a network filesystem shared by several hosts.
+    """
+
+    def __init__(self, path=DEFAULT_JOB_DB_PATH, jobs_directory=DEFAULT_JOBS_DIRECTORY):
+        self.path = path
+        self.jobs_directory = jobs_directory
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        os.makedirs(jobs_directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS jobs (
+                    job_id TEXT PRIMARY KEY,
+                    zip_name TEXT NOT NULL,
+                    zip_hash TEXT NOT NULL,
+                    zip_path TEXT NOT NULL,
+                    storage_folder TEXT NOT NULL,
+                    analysis_mode TEXT,
+                    batch_mode INTEGER NOT NULL DEFAULT 0,
+                    status TEXT NOT NULL DEFAULT 'running',
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                )"""
+            )
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS job_files (
+                    job_id TEXT NOT NULL,
+                    file_index INTEGER NOT NULL,
+                    file_name TEXT NOT NULL,
+                    content_hash TEXT,
+                    stage TEXT NOT NULL DEFAULT 'pending',
+                    url TEXT,
+                    tier TEXT,
+                    error TEXT,
+                    updated_at REAL NOT NULL,
+                    PRIMARY KEY (job_id, file_index)
+                )"""
+            )
+            existing_columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+            for column, definition in JOB_COLUMN_MIGRATIONS.items():
+                if column not in existing_columns:
+                    self._conn.execute(f"ALTER TABLE jobs ADD COLUMN {column} {definition}")
+            existing_file_columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(job_files)")}
+            for column, definition in JOB_FILE_COLUMN_MIGRATIONS.items():
+                if column not in existing_file_columns:
+                    self._conn.execute(f"ALTER TABLE job_files ADD COLUMN {column} {definition}")
+            if "total_files" not in existing_columns:
+                self._conn.execute(
+                    "UPDATE jobs SET total_files = (SELECT COUNT(*) FROM job_files WHERE job_files.job_id = jobs.job_id)"
+                )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, zip_hash)")
+            # Recently saved files, for the queue's throughput and ETAs (count_saved_since)
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_job_files_saved ON job_files (stage, updated_at)")
+
+    def zip_path_for(self, job_id):
+        return os.path.join(self.jobs_directory, f"{job_id}.zip")
+
+    def create_job(self, job_id, zip_name, zip_hash, storage_folder, file_names, analysis_mode=None, batch_mode=False,
+                   force_reprocess=False, tenant="default", priority=0):
+        """Queue a job and create its per-file rows. The ZIP must already be stored at zip_path_for(job_id)."""
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                """INSERT INTO jobs (job_id, zip_name, zip_hash, zip_path, storage_folder, analysis_mode, batch_mode,
+                                     force_reprocess, tenant, priority, total_files, status, created_at, updated_at)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 'queued', ?, ?)""",
+                (job_id, zip_name, zip_hash, self.zip_path_for(job_id), storage_folder, analysis_mode, int(batch_mode),
+                 int(force_reprocess), tenant, priority, len(file_names), now, now)
+            )
+            self._conn.executemany(
+                "INSERT INTO job_files (job_id, file_index, file_name, updated_at) VALUES (?, ?, ?, ?)",
+                [(job_id, i, file_name, now) for i, file_name in enumerate(file_names)]
+            )
+        return self.get_job(job_id)
+
+    def get_job(self, job_id):
+        """A job's row, with its `remaining_files` count"""
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT jobs.*, {REMAINING_FILES} AS remaining_files FROM jobs WHERE job_id = ?", (job_id,)
+            ).fetchone()
+        return dict(row) if row else None
+
+    def find_unfinished_job(self, zip_hash):
+        """Most recent job for the same ZIP content that is not completed, if any"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM jobs WHERE zip_hash = ? AND status != 'completed' ORDER BY created_at DESC LIMIT 1", (zip_hash,)
+            ).fetchone()
+        return dict(row) if row else None
+
+    def list_unfinished_jobs(self):
+        """Jobs that are not completed, with their saved/total file counts, newest first"""
+        with self._lock:
+            rows = self._conn.execute(
+                """SELECT jobs.*, COUNT(job_files.file_index) AS total_files,
+                          SUM(CASE WHEN job_files.stage = 'saved' THEN 1 ELSE 0 END) AS saved_files
+                   FROM jobs JOIN job_files ON job_files.job_id = jobs.job_id
+                   WHERE jobs.status != 'completed'
+                   GROUP BY jobs.job_id
+                   ORDER BY jobs.created_at DESC"""
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def stage_counts(self, job_id):
+        """{stage: number of files} of a job, plus "failed" for unsaved files that failed in the current (or last) pass"""
+        with self._lock:
+            rows = self._conn.execute(
+                """SELECT CASE WHEN stage != 'saved' AND error IS NOT NULL THEN 'failed' ELSE stage END AS state, COUNT(*)
+                   FROM job_files WHERE job_id = ? GROUP BY state""", (job_id,)
+            ).fetchall()
+        return {state: count for state, count in rows}
+
+    def claim_next_job(self, worker_id, stale_seconds=DEFAULT_STALE_SECONDS, small_job_files=0, small_only=False,
+                       tenant_max_jobs=None):
+        """Atomically claim the next queued job in CLAIM_ORDER, or a running job whose worker stopped sending heartbeats.
+
+        With `small_only` only jobs with at most `small_job_files` files left are claimed. Tenants already
+        running `tenant_max_jobs` jobs are skipped.
+        """
+        now = time.time()
+        with self._lock:
+            # BEGIN IMMEDIATE takes the write lock up front, so two worker processes can't claim the same job
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    f"""SELECT job_id FROM jobs
+                        WHERE (status = 'queued' OR (status = 'running' AND COALESCE(heartbeat_at, updated_at) < :stale_before))
+                          AND (NOT :small_only OR {REMAINING_FILES} <= :small_job_files)
+                          AND (:tenant_max_jobs IS NULL OR (
+                              SELECT COUNT(*) FROM jobs AS running
+                              WHERE running.tenant = jobs.tenant AND running.status = 'running'
+                                AND COALESCE(running.heartbeat_at, running.updated_at) >= :stale_before
+                          ) < :tenant_max_jobs)
+                        ORDER BY {CLAIM_ORDER} LIMIT 1""",
+                    {"stale_before": now - stale_seconds, "small_only": int(small_only), "small_job_files": small_job_files,
+                     "tenant_max_jobs": tenant_max_jobs}
+                ).fetchone()
+                if row is not None:
+                    self._mark_claimed(row["job_id"], worker_id, now)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return self.get_job(row["job_id"]) if row is not None else None
+
+    def list_active_jobs(self, small_job_files=0):
+        """Running jobs, then queued jobs in CLAIM_ORDER, with their remaining (unsaved) file counts"""
+        with self._lock:
+            rows = self._conn.execute(
+                f"""SELECT jobs.*, {REMAINING_FILES} AS remaining_files
+                    FROM jobs WHERE status IN ('queued', 'running')
+                    ORDER BY status = 'running' DESC, {CLAIM_ORDER}""",
+                {"small_job_files": small_job_files}
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def count_saved_since(self, since, job_id=None):
+        """Files saved after the `since` timestamp, of one job or of every job"""
+        query = "SELECT COUNT(*) FROM job_files WHERE stage = 'saved' AND updated_at >= ?"
+        params = [since]
+        if job_id is not None:
+            query += " AND job_id = ?"
+            params.append(job_id)
+        with self._lock:
+            return self._conn.execute(query, params).fetchone()[0]
+
+    def list_saved_since(self, job_id, since):
+        """(file_index, content_hash, updated_at) of a job's files saved at or after the `since` timestamp"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT file_index, content_hash, updated_at FROM job_files WHERE job_id = ? AND stage = 'saved' AND updated_at >= ?",
+                (job_id, since)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def claim_job(self, job_id, worker_id):
+        """Claim a specific job for in-process execution (e.g. the CLI)"""
+        with self._lock, self._conn:
+            self._mark_claimed(job_id, worker_id, time.time())
+        return self.get_job(job_id)
+
+    def _mark_claimed(self, job_id, worker_id, now):
+        self._conn.execute(
+            "UPDATE jobs SET status = 'running', worker_id = ?, heartbeat_at = ?, started_at = ?, updated_at = ? WHERE job_id = ?",
+            (worker_id, now, now, now, job_id)
+        )
+        # Errors of an earlier pass don't apply to the files this pass retries
+        self._conn.execute("UPDATE job_files SET error = NULL WHERE job_id = ? AND stage != 'saved' AND error IS NOT NULL", (job_id,))
+
+    def heartbeat(self, job_id):
+        with self._lock, self._conn:
+            self._conn.execute("UPDATE jobs SET heartbeat_at = ? WHERE job_id = ?", (time.time(), job_id))
+
+    def requeue_job(self, job_id):
+        """Put an incomplete or abandoned job back on the queue; workers only process its unsaved files"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE jobs SET status = 'queued', worker_id = NULL, updated_at = ? WHERE job_id = ?", (time.time(), job_id)
+            )
+
+    def complete_job(self, job_id, summary=None):
+        """Record a finished worker pass: completed if every file is saved, otherwise incomplete"""
+        with self._lock, self._conn:
+            unsaved = self._conn.execute(
+                "SELECT COUNT(*) FROM job_files WHERE job_id = ? AND stage != 'saved'", (job_id,)
+            ).fetchone()[0]
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, summary = ?, updated_at = ? WHERE job_id = ?",
+                ("incomplete" if unsaved else "completed", json.dumps(summary) if summary is not None else None, time.time(), job_id)
+            )
+        if not unsaved:
+            self.delete_zip(job_id)
+
+    def get_summary(self, job_id):
+        job = self.get_job(job_id)
+        return json.loads(job["summary"]) if job and job["summary"] else None
+
+    def get_files(self, job_id):
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM job_files WHERE job_id = ? ORDER BY file_index", (job_id,)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def update_file(self, job_id, file_index, **fields):
+        """Checkpoint a file: any of stage, content_hash, url, tier, fallback_reason, error"""
+        fields["updated_at"] = time.time()
+        assignments = ", ".join(f"{column} = ?" for column in fields)
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"UPDATE job_files SET {assignments} WHERE job_id = ? AND file_index = ?",
+                (*fields.values(), job_id, file_index)
+            )
+            self._conn.execute("UPDATE jobs SET updated_at = ? WHERE job_id = ?", (fields["updated_at"], job_id))
+
+    def finish_job(self, job_id):
+        """Mark a job completed (e.g. discarded by the user) and delete its stored ZIP"""
+        with self._lock, self._conn:
+            self._conn.execute("UPDATE jobs SET status = 'completed', updated_at = ? WHERE job_id = ?", (time.time(), job_id))
+        self.delete_zip(job_id)
+
+    def remove_finished_older_than(self, cutoff):
+        """Delete completed and incomplete jobs last updated before `cutoff` (a timestamp), with their files and ZIPs"""
+        with self._lock, self._conn:
+            rows = self._conn.execute(
+                "SELECT job_id, zip_path FROM jobs WHERE status IN ('completed', 'incomplete') AND updated_at < ?", (cutoff,)
+            ).fetchall()
+            for row in rows:
+                self._conn.execute("DELETE FROM job_files WHERE job_id = ?", (row["job_id"],))
+                self._conn.execute("DELETE FROM jobs WHERE job_id = ?", (row["job_id"],))
+        for row in rows:
+            if os.path.exists(row["zip_path"]):
+                os.remove(row["zip_path"])
+        return len(rows)
+
+    def delete_zip(self, job_id):
+        job = self.get_job(job_id)
+        if job and os.path.exists(job["zip_path"]):
+            os.remove(job["zip_path"])
@@ -0,0 +1,83 @@
+import io
+import re
+
+# Optional local extractors; without them every file falls back to LlamaParse
+try:
+    from pypdf import PdfReader
+except ImportError:
+    PdfReader = None
+
+try:
+    import docx
+except ImportError:
+    docx = None
+
+# Quality thresholds a locally extracted text must pass to skip LlamaParse
+MIN_TEXT_CHARS = 200
+MIN_CHARS_PER_PAGE = 100
+MIN_PRINTABLE_RATIO = 0.9
+MIN_ALPHA_RATIO = 0.5
+MAX_GARBLED_RATIO = 0.01
+
+# pdfminer/pypdf emit "(cid:123)" for glyphs without a unicode mapping
+CID_PATTERN = re.compile(r"\(cid:\d+\)")
+
+
+def _extract_pdf(file_data):
+    reader = PdfReader(io.BytesIO(file_data))
+    pages = [page.extract_text() or "" for page in reader.pages]
+    return "\n\n".join(pages), len(pages)
+
+
+def _extract_docx(file_data):
+    document = docx.Document(io.BytesIO(file_data))
+    parts = [paragraph.text for paragraph in document.paragraphs]
+    # Many resume templates put their content in tables
+    for table in document.tables:
+        for row in table.rows:
+            parts.append(" | ".join(cell.text for cell in row.cells))
+    return "\n".join(parts), 1
+
+
+def check_text_quality(text, page_count):
+    """Return None if the text looks usable, otherwise the reason it doesn't"""
+    stripped = text.strip()
+    if len(stripped) < MIN_TEXT_CHARS:
+        return "too little text"
+    if len(stripped) / max(page_count, 1) < MIN_CHARS_PER_PAGE:
+        return "scanned or image-only pages"
+
+    non_space = [c for c in stripped if not c.isspace()]
+    printable = sum(1 for c in non_space if c.isprintable() and c != "\ufffd")
+    if printable / len(non_space) < MIN_PRINTABLE_RATIO:
+        return "garbled encoding"
+    alpha = sum(1 for c in non_space if c.isalpha())
+    if alpha / len(non_space) < MIN_ALPHA_RATIO:
+        return "garbled encoding"
+    garbled = len(CID_PATTERN.findall(stripped)) + stripped.count("\ufffd")
+    if garbled / len(non_space) > MAX_GARBLED_RATIO:
+        return "garbled encoding"
+    return None
+
+
+def extract_text_locally(file_data, file_name):
+    """Extract text from PDF/DOCX bytes without a network call.
+
+    Returns (text, None) when the local text passes the quality checks, or (None, reason) when the
+    file should go to LlamaParse instead.
+    """
+    extension = file_name.lower().rsplit(".", 1)[-1]
+    try:
+        if extension == "pdf" and PdfReader is not None:
+            text, page_count = _extract_pdf(file_data)
+        elif extension == "docx" and docx is not None:
+            text, page_count = _extract_docx(file_data)
+        else:
+            return None, f"no local extractor for .{extension}"
+    except Exception as e:
+        return None, f"local extraction failed: {str(e)}"
+
+    reason = check_text_quality(text, page_count)
+    if reason:
+        return None, reason
+    return text, None
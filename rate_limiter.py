@@ -0,0 +1,241 @@
+import time
+import random
+import threading
+import email.utils
+from contextlib import contextmanager
+
+import telemetry
+
+# Default quotas per backend, overridable from the [rate_limits.<backend>] sections of st.secrets
+DEFAULT_LIMITS = {
+    "llamaparse": {"requests_per_minute": 60, "tokens_per_minute": None, "max_concurrency": 4},
+    "groq": {"requests_per_minute": 30, "tokens_per_minute": 6000, "max_concurrency": 4},
+    "openai": {"requests_per_minute": 500, "tokens_per_minute": 30000, "max_concurrency": 8},
+    "supabase": {"requests_per_minute": 600, "tokens_per_minute": None, "max_concurrency": 8},
+}
+
+# HTTP status codes that are worth retrying
+RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+
+
+class RateLimitExceeded(Exception):
+    """Raised when a call is still being throttled after all retries"""
+
+
+class _TokenBucket:
+    """Refilling bucket holding up to `per_minute` units, refilled continuously"""
+
+    def __init__(self, per_minute):
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def refill(self, now, factor):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate * factor)
+        self.updated = now
+
+    def wait_time(self, amount, factor):
+        # A single request larger than the whole bucket is allowed once the bucket is full
+        amount = min(amount, self.capacity)
+        if self.level >= amount:
+            return 0.0
+        return (amount - self.level) / (self.rate * factor)
+
+    def take(self, amount):
+        self.level -= min(amount, self.capacity)
+
+
+class RateLimiter:
+    """Shared requests/min + tokens/min + concurrency limiter for one backend.
+
+    The effective rate adapts: every throttled response halves it and every success
+    slowly restores it, so the pipeline settles right below the provider's quota.
+    """
+
+    def __init__(self, name, requests_per_minute=None, tokens_per_minute=None, max_concurrency=None):
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self._requests = _TokenBucket(requests_per_minute) if requests_per_minute else None
+        self._tokens = _TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self._factor = 1.0
+        self._blocked_until = 0.0
+        self._in_flight = 0
+        self._cond = threading.Condition()
+        self.throttled_count = 0
+
+    def _buckets(self):
+        return [bucket for bucket in (self._requests, self._tokens) if bucket is not None]
+
+    def acquire(self, tokens=0):
+        """Block until a request costing `tokens` may be sent"""
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                for bucket in self._buckets():
+                    bucket.refill(now, self._factor)
+
+                wait = self._blocked_until - now
+                if wait <= 0:
+                    waits = []
+                    if self._requests is not None:
+                        waits.append(self._requests.wait_time(1, self._factor))
+                    if self._tokens is not None:
+                        waits.append(self._tokens.wait_time(tokens, self._factor))
+                    wait = max(waits, default=0.0)
+
+                if wait <= 0 and (self.max_concurrency is None or self._in_flight < self.max_concurrency):
+                    if self._requests is not None:
+                        self._requests.take(1)
+                    if self._tokens is not None:
+                        self._tokens.take(tokens)
+                    self._in_flight += 1
+                    return
+
+                # Wait for the buckets to refill, or for a running call to release its slot
+                self._cond.wait(timeout=wait if wait > 0 else None)
+
+    def release(self):
+        with self._cond:
+            self._in_flight -= 1
+            self._cond.notify_all()
+
+    @contextmanager
+    def limit(self, tokens=0):
+        self.acquire(tokens)
+        try:
+            yield
+        finally:
+            self.release()
+
+    def record_usage(self, actual_tokens, estimated_tokens):
+        """Correct the token bucket once the real usage of a call is known"""
+        if self._tokens is None or actual_tokens is None:
+            return
+        with self._cond:
+            self._tokens.level -= actual_tokens - min(estimated_tokens, self._tokens.capacity)
+
+    def on_success(self):
+        with self._cond:
+            self._factor = min(1.0, self._factor + 0.05)
+
+    def on_throttled(self, retry_after=None):
+        """Slow the whole backend down after a 429, pausing every caller for `retry_after` seconds"""
+        with self._cond:
+            self.throttled_count += 1
+            self._factor = max(0.1, self._factor * 0.5)
+            if retry_after:
+                self._blocked_until = max(self._blocked_until, time.monotonic() + retry_after)
+            self._cond.notify_all()
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def configure_limiters(config=None):
+    """(Re)build the per-backend limiters from DEFAULT_LIMITS overridden by `config`"""
+    config = config or {}
+    with _limiters_lock:
+        _limiters.clear()
+        for name in set(DEFAULT_LIMITS) | set(config):
+            settings = dict(DEFAULT_LIMITS.get(name, {}))
+            settings.update(config.get(name, {}))
+            _limiters[name] = RateLimiter(name, **settings)
+
+
+def get_limiter(name):
+    """Return the shared limiter for a backend, creating it with defaults if needed"""
+    with _limiters_lock:
+        if name not in _limiters:
+            _limiters[name] = RateLimiter(name, **DEFAULT_LIMITS.get(name, {}))
+        return _limiters[name]
+
+
+def get_status_code(error):
+    """Best-effort HTTP status code of an SDK exception"""
+    status = getattr(error, "status_code", None) or getattr(error, "code", None)
+    if status is None:
+        response = getattr(error, "response", None)
+        status = getattr(response, "status_code", None)
+    try:
+        return int(status)
+    except (TypeError, ValueError):
+        return None
+
+
+def get_retry_after(error):
+    """Seconds to wait according to the Retry-After headers of an SDK exception, if any"""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+
+    retry_after_ms = headers.get("retry-after-ms")
+    if retry_after_ms:
+        try:
+            return float(retry_after_ms) / 1000.0
+        except ValueError:
+            pass
+
+    retry_after = headers.get("retry-after")
+    if not retry_after:
+        return None
+    try:
+        return float(retry_after)
+    except ValueError:
+        # HTTP-date form
+        try:
+            retry_at = email.utils.parsedate_to_datetime(retry_after)
+        except (TypeError, ValueError):
+            return None
+        return max(0.0, retry_at.timestamp() - time.time())
+
+
+def is_rate_limited(error):
+    return get_status_code(error) == 429 or type(error).__name__ == "RateLimitError"
+
+
+def is_retryable(error):
+    if is_rate_limited(error):
+        return True
+    if get_status_code(error) in RETRYABLE_STATUS_CODES:
+        return True
+    # Timeouts and dropped connections from httpx/openai/groq/supabase clients
+    name = type(error).__name__
+    return "Timeout" in name or "Connection" in name
+
+
+def backoff_delay(attempt, base_delay=1.0, max_delay=60.0):
+    """Exponential backoff with full jitter"""
+    return random.uniform(0, min(max_delay, base_delay * (2 ** attempt)))
+
+
+def call_with_retry(limiter, func, *args, tokens=0, max_retries=5, base_delay=1.0, max_delay=60.0,
+                    usage_tokens=None, retry_on=None, **kwargs):
+    """Call func(*args, **kwargs) under `limiter`, retrying throttled and transient failures.
+
+    `usage_tokens(result)` may return the tokens actually consumed so the limiter can correct its estimate.
+    `retry_on(error)` overrides which exceptions are retried (defaults to is_retryable).
+    """
+    retry_on = retry_on or is_retryable
+    for attempt in range(max_retries + 1):
+        try:
+            with limiter.limit(tokens):
+                result = func(*args, **kwargs)
+        except Exception as e:
+            if not retry_on(e) or attempt == max_retries:
+                if is_rate_limited(e):
+                    raise RateLimitExceeded(f"{limiter.name}: still rate limited after {max_retries} retries") from e
+                raise
+            retry_after = get_retry_after(e)
+            if is_rate_limited(e):
+                limiter.on_throttled(retry_after)
+            telemetry.record_retry(e)
+            time.sleep(retry_after if retry_after is not None else backoff_delay(attempt, base_delay, max_delay))
+            continue
+
+        limiter.on_success()
+        if usage_tokens is not None:
+            limiter.record_usage(usage_tokens(result), tokens)
+        return result
@@ -0,0 +1,106 @@
+import csv
+import json
+
+# Optional writers; the formats they provide raise a clear error without them
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+try:
+    from openpyxl import Workbook
+except ImportError:
+    Workbook = None
+
+EXPORT_FORMATS = ("csv", "json", "parquet", "xlsx")
+
+
+def export_format(path):
+    """Export format of an output path, from its extension"""
+    extension = path.lower().rsplit(".", 1)[-1]
+    if extension not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format .{extension}, use one of: {', '.join(EXPORT_FORMATS)}")
+    return extension
+
+
+def _write_csv(pages, path):
+    count = 0
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = None
+        for page in pages:
+            if writer is None:
+                writer = csv.DictWriter(f, fieldnames=list(page[0]), extrasaction="ignore")
+                writer.writeheader()
+            writer.writerows(page)
+            count += len(page)
+    return count
+
+
+def _write_json(pages, path):
+    count = 0
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("[")
+        for page in pages:
+            for row in page:
+                f.write(("," if count else "") + "\n  " + json.dumps(row, default=str))
+                count += 1
+        f.write("\n]\n")
+    return count
+
+
+def _write_parquet(pages, path):
+    if pa is None:
+        raise RuntimeError("Parquet export needs pyarrow installed")
+    count = 0
+    writer = None
+    try:
+        for page in pages:
+            if writer is None:
+                # Text columns are typed up front: a page whose column is all null would otherwise fix it as null
+                columns = list(page[0])
+                schema = pa.schema([(column, pa.int64() if column == "id" else pa.string()) for column in columns])
+                writer = pq.ParquetWriter(path, schema)
+            rows = [
+                {column: row.get(column) if column == "id" or row.get(column) is None else str(row[column]) for column in columns}
+                for row in page
+            ]
+            writer.write_table(pa.Table.from_pylist(rows, schema=schema))
+            count += len(page)
+    finally:
+        if writer is not None:
+            writer.close()
+    if writer is None:
+        pq.write_table(pa.table({}), path)
+    return count
+
+
+def _write_xlsx(pages, path):
+    if Workbook is None:
+        raise RuntimeError("Excel export needs openpyxl installed")
+    # A write-only workbook streams its rows to disk instead of keeping every cell in memory
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("Resumes")
+    count = 0
+    columns = None
+    for page in pages:
+        if columns is None:
+            columns = list(page[0])
+            sheet.append(columns)
+        for row in page:
+            sheet.append([row.get(column) for column in columns])
+        count += len(page)
+    workbook.save(path)
+    return count
+
+
+WRITERS = {"csv": _write_csv, "json": _write_json, "parquet": _write_parquet, "xlsx": _write_xlsx}
+
+
+def write_pages(pages, path, fmt=None):
+    """Write pages of rows (lists of dicts with the same keys) to `path` one page at a time.
+
+    The format ("csv", "json", "parquet" or "xlsx") defaults to the extension of `path`. Only one page is
+    held in memory at once. Returns the number of rows written.
+    """
+    return WRITERS[fmt or export_format(path)](pages, path)
@@ -0,0 +1,125 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+
+# Default location and size bound of the on-disk cache
+DEFAULT_CACHE_PATH = os.path.join(".cache", "resume_cache.sqlite3")
+DEFAULT_CACHE_MAX_BYTES = 512 * 1024 * 1024
+
+
+def content_hash(file_data):
+    """SHA-256 of the raw resume file bytes"""
+    return hashlib.sha256(file_data).hexdigest()
+
+
+def verdict_key(file_hash, analysis_fingerprint):
+    """Cache key of an LLM verdict: the file content plus the prompts/models that produced it"""
+    return f"{file_hash}:{analysis_fingerprint}"
+
+
+class ResumeCache:
+    """Persistent SQLite cache of extracted resume text and structured LLM verdicts.
+
+    Entries are evicted least-recently-used first once the stored values exceed `max_bytes`. The total size
+    is kept up to date by triggers, so a write doesn't sum the whole table, whichever process made it.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_bytes=DEFAULT_CACHE_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.hits = {"text": 0, "verdict": 0}
+        self.misses = {"text": 0, "verdict": 0}
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            # INSERT OR REPLACE only fires the delete trigger of the replaced row with recursive triggers on
+            self._conn.execute("PRAGMA recursive_triggers = ON")
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS cache_entries (
+                    kind TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    last_access REAL NOT NULL,
+                    PRIMARY KEY (kind, key)
+                )"""
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_last_access ON cache_entries (last_access)")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS cache_size (id INTEGER PRIMARY KEY CHECK (id = 0), total INTEGER NOT NULL)")
+            # Caches created before the running total start from the size of their entries
+            self._conn.execute(
+                "INSERT OR IGNORE INTO cache_size (id, total) SELECT 0, COALESCE(SUM(size), 0) FROM cache_entries"
+            )
+            self._conn.execute(
+                """CREATE TRIGGER IF NOT EXISTS cache_size_insert AFTER INSERT ON cache_entries
+                   BEGIN UPDATE cache_size SET total = total + NEW.size WHERE id = 0; END"""
+            )
+            self._conn.execute(
+                """CREATE TRIGGER IF NOT EXISTS cache_size_delete AFTER DELETE ON cache_entries
+                   BEGIN UPDATE cache_size SET total = total - OLD.size WHERE id = 0; END"""
+            )
+
+    def _get(self, kind, key):
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT value FROM cache_entries WHERE kind = ? AND key = ?", (kind, key)
+            ).fetchone()
+            if row is None:
+                self.misses[kind] += 1
+                return None
+            self.hits[kind] += 1
+            self._conn.execute(
+                "UPDATE cache_entries SET last_access = ? WHERE kind = ? AND key = ?", (time.time(), kind, key)
+            )
+            return row[0]
+
+    def _put(self, kind, key, value):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache_entries (kind, key, value, size, last_access) VALUES (?, ?, ?, ?, ?)",
+                (kind, key, value, len(value.encode("utf-8")), time.time())
+            )
+            self._evict()
+
+    def _total_size(self):
+        return self._conn.execute("SELECT total FROM cache_size WHERE id = 0").fetchone()[0]
+
+    def _evict(self):
+        total = self._total_size()
+        if total <= self.max_bytes:
+            return
+        rows = self._conn.execute("SELECT kind, key, size FROM cache_entries ORDER BY last_access")
+        stale = []
+        for kind, key, size in rows:
+            if total <= self.max_bytes:
+                break
+            stale.append((kind, key))
+            total -= size
+        self._conn.executemany("DELETE FROM cache_entries WHERE kind = ? AND key = ?", stale)
+
+    def get_text(self, file_hash):
+        """Extracted markdown for a file, or None"""
+        return self._get("text", file_hash)
+
+    def put_text(self, file_hash, text):
+        self._put("text", file_hash, text)
+
+    def get_verdict(self, key):
+        """Structured verdict dictionary for a verdict_key(), or None"""
+        value = self._get("verdict", key)
+        return json.loads(value) if value is not None else None
+
+    def put_verdict(self, key, verdict):
+        self._put("verdict", key, json.dumps(verdict))
+
+    def size_bytes(self):
+        with self._lock:
+            return self._total_size()
@@ -0,0 +1,123 @@
+"""Headless entry point for the resume processing engine.
+
+    python resume_cli.py process resumes.zip --output results.csv   # zip in, CSV/JSON/Parquet/XLSX out
+    python resume_cli.py submit resumes.zip                         # queue a job for the workers
+    python resume_cli.py worker                                     # process queued jobs
+
+Workers share the queue through the job database on the local disk (JOB_DB_PATH), so they must all run on
+the host that receives the jobs.
+"""
+import os
+import sys
+import json
+import argparse
+import logging
+import threading
+
+from LLM_Analyzer import ANALYSIS_MODES
+from zip_ingest import ZipLimitError
+from result_export import export_format
+from scheduler import PRIORITY_LEVELS
+import resume_engine
+
+
+def print_progress(event):
+    if event["type"] == "file":
+        status = "ok" if event["ok"] else f"error: {event['error']}"
+        print(f"[{event['completed']}/{event['total']}] {event['file_name']}: {status}", file=sys.stderr)
+    elif event["type"] == "batch":
+        print(f"Batch {event['batch_id']}: {event['status']}", file=sys.stderr)
+
+
+def submit(args, job_store):
+    try:
+        with open(args.zip_path, "rb") as zip_file:
+            job = resume_engine.submit_job(
+                zip_file, os.path.basename(args.zip_path), job_store,
+                analysis_mode=args.mode, batch_mode=args.batch, force_reprocess=args.force,
+                tenant=args.tenant, priority=PRIORITY_LEVELS[args.priority]
+            )
+    except ZipLimitError as e:
+        print(f"Rejected {args.zip_path}: {e}", file=sys.stderr)
+        return None
+    if job is None:
+        print("No resume files found in the ZIP file.", file=sys.stderr)
+    return job
+
+
+def command_process(args, job_store):
+    try:
+        export_format(args.output)
+    except ValueError as e:
+        print(str(e), file=sys.stderr)
+        return 1
+    job = submit(args, job_store)
+    if job is None:
+        return 1
+    job = job_store.claim_job(job["job_id"], worker_id=f"cli-{os.getpid()}")
+    summary = resume_engine.run_claimed_job(job, job_store, on_progress=print_progress)
+    print(json.dumps(summary, indent=2), file=sys.stderr)
+
+    row_count = resume_engine.export_run_applicants(job["job_id"], args.output)
+    print(f"Wrote {row_count} rows to {args.output}", file=sys.stderr)
+    return 0 if summary["error_count"] == 0 else 2
+
+
+def command_submit(args, job_store):
+    job = submit(args, job_store)
+    if job is None:
+        return 1
+    print(job["job_id"])
+    return 0
+
+
+def command_worker(args, job_store):
+    stop_event = threading.Event()
+    threads = [
+        threading.Thread(
+            target=resume_engine.run_worker,
+            kwargs={"job_store": job_store, "once": args.once, "stop_event": stop_event, "max_jobs": args.max_jobs}
+        )
+        for _ in range(args.concurrency)
+    ]
+    for thread in threads:
+        thread.start()
+    try:
+        for thread in threads:
+            while thread.is_alive():
+                thread.join(timeout=1)
+    except KeyboardInterrupt:
+        # Finish nothing new; running jobs are picked up again by any worker once their heartbeat goes stale
+        stop_event.set()
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk resume processor")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    for name in ("process", "submit"):
+        subparser = subparsers.add_parser(name)
+        subparser.add_argument("zip_path", help="ZIP file containing .pdf/.doc/.docx resumes")
+        subparser.add_argument("--mode", choices=ANALYSIS_MODES, default=None, help="LLM analysis mode")
+        subparser.add_argument("--batch", action="store_true", help="Use offline provider batch jobs")
+        subparser.add_argument("--force", action="store_true", help="Ignore cached parse results and verdicts")
+        subparser.add_argument("--tenant", default="default", help="Recruiter or team the job is fairly shared with")
+        subparser.add_argument("--priority", choices=PRIORITY_LEVELS, default="normal", help="Queue priority of the job")
+    subparsers.choices["process"].add_argument("--output", "-o", default="resume_analysis.csv", help="Output .csv, .json, .parquet or .xlsx file")
+
+    worker_parser = subparsers.add_parser("worker")
+    worker_parser.add_argument("--concurrency", type=int, default=1, help="Jobs processed in parallel by this worker")
+    worker_parser.add_argument("--once", action="store_true", help="Exit when the queue is empty")
+    worker_parser.add_argument("--max-jobs", type=int, default=None, help="Jobs each worker runs at once (WORKER_MAX_JOBS)")
+
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    job_store = resume_engine.get_job_store()
+    commands = {"process": command_process, "submit": command_submit, "worker": command_worker}
+    return commands[args.command](args, job_store)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,1035 @@
+import os
+import re
+import time
+import uuid
+import socket
+import hashlib
+import logging
+import datetime
+import functools
+import threading
+import zipfile
+from itertools import chain
+import telemetry
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed, wait, FIRST_COMPLETED
+import pandas as pd
+from app_config import get_setting, get_section, get_bool_setting
+from LLM_Analyzer import llm_resume_analysis, analysis_fingerprint, rule_classification, ANALYSIS_MODE
+from rule_extractor import extract_contact_fields, merge_rule_fields
+from dedup_index import DuplicateIndex, minhash_signature, DEFAULT_DEDUP_PATH, DEFAULT_THRESHOLD, DEFAULT_CONTACT_THRESHOLD
+from local_extractor import extract_text_locally
+from supabase_writer import BulkApplicantWriter, DEFAULT_FLUSH_ROWS, DEFAULT_FLUSH_SECONDS
+from batch_processor import run_batch_analysis, batch_usage_stats, remove_batch_directories_older_than, OpenAIBatchProvider, MockBatchProvider
+from job_store import JobStore, DEFAULT_JOB_DB_PATH, DEFAULT_JOBS_DIRECTORY, DEFAULT_STALE_SECONDS
+from resume_cache import ResumeCache, content_hash, verdict_key, DEFAULT_CACHE_PATH, DEFAULT_CACHE_MAX_BYTES
+from telemetry import Tracer, DEFAULT_TRACE_DIRECTORY
+from result_export import write_pages
+from scheduler import (
+    FairScheduler, scheduled_job, DEFAULT_SMALL_JOB_FILES, DEFAULT_RESERVED_SLOTS, DEFAULT_AGING_SECONDS
+)
+from service_clients import get_client, new_parser
+from zip_ingest import (
+    ZipLimitError, MemoryBudget, check_archive, check_member, read_member, DEFAULT_MAX_FILE_BYTES,
+    DEFAULT_MAX_TOTAL_BYTES, DEFAULT_MAX_MEMBERS, DEFAULT_MAX_COMPRESSION_RATIO, DEFAULT_IN_FLIGHT_BYTES
+)
+from rate_limiter import configure_limiters, get_limiter, call_with_retry, backoff_delay, get_retry_after, is_rate_limited, get_status_code
+
+logger = logging.getLogger(__name__)
+
+# Supabase project; the Supabase and LlamaParse clients come from service_clients, built on first use
+supabase_url = get_setting("SUPABASE_URL")
+
+# Per-backend rate limits (requests/min, tokens/min, concurrency) from the rate_limits settings section
+configure_limiters(get_section("rate_limits"))
+
+# Pipeline concurrency: maximum number of resumes in flight in each stage at once. Uploads are bounded per job;
+# the parse and analysis slots are shared by all the jobs a worker process runs, through STAGE_SCHEDULERS.
+UPLOAD_CONCURRENCY = int(get_setting("UPLOAD_CONCURRENCY", 4))
+PARSE_CONCURRENCY = int(get_setting("PARSE_CONCURRENCY", 4))
+ANALYSIS_CONCURRENCY = int(get_setting("ANALYSIS_CONCURRENCY", 4))
+PIPELINE_WORKERS = int(get_setting("PIPELINE_WORKERS", PARSE_CONCURRENCY + ANALYSIS_CONCURRENCY + 4))
+
+# Job scheduling: a worker runs up to WORKER_MAX_JOBS jobs at once plus SMALL_JOB_SLOTS more for small jobs
+# (at most SMALL_JOB_FILES files left), so a small job starts right away even behind large ones. Tenants run at
+# most TENANT_MAX_JOBS jobs and hold at most TENANT_MAX_CONCURRENCY slots of a stage (0 = no cap); the
+# tenant_limits settings section sets a "weight" and "max_concurrency" per tenant.
+WORKER_MAX_JOBS = int(get_setting("WORKER_MAX_JOBS", 4))
+SMALL_JOB_SLOTS = int(get_setting("SMALL_JOB_SLOTS", 2))
+SMALL_JOB_FILES = int(get_setting("SMALL_JOB_FILES", DEFAULT_SMALL_JOB_FILES))
+RESERVED_SMALL_JOB_SLOTS = int(get_setting("RESERVED_SMALL_JOB_SLOTS", DEFAULT_RESERVED_SLOTS))
+TENANT_MAX_JOBS = int(get_setting("TENANT_MAX_JOBS", 0)) or None
+TENANT_MAX_CONCURRENCY = int(get_setting("TENANT_MAX_CONCURRENCY", 0)) or None
+PRIORITY_AGING_SECONDS = float(get_setting("PRIORITY_AGING_SECONDS", DEFAULT_AGING_SECONDS))
+
+STAGE_SCHEDULERS = {
+    stage: FairScheduler(
+        stage, capacity, RESERVED_SMALL_JOB_SLOTS, TENANT_MAX_CONCURRENCY, get_section("tenant_limits"), PRIORITY_AGING_SECONDS
+    )
+    for stage, capacity in (("parse", PARSE_CONCURRENCY), ("analyze", ANALYSIS_CONCURRENCY))
+}
+
+# Queue ETAs are based on the files saved by all workers over this window
+ETA_WINDOW_SECONDS = float(get_setting("ETA_WINDOW_SECONDS", 300))
+
+# Database rows are upserted in bulk every DB_FLUSH_ROWS rows or DB_FLUSH_SECONDS seconds
+DB_FLUSH_ROWS = int(get_setting("DB_FLUSH_ROWS", DEFAULT_FLUSH_ROWS))
+DB_FLUSH_SECONDS = float(get_setting("DB_FLUSH_SECONDS", DEFAULT_FLUSH_SECONDS))
+
+# Results are fetched per run in pages; runs older than RUN_RETENTION_DAYS are deleted
+RESULTS_PAGE_SIZE = int(get_setting("RESULTS_PAGE_SIZE", 1000))
+RUN_RETENTION_DAYS = int(get_setting("RUN_RETENTION_DAYS", 30))
+
+# Storage bucket holding the uploaded resumes
+STORAGE_BUCKET = "bulk-resumes"
+
+# Persistent cache of parsed text and LLM verdicts, keyed by file content hash
+CACHE_PATH = get_setting("CACHE_PATH", DEFAULT_CACHE_PATH)
+CACHE_MAX_BYTES = int(get_setting("CACHE_MAX_MB", DEFAULT_CACHE_MAX_BYTES // (1024 * 1024))) * 1024 * 1024
+
+# Near-duplicate resumes (same candidate through another vendor or export) reuse the indexed verdict
+DEDUP_ENABLED = get_bool_setting("DEDUP_ENABLED", True)
+DEDUP_PATH = get_setting("DEDUP_PATH", DEFAULT_DEDUP_PATH)
+DEDUP_THRESHOLD = float(get_setting("DEDUP_THRESHOLD", DEFAULT_THRESHOLD))
+DEDUP_CONTACT_THRESHOLD = float(get_setting("DEDUP_CONTACT_THRESHOLD", DEFAULT_CONTACT_THRESHOLD))
+
+# Per-run JSONL traces of the per-resume stage spans
+TRACE_DIRECTORY = get_setting("TRACE_DIRECTORY", DEFAULT_TRACE_DIRECTORY)
+
+# Try local PDF/DOCX extraction before falling back to LlamaParse
+LOCAL_EXTRACTION = get_bool_setting("LOCAL_EXTRACTION", True)
+
+# Durable job records and work queue, on a local disk: the queue is shared by the worker processes of one host only
+JOB_DB_PATH = get_setting("JOB_DB_PATH", DEFAULT_JOB_DB_PATH)
+JOBS_DIRECTORY = get_setting("JOBS_DIRECTORY", DEFAULT_JOBS_DIRECTORY)
+WORKER_POLL_SECONDS = float(get_setting("WORKER_POLL_SECONDS", 2))
+WORKER_HEARTBEAT_SECONDS = float(get_setting("WORKER_HEARTBEAT_SECONDS", 15))
+
+# Offline batch mode: provider ("openai" or the local "mock") and how often to poll batch jobs
+BATCH_PROVIDER = get_setting("BATCH_PROVIDER", "openai")
+BATCH_POLL_SECONDS = int(get_setting("BATCH_POLL_SECONDS", 30))
+BATCH_DIRECTORY = get_setting("BATCH_DIRECTORY", os.path.join(".cache", "batches"))
+
+# Extensions of the ZIP members treated as resumes
+RESUME_EXTENSIONS = ('.pdf', '.doc', '.docx')
+
+# ZIP ingestion limits: per resume, per archive (compressed upload and expanded members) and zip-bomb ratio
+MB = 1024 * 1024
+MAX_FILE_BYTES = int(get_setting("MAX_FILE_MB", DEFAULT_MAX_FILE_BYTES // MB)) * MB
+MAX_TOTAL_BYTES = int(get_setting("MAX_TOTAL_MB", DEFAULT_MAX_TOTAL_BYTES // MB)) * MB
+MAX_ZIP_MEMBERS = int(get_setting("MAX_ZIP_MEMBERS", DEFAULT_MAX_MEMBERS))
+MAX_COMPRESSION_RATIO = float(get_setting("MAX_COMPRESSION_RATIO", DEFAULT_MAX_COMPRESSION_RATIO))
+
+# Memory bound of a job: resume bytes held at once, and the process RSS above which no new file is read (0 = no cap)
+IN_FLIGHT_BYTES = int(get_setting("IN_FLIGHT_MB", DEFAULT_IN_FLIGHT_BYTES // MB)) * MB
+MAX_RSS_BYTES = int(get_setting("MAX_RSS_MB", 2048)) * MB
+
+def get_job_store():
+    """Job store at the configured location"""
+    return JobStore(JOB_DB_PATH, JOBS_DIRECTORY)
+
+def process_resume(file_source, parser=None, file_name=None):
+    """Process a single resume and return extracted text.
+
+    `file_source` is either the file bytes (with `file_name` giving its extension) or a public http link.
+    """
+    if parser is None:
+        parser = new_parser()
+    
+    max_retries = 3
+    retry_delay = 2  # base delay in seconds for jittered exponential backoff
+    limiter = get_limiter("llamaparse")
+    
+    for attempt in range(max_retries):
+        try:
+            # logger.debug(f"Processing attempt {attempt+1} for {file_name or file_source}")
+            with limiter.limit():
+                if isinstance(file_source, bytes):
+                    documents = parser.load_data(file_source, extra_info={"file_name": file_name})
+                else:
+                    documents = parser.load_data(file_source)
+            limiter.on_success()
+            
+            # Check if documents is empty
+            if not documents:
+                logger.warning(f"No documents returned for {file_name or file_source}")
+                if attempt < max_retries - 1:
+                    delay = backoff_delay(attempt, retry_delay)
+                    logger.info(f"Retrying in {delay:.1f} seconds...")
+                    telemetry.record_retry()
+                    time.sleep(delay)
+                    continue
+                return ""
+            
+            # Collect the text from the documents
+            extracted_text = ""
+            for doc in documents:
+                if hasattr(doc, 'text') and doc.text:
+                    extracted_text += doc.text + "\n\n"  # add a new line after each document
+            
+            # If text was successfully extracted, return it
+            if extracted_text and len(extracted_text.strip()) > 10:
+                return extracted_text
+            else:
+                logger.warning(f"Empty or very short text extracted from {file_name or file_source}")
+                if attempt < max_retries - 1:
+                    delay = backoff_delay(attempt, retry_delay)
+                    logger.info(f"Retrying in {delay:.1f} seconds...")
+                    telemetry.record_retry()
+                    time.sleep(delay)
+                    continue
+                return ""
+                
+        except Exception as e:
+            logger.error(f"Error in attempt {attempt+1}: {str(e)}")
+            # Honor Retry-After and slow every LlamaParse caller down when throttled
+            retry_after = get_retry_after(e)
+            if is_rate_limited(e):
+                limiter.on_throttled(retry_after)
+            if attempt < max_retries - 1:
+                delay = retry_after if retry_after is not None else backoff_delay(attempt, retry_delay)
+                logger.info(f"Retrying in {delay:.1f} seconds...")
+                telemetry.record_retry(e)
+                time.sleep(delay)
+            else:
+                logger.error(f"Failed after {max_retries} attempts for {file_name or file_source}")
+                return ""
+    
+    return ""
+
+def extract_resume_text(file_name, file_data, file_hash, stage_limits, cache, force_reprocess=False, checkpoint=None):
+    """Extract a resume's text from the cache, locally, or with LlamaParse.
+
+    Returns the text and the tier that produced it ("cache", "local" or "llamaparse"). Before a file goes to
+    LlamaParse, the reason local extraction didn't do is recorded as its `fallback_reason`, through
+    `checkpoint(**fields)` and on the current span, so it is kept even if LlamaParse fails too.
+    """
+    extracted_text = None if force_reprocess else cache.get_text(file_hash)
+    if extracted_text is not None:
+        return extracted_text, "cache"
+
+    # Text-based PDF/DOCX files are extracted locally from the ZIP bytes in milliseconds
+    fallback_reason = "local extraction disabled"
+    if LOCAL_EXTRACTION:
+        extracted_text, fallback_reason = extract_text_locally(file_data, file_name)
+        if extracted_text is not None:
+            cache.put_text(file_hash, extracted_text)
+            return extracted_text, "local"
+
+    telemetry.set_attributes(tier="llamaparse", fallback_reason=fallback_reason)
+    if checkpoint is not None:
+        checkpoint(tier="llamaparse", fallback_reason=fallback_reason)
+
+    with stage_limits["parse"]:
+        # Re-initialize parser for each file to avoid session issues
+        file_parser = new_parser()
+
+        # Extract text from the resume bytes, no need to wait for the storage upload
+        extracted_text = process_resume(file_data, file_parser, file_name=file_name)  # Pass parser as parameter
+
+    if not extracted_text or len(extracted_text.strip()) < 10:
+        raise ValueError(f"Insufficient text extracted from {file_name}")
+    cache.put_text(file_hash, extracted_text)
+    return extracted_text, "llamaparse"
+
+def validate_analysis_result(result):
+    """Raise if the LLM analysis is missing any of the required fields"""
+    required_fields = ["name", "mobile", "email", "category", "special_remarks", "justification"]
+    missing_fields = [field for field in required_fields if field not in result or not result[field]]
+
+    if missing_fields:
+        raise ValueError(f"LLM analysis missing required fields: {', '.join(missing_fields)}")
+
+def get_duplicate_index():
+    """Near-duplicate index at the configured location, or None when disabled"""
+    if not DEDUP_ENABLED:
+        return None
+    return DuplicateIndex(DEDUP_PATH, DEDUP_THRESHOLD, DEDUP_CONTACT_THRESHOLD)
+
+def find_duplicate(dedup, extracted_text, file_hash, fingerprint, force_reprocess=False):
+    """Look a resume up in the near-duplicate index.
+
+    Returns the best match ({"content_hash", "run_id", "verdict", "similarity"}, with this resume's own
+    contact fields laid over the verdict) or None, and the entry to index the resume under once it is saved
+    (None when the index is disabled).
+    """
+    if dedup is None:
+        return None, None
+    with telemetry.span("dedup") as dedup_span:
+        signature = minhash_signature(extracted_text)
+        contacts = extract_contact_fields(extracted_text)
+        duplicate = None if force_reprocess else dedup.find(signature, contacts, fingerprint, exclude_hash=file_hash)
+        if dedup_span is not None:
+            dedup_span.set_attributes(duplicate=duplicate is not None)
+    if duplicate is not None:
+        duplicate["verdict"], _ = merge_rule_fields(duplicate["verdict"], contacts)
+    return duplicate, {"index": dedup, "signature": signature, "contacts": contacts, "fingerprint": fingerprint}
+
+def save_resume_result(result, result_key, file_hash, file_index, tier, llm_stats, upload_future, cache, writer, checkpoint,
+                       duplicate=None, dedup_entry=None):
+    """Validate and cache an analysis result, then save it with the file's public URL.
+
+    A `duplicate` result is saved linked to the row whose verdict it reuses; any other result is added to
+    the near-duplicate index through `dedup_entry`.
+    """
+    validate_analysis_result(result)
+    cache.put_verdict(result_key, result)
+    checkpoint(stage="analyzed")
+
+    resume_url = upload_future.result()
+
+    # Save the data to Supabase database, upserted in bulk by the writer. The worker doesn't wait for the
+    # flush: the file is recorded as saved (and indexed) once its row is stored.
+    saved = Future()
+
+    def on_stored(row_future):
+        try:
+            row_future.result()
+            checkpoint(stage="saved", url=resume_url, tier=tier, error=None)
+            if dedup_entry is not None and duplicate is None:
+                dedup_entry["index"].add(
+                    file_hash, writer.run_id, dedup_entry["signature"], dedup_entry["contacts"], dedup_entry["fingerprint"], result
+                )
+        except Exception as e:
+            saved.set_exception(e)
+            return
+        saved.set_result({"result": result, "tier": tier, "url": resume_url, "llm_stats": llm_stats})
+
+    save_to_supabase_db(result, resume_url, file_hash, file_index, writer, duplicate).add_done_callback(on_stored)
+    return saved
+
+def process_single_resume(file_name, file_index, file_data, upload_future, file_hash, stage_limits, cache, writer, checkpoint,
+                          force_reprocess=False, analysis_mode=None, dedup=None):
+    """Run a single resume through parse -> near-duplicate lookup -> LLM analysis -> database save.
+
+    `file_index` is the file's position in the job's ZIP, stored on its row to keep results in ZIP order.
+    `upload_future` resolves to the file's public storage URL; it is only awaited right before the database save.
+    `checkpoint(**fields)` records the stage reached by the file in the job store.
+    Returns a Future, resolved once the database row is stored, of a dictionary with the analysis "result", the
+    extraction "tier" that handled the file ("cache", "local" or "llamaparse"), the public "url" and the
+    "llm_stats" of the analysis (empty on a cache hit).
+    `dedup` is the DuplicateIndex consulted before the LLM analysis (None to skip it).
+    """
+    # Reuse the verdict of an identical file analyzed with the same prompts and models
+    fingerprint = analysis_fingerprint(analysis_mode)
+    result_key = verdict_key(file_hash, fingerprint)
+    result = None if force_reprocess else cache.get_verdict(result_key)
+    tier = "cache"
+    llm_stats = {}
+    duplicate = None
+    dedup_entry = None
+
+    if result is None:
+        with telemetry.span("parse"):
+            extracted_text, tier = extract_resume_text(
+                file_name, file_data, file_hash, stage_limits, cache, force_reprocess, checkpoint
+            )
+            telemetry.set_attributes(tier=tier)
+        checkpoint(stage="parsed", tier=tier)
+
+        # Reuse the verdict of a near-duplicate (same candidate, another file) analyzed before
+        duplicate, dedup_entry = find_duplicate(dedup, extracted_text, file_hash, fingerprint, force_reprocess)
+        if duplicate is not None:
+            result = duplicate["verdict"]
+            llm_stats = {"mode": "duplicate", "latency_seconds": 0.0, "duplicate_similarity": duplicate["similarity"]}
+        else:
+            with stage_limits["analyze"]:
+                # Analyze the resume using LLM
+                result = llm_resume_analysis(extracted_text, mode=analysis_mode, stats=llm_stats)
+            if "fallback_reason" in llm_stats:
+                # A single-pass failure fell back to the two-stage chain: cache and index the verdict under the
+                # fingerprint of the pipeline that produced it
+                fingerprint = analysis_fingerprint(llm_stats["mode"])
+                result_key = verdict_key(file_hash, fingerprint)
+                if dedup_entry is not None:
+                    dedup_entry["fingerprint"] = fingerprint
+
+    return save_resume_result(
+        result, result_key, file_hash, file_index, tier, llm_stats, upload_future, cache, writer, checkpoint, duplicate, dedup_entry
+    )
+
+def chained_future(future):
+    """Future of the result of the Future that `future` resolves to"""
+    chained = Future()
+
+    def on_inner(inner):
+        try:
+            chained.set_result(inner.result())
+        except Exception as e:
+            chained.set_exception(e)
+
+    def on_outer(outer):
+        try:
+            outer.result().add_done_callback(on_inner)
+        except Exception as e:
+            chained.set_exception(e)
+
+    future.add_done_callback(on_outer)
+    return chained
+
+def failed_future(error):
+    future = Future()
+    future.set_exception(error)
+    return future
+
+def extract_entry_text(entry, stage_limits, cache, force_reprocess, budget):
+    """Read a batch entry's resume from the ZIP again and extract its text, within the memory budget"""
+    with budget.reserve(entry["size"]), telemetry.span("parse"):
+        file_data = entry["read"]()
+        extracted_text, tier = extract_resume_text(
+            entry["file_name"], file_data, entry["hash"], stage_limits, cache, force_reprocess, entry["checkpoint"]
+        )
+        telemetry.set_attributes(tier=tier)
+        return extracted_text, tier
+
+def process_resumes_in_batch(executor, entries, stage_limits, cache, writer, force_reprocess, batch_directory, budget,
+                             on_status=None, dedup=None):
+    """Batch-mode counterpart of process_single_resume for a whole ZIP.
+
+    Entries don't keep the resume bytes (the batch jobs can take hours): `entry["read"]()` reads them from
+    the ZIP again when needed. Texts are extracted concurrently, the uncached ones are analyzed through provider batch jobs
+    (single-pass requests), then each result is saved like in the interactive mode.
+    Yields (index, future) pairs as results become final, in completion order.
+    """
+    fingerprint = analysis_fingerprint("single_pass")
+    result_key_of = {i: verdict_key(entry["hash"], fingerprint) for i, entry in enumerate(entries)}
+    verdicts = {}
+    texts = {}
+    tiers = {}
+
+    # Stage 1: cached verdicts and text extraction
+    extract_futures = {}
+    for i, entry in enumerate(entries):
+        cached = None if force_reprocess else cache.get_verdict(result_key_of[i])
+        if cached is not None:
+            verdicts[i] = cached
+            tiers[i] = "cache"
+        else:
+            extract_futures[telemetry.submit(executor, entry["span"], extract_entry_text, entry, stage_limits, cache, force_reprocess, budget)] = i
+
+    for future in as_completed(extract_futures):
+        i = extract_futures[future]
+        try:
+            texts[i], tiers[i] = future.result()
+            entries[i]["checkpoint"](stage="parsed", tier=tiers[i])
+        except Exception:
+            yield i, future
+
+    # Stage 2: near-duplicate verdicts, rule-based verdicts for clear freshers, provider batch jobs for the rest
+    rule_fields = {i: extract_contact_fields(text) for i, text in texts.items()}
+    llm_stats = {}
+    duplicates = {}
+    dedup_entries = {}
+    for i in list(texts):
+        duplicate, dedup_entries[i] = find_duplicate(dedup, texts[i], entries[i]["hash"], fingerprint, force_reprocess)
+        if duplicate is not None:
+            verdicts[i] = duplicate["verdict"]
+            duplicates[i] = duplicate
+            llm_stats[i] = {"mode": "duplicate", "latency_seconds": 0.0, "duplicate_similarity": duplicate["similarity"]}
+            del texts[i]
+            continue
+        rule_verdict, _ = rule_classification(texts[i], rule_fields[i])
+        if rule_verdict is not None:
+            verdicts[i] = rule_verdict
+            llm_stats[i] = {"mode": "rules", "latency_seconds": 0.0}
+            del texts[i]
+
+    if texts:
+        started = time.monotonic()
+        with telemetry.span("llm.batch", requests=len(texts)):
+            outcomes = run_batch_analysis(
+                {str(i): text for i, text in texts.items()},
+                get_batch_provider(),
+                batch_directory,
+                poll_interval=BATCH_POLL_SECONDS,
+                on_status=on_status
+            )
+        # A batch verdict's latency is the turnaround of the whole batch
+        latency = time.monotonic() - started
+        for custom_id, (result, error, usage) in outcomes.items():
+            i = int(custom_id)
+            if result is None:
+                yield i, failed_future(ValueError(f"Batch analysis failed: {error}"))
+            else:
+                verdicts[i], rule_agreement = merge_rule_fields(result, rule_fields[i])
+                llm_stats[i] = {"mode": "batch", "latency_seconds": latency, "rule_agreement": rule_agreement, **batch_usage_stats(usage)}
+
+    # Stage 3: the same validation and save as the interactive path
+    save_futures = {
+        chained_future(telemetry.submit(
+            executor, entries[i]["span"], save_resume_result, result, result_key_of[i], entries[i]["hash"], entries[i]["index"], tiers[i],
+            llm_stats.get(i, {}), entries[i]["upload"], cache, writer,
+            entries[i]["checkpoint"], duplicates.get(i), dedup_entries.get(i)
+        )): i
+        for i, result in verdicts.items()
+    }
+    for future in as_completed(save_futures):
+        yield save_futures[future], future
+
+def get_batch_provider():
+    """Batch provider selected by the BATCH_PROVIDER setting ("openai" or "mock")"""
+    if BATCH_PROVIDER == "mock":
+        return MockBatchProvider()
+    return OpenAIBatchProvider()
+
+def upload_with_checkpoint(file_data, folder_name, file_name, file_hash, checkpoint):
+    """Upload a file to storage and record its public URL in the job store"""
+    with telemetry.span("upload", bytes=len(file_data)):
+        resume_url = upload_to_supabase_storage(file_data, folder_name, file_name, file_hash)
+    checkpoint(url=resume_url)
+    return resume_url
+
+def completed_future(value):
+    future = Future()
+    future.set_result(value)
+    return future
+
+def get_public_storage_url(storage_path):
+    """Public URL of a storage object, built locally instead of asking the API"""
+    return f"{supabase_url.rstrip('/')}/storage/v1/object/public/{STORAGE_BUCKET}/{storage_path}"
+
+def is_duplicate_upload_error(error):
+    """Whether a storage upload failed only because the object already exists"""
+    status = get_status_code(error)
+    # Storage errors carry the API's JSON body ({"statusCode", "error", "message"}) as their argument
+    body = error.args[0] if error.args and isinstance(error.args[0], dict) else {}
+    if status is None:
+        try:
+            status = int(body.get("statusCode"))
+        except (TypeError, ValueError):
+            status = None
+    # Older storage APIs answer an existing object with a 400 whose error is "Duplicate"
+    return status == 409 or (status == 400 and body.get("error") == "Duplicate")
+
+def upload_to_supabase_storage(file_data, folder_name, file_name, file_hash=None):
+    """Upload a file to Supabase storage and return the public URL.
+
+    With `file_hash` the storage path is content-addressed, so an existing object at that path is the
+    same file and is treated as already present.
+    """
+    
+    try:
+        # Sanitize folder name and file name
+        sanitized_folder = sanitize_filename(folder_name)
+        sanitized_filename = sanitize_filename(os.path.basename(file_name))
+        
+        # Set the correct content type based on file extension
+        file_extension = sanitized_filename.split('.')[-1].lower()
+
+        content_type = None
+        if file_extension == 'pdf':
+            content_type = 'application/pdf'
+        elif file_extension == 'doc':
+            content_type = 'application/msword'
+        elif file_extension == 'docx':
+            content_type = 'application/vnd.openxmlformats-officedocument.wordprocessingml.document'
+        else:
+            content_type = 'application/octet-stream'
+
+        # Full path in storage including folder
+        if file_hash:
+            sanitized_filename = f"{file_hash[:12]}_{sanitized_filename}"
+        storage_path = f"{sanitized_folder}/{sanitized_filename}"
+        
+        # Debug the final storage path
+        # logger.debug(f"Storage path: {storage_path}")
+        
+        # Upload to Supabase storage
+        try:
+            response = call_with_retry(
+                get_limiter("supabase"),
+                get_client("supabase").storage.from_(STORAGE_BUCKET).upload,
+                storage_path,
+                file_data,
+                {"content-type": content_type} 
+            )
+        except Exception as e:
+            if not (file_hash and is_duplicate_upload_error(e)):
+                raise
+            # Same content at the same path: already present
+        
+        # Get the public URL
+        return get_public_storage_url(storage_path)
+    except Exception as e:
+        logger.error(f"Error in upload_to_supabase_storage: {str(e)}")
+        raise
+
+def save_to_supabase_db(resume_data, resume_url, file_hash, file_index, writer, duplicate=None):
+    """Save resume data to Supabase database through the bulk writer, upserting on the file's content hash.
+
+    `file_index` is the file's position in the job's ZIP, the order results are shown and exported in.
+    A near-`duplicate` row references the (run_id, content_hash) of the row whose verdict it reuses.
+    Returns the writer's Future of the row, resolved once its bulk flush succeeded.
+    """
+    data = {
+        "name": resume_data["name"],
+        "mobile": resume_data["mobile"],
+        "email": resume_data["email"],
+        "resume_url": resume_url,
+        "candidate_category": resume_data["category"],
+        "special_remarks": resume_data["special_remarks"],
+        "justification": resume_data["justification"],
+        "content_hash": file_hash,
+        "file_index": file_index,
+        # Every row of a bulk upsert must carry the same keys
+        "duplicate_of_run_id": duplicate["run_id"] if duplicate else None,
+        "duplicate_of_hash": duplicate["content_hash"] if duplicate else None,
+    }
+    
+    # Upsert into the bulk_applicants table; the "db_write" span lasts until the row's bulk flush
+    parent = telemetry.current_span()
+    db_span = parent.tracer.start_span("db_write", parent) if parent is not None else None
+    row_future = writer.add(data)
+    if db_span is not None:
+        row_future.add_done_callback(lambda future: db_span.end(future.exception()))
+    return row_future
+
+def register_run(run_id, zip_name):
+    """Record a new processing run; its applicant rows reference it by run_id"""
+    call_with_retry(get_limiter("supabase"), get_client("supabase").table("applicant_runs").insert({"run_id": run_id, "zip_name": zip_name}).execute)
+
+def purge_expired_runs(retention_days):
+    """Delete runs older than `retention_days`; their bulk_applicants rows are removed by the cascade"""
+    try:
+        cutoff = (datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(days=retention_days)).isoformat()
+        response = call_with_retry(get_limiter("supabase"), get_client("supabase").table("applicant_runs").delete().lt("created_at", cutoff).execute)
+        return len(response.data or [])
+    except Exception as e:
+        logger.error(f"Error purging expired runs: {str(e)}")
+        return 0
+        
+def sanitize_filename(filename):
+    """Sanitize filename to be compatible with Supabase storage keys"""
+    # Print before sanitization for debugging
+    # logger.debug(f"Before sanitization: {filename}")
+    
+    # Replace spaces, brackets and other problematic characters
+    # More aggressive replacement to ensure all special characters are handled
+    sanitized = re.sub(r'[^a-zA-Z0-9_\-\.]', '_', filename)
+    
+    # Print after sanitization for debugging
+    # logger.debug(f"After sanitization: {sanitized}")
+    
+    return sanitized
+    
+def iter_run_applicants_pages(run_id, page_size=RESULTS_PAGE_SIZE, after_index=-1, filters=None):
+    """Yield the bulk_applicants rows of one run page by page in ZIP order, using keyset pagination on the
+    (run_id, file_index) index.
+
+    Only rows with a file_index above `after_index` are read, so a page can be fetched without reading the
+    ones before it. `filters` maps a column (e.g. candidate_category) to the values to keep; an empty list keeps all.
+    """
+    last_index = after_index
+    while True:
+        query = get_client("supabase").table("bulk_applicants").select("*").eq("run_id", run_id).gt("file_index", last_index)
+        for column, values in (filters or {}).items():
+            if values:
+                query = query.in_(column, list(values))
+        response = call_with_retry(get_limiter("supabase"), query.order("file_index").limit(page_size).execute)
+        page = response.data or []
+        if page:
+            yield page
+        if len(page) < page_size:
+            return
+        last_index = page[-1]["file_index"]
+
+def get_run_applicants_by_hash(run_id, content_hashes, chunk_size=100):
+    """Current rows of a run for some resume content hashes, e.g. the ones saved since a poller's last look.
+
+    Re-reading rows by hash also picks up rows upserted again (same id, new verdict). Hashes are sent
+    `chunk_size` at a time to keep the request URLs short.
+    """
+    content_hashes = list(content_hashes)
+    rows = []
+    for start in range(0, len(content_hashes), chunk_size):
+        query = get_client("supabase").table("bulk_applicants").select("*").eq("run_id", run_id).in_(
+            "content_hash", content_hashes[start:start + chunk_size]
+        )
+        rows += call_with_retry(get_limiter("supabase"), query.execute).data or []
+    return rows
+
+def get_run_applicants_page(run_id, after_index=-1, page_size=RESULTS_PAGE_SIZE, filters=None):
+    """DataFrame of the one page of a run's rows (in ZIP order) that follows `after_index`, for display.
+
+    Callers that need every row stream iter_run_applicants_pages() instead (as export_run_applicants does),
+    so a run is never held in memory at once.
+    """
+    return pd.DataFrame(next(iter_run_applicants_pages(run_id, page_size, after_index, filters), []))
+
+def export_run_applicants(run_id, path, fmt=None, filters=None):
+    """Write one run's rows in ZIP order to a CSV, JSON, Parquet or XLSX file page by page; returns the row count"""
+    return write_pages(iter_run_applicants_pages(run_id, filters=filters), path, fmt)
+
+def hash_file(file, chunk_size=1024 * 1024):
+    """SHA-256 of a binary file object, read in chunks; the position is reset to the start"""
+    digest = hashlib.sha256()
+    file.seek(0)
+    for chunk in iter(lambda: file.read(chunk_size), b""):
+        digest.update(chunk)
+    file.seek(0)
+    return digest.hexdigest()
+
+def submit_job(zip_file, zip_name, job_store, analysis_mode=None, batch_mode=False, force_reprocess=False,
+               tenant="default", priority=0):
+    """Store a ZIP next to the job database and queue a job for its resume files.
+
+    `zip_file` is a binary file object (an upload or an open file). `tenant` (the recruiter or team) and
+    `priority` (see scheduler.PRIORITY_LEVELS) decide its place in the queue and its share of the workers.
+    Returns the job, or None when the ZIP contains no resume files. Raises ZipLimitError when the archive
+    is over the ingestion limits.
+    """
+    # Every row of this upload is tagged with its run ID instead of sharing one global table state
+    job_id = uuid.uuid4().hex
+    zip_path = job_store.zip_path_for(job_id)
+    digest = hashlib.sha256()
+    try:
+        # Copied in chunks, the archive is never held in memory whole
+        size = 0
+        with open(zip_path, "wb") as f:
+            for chunk in iter(lambda: zip_file.read(MB), b""):
+                size += len(chunk)
+                if size > MAX_TOTAL_BYTES:
+                    raise ZipLimitError(f"ZIP is larger than {MAX_TOTAL_BYTES // MB} MB")
+                digest.update(chunk)
+                f.write(chunk)
+
+        with zipfile.ZipFile(zip_path, 'r') as zip_ref:
+            check_archive(zip_ref, MAX_ZIP_MEMBERS, MAX_TOTAL_BYTES)
+            # Filter .pdf, .doc, .docx files
+            resume_files = [file.filename for file in zip_ref.infolist() if file.filename.lower().endswith(RESUME_EXTENSIONS)]
+    except Exception:
+        os.remove(zip_path)
+        raise
+
+    if not resume_files:
+        os.remove(zip_path)
+        return None
+
+    # Create a unique folder name for Supabase storage
+    timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+    zip_filename = os.path.splitext(os.path.basename(zip_name))[0]
+    # Sanitize the folder name right when creating it
+    storage_folder_name = sanitize_filename(f"{zip_filename}_{timestamp}")
+
+    # Retention is per run: only runs past RUN_RETENTION_DAYS are removed
+    purged_runs = purge_expired_runs(RUN_RETENTION_DAYS)
+    if purged_runs:
+        logger.info(f"Removed {purged_runs} runs older than {RUN_RETENTION_DAYS} days from the database.")
+    # Near-duplicates are only linked to rows that still exist
+    dedup = get_duplicate_index()
+    if dedup is not None:
+        dedup.remove_older_than(time.time() - RUN_RETENTION_DAYS * 86400)
+    # Finished jobs (and their per-file rows) are kept as long as their runs, and so are batch files left
+    # behind by an interrupted worker (they hold resume text)
+    job_store.remove_finished_older_than(time.time() - RUN_RETENTION_DAYS * 86400)
+    remove_batch_directories_older_than(BATCH_DIRECTORY, time.time() - RUN_RETENTION_DAYS * 86400)
+    register_run(job_id, zip_name)
+
+    return job_store.create_job(
+        job_id, zip_name, digest.hexdigest(), storage_folder_name, resume_files,
+        analysis_mode or ANALYSIS_MODE, batch_mode, force_reprocess, tenant, priority
+    )
+
+def summarize_extraction(job_files):
+    """Files per extraction tier, and why local extraction fell back to LlamaParse (reasons without their details)"""
+    tiers = {}
+    fallback_reasons = {}
+    for job_file in job_files:
+        tier = job_file["tier"] or "none"
+        tiers[tier] = tiers.get(tier, 0) + 1
+        if job_file["fallback_reason"]:
+            reason = job_file["fallback_reason"].split(":")[0]
+            fallback_reasons[reason] = fallback_reasons.get(reason, 0) + 1
+    return {"tiers": tiers, "fallback_reasons": fallback_reasons}
+
+def summarize_llm_stats(llm_stats):
+    """Per-mode latency/token/cost aggregates of a run's LLM analyses"""
+    summary = {}
+    for stats in llm_stats:
+        mode = summary.setdefault(stats["mode"], {
+            "resumes": 0, "fallbacks": 0, "analyzer_fallbacks": 0, "latencies": [], "tokens": 0, "cost_usd": 0.0,
+            "text_tokens": 0, "compacted_tokens": 0, "reasoning_tokens": 0
+        })
+        mode["resumes"] += 1
+        mode["fallbacks"] += int("fallback_reason" in stats)
+        # Two-stage analyses whose reasoning hit the completion cap (retried or structured from the reasoning)
+        mode["analyzer_fallbacks"] += int("analyzer_fallback" in stats)
+        mode["latencies"].append(stats["latency_seconds"])
+        mode["tokens"] += stats.get("prompt_tokens", 0) + stats.get("completion_tokens", 0)
+        mode["cost_usd"] += stats.get("cost_usd", 0.0)
+        for field in ("text_tokens", "compacted_tokens", "reasoning_tokens"):
+            mode[field] += stats.get(field, 0)
+
+    for mode in summary.values():
+        latencies = sorted(mode.pop("latencies"))
+        mode["avg_latency_seconds"] = sum(latencies) / len(latencies)
+        mode["p95_latency_seconds"] = latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))]
+        mode["avg_tokens"] = mode["tokens"] / mode["resumes"]
+        mode["avg_cost_usd"] = mode["cost_usd"] / mode["resumes"]
+        # Share of the parsed resume text that compaction removed before the LLM calls
+        mode["compaction_savings"] = 1 - mode["compacted_tokens"] / mode["text_tokens"] if mode["text_tokens"] else 0.0
+    return summary
+
+def summarize_rule_agreement(llm_stats):
+    """Per-field share of LLM analyses that agreed with the deterministic rules"""
+    compared = {}
+    agreed = {}
+    for stats in llm_stats:
+        for field, agrees in stats.get("rule_agreement", {}).items():
+            compared[field] = compared.get(field, 0) + 1
+            agreed[field] = agreed.get(field, 0) + int(agrees)
+    return {field: {"compared": count, "agreement_rate": agreed[field] / count} for field, count in compared.items()}
+
+def run_job(job, job_store, on_progress=None):
+    """Process the files of a claimed job that are not saved yet.
+
+    `on_progress(event)` receives {"type": "file", "index", "file_name", "ok", "error", "completed", "total"}
+    after every file and {"type": "batch", "batch_id", "status"} after every batch poll. Returns the run
+    summary, which is also stored on the job.
+    """
+    run_id = job["job_id"]
+    analysis_mode = job["analysis_mode"]
+    batch_mode = bool(job["batch_mode"])
+    force_reprocess = bool(job["force_reprocess"])
+    job_files = job_store.get_files(run_id)
+    pending_files = [job_file for job_file in job_files if job_file["stage"] != "saved"]
+    pending_indexes = {job_file["file_index"] for job_file in pending_files}
+    on_progress = on_progress or (lambda event: None)
+
+    llm_stats = []
+    success_count = 0
+    error_count = 0
+    completed_count = 0
+    cache = ResumeCache(CACHE_PATH, CACHE_MAX_BYTES)
+    dedup = get_duplicate_index()
+    # Bounds the resume bytes in flight, so memory doesn't grow with the size of the archive
+    budget = MemoryBudget(IN_FLIGHT_BYTES, MAX_RSS_BYTES or None)
+    # One trace per run: a "resume" span per file with its upload/parse/dedup/llm/db_write stage spans
+    tracer = Tracer(run_id, TRACE_DIRECTORY)
+    run_span = tracer.start_span("run", zip_name=job["zip_name"], files=len(pending_files), batch_mode=batch_mode)
+    resume_spans = {}
+
+    # Process the resumes concurrently; the parse and analysis slots are shared fairly with the other running jobs
+    with telemetry.activate(run_span), \
+            scheduled_job(
+                STAGE_SCHEDULERS, run_id, job["tenant"], job["priority"], small=is_small_job(job)
+            ) as stage_limits, \
+            zipfile.ZipFile(job["zip_path"], 'r') as zip_ref, \
+            ThreadPoolExecutor(max_workers=UPLOAD_CONCURRENCY) as upload_executor, \
+            ThreadPoolExecutor(max_workers=PIPELINE_WORKERS) as executor, \
+            BulkApplicantWriter(get_client("supabase"), run_id, flush_rows=DB_FLUSH_ROWS, flush_seconds=DB_FLUSH_SECONDS) as writer:
+        # Parsing starts from the ZIP bytes as soon as each file is read; the storage
+        # upload runs alongside it and is only awaited before the database save.
+        # Members are streamed from the archive on disk one at a time, once the memory budget admits them.
+        futures = {}
+        rejected = []
+        batch_entries = []
+        for job_file in pending_files:
+            i = job_file["file_index"]
+            file_name = job_file["file_name"]
+            checkpoint = functools.partial(job_store.update_file, run_id, i)
+            resume_span = resume_spans[i] = tracer.start_span("resume", run_span, file_index=i, file_name=file_name)
+            info = zip_ref.getinfo(file_name)
+            try:
+                check_member(info, MAX_FILE_BYTES, MAX_COMPRESSION_RATIO)
+                budget.acquire(info.file_size)
+            except ZipLimitError as e:
+                rejected.append((i, failed_future(e)))
+                continue
+
+            try:
+                file_data = read_member(zip_ref, info, MAX_FILE_BYTES)
+            except Exception as e:
+                budget.release(info.file_size)
+                rejected.append((i, failed_future(e)))
+                continue
+            file_hash = content_hash(file_data)
+            checkpoint(content_hash=file_hash)
+
+            # Files uploaded before an interruption keep their URL
+            if job_file["url"]:
+                upload_future = completed_future(job_file["url"])
+            else:
+                upload_future = telemetry.submit(
+                    upload_executor, resume_span, upload_with_checkpoint, file_data, job["storage_folder"], file_name, file_hash, checkpoint
+                )
+
+            if batch_mode:
+                batch_entries.append({
+                    "index": i, "file_name": file_name, "read": functools.partial(read_member, zip_ref, info, MAX_FILE_BYTES),
+                    "size": info.file_size, "hash": file_hash, "upload": upload_future, "checkpoint": checkpoint, "span": resume_span
+                })
+                budget.release_when_done(info.file_size, upload_future)
+                continue
+            future = telemetry.submit(
+                executor, resume_span, process_single_resume, file_name, i, file_data, upload_future, file_hash,
+                stage_limits, cache, writer, checkpoint, force_reprocess, analysis_mode, dedup
+            )
+            futures[chained_future(future)] = i
+            # The bytes are no longer needed once the row is handed to the writer
+            budget.release_when_done(info.file_size, future, upload_future)
+
+        if batch_mode:
+            completed = (
+                (batch_entries[entry_index]["index"], future)
+                for entry_index, future in process_resumes_in_batch(
+                    executor, batch_entries, stage_limits, cache, writer, force_reprocess,
+                    os.path.join(BATCH_DIRECTORY, job["storage_folder"]), budget,
+                    on_status=lambda batch_id, status: on_progress({"type": "batch", "batch_id": batch_id, "status": status}),
+                    dedup=dedup
+                )
+            )
+        else:
+            completed = ((futures[future], future) for future in as_completed(futures))
+
+        for i, future in chain(rejected, completed):
+            completed_count += 1
+            error = None
+            try:
+                outcome = future.result()
+                if outcome["llm_stats"]:
+                    llm_stats.append(outcome["llm_stats"])
+                success_count += 1
+                resume_spans.pop(i).end()
+            except Exception as e:
+                error_count += 1
+                error = str(e)
+                resume_spans.pop(i).end(e)
+                job_store.update_file(run_id, i, error=error)
+                logger.error(f"Error processing {job_files[i]['file_name']}: {error}")
+            on_progress({
+                "type": "file", "index": i, "file_name": job_files[i]["file_name"], "ok": error is None, "error": error,
+                "completed": completed_count, "total": len(pending_files)
+            })
+
+    summary = {
+        "processed": completed_count,
+        "success_count": success_count,
+        "error_count": error_count,
+        "cache": {
+            "verdict_hits": cache.hits["verdict"],
+            "verdict_misses": cache.misses["verdict"],
+            "text_hits": cache.hits["text"],
+            "text_misses": cache.misses["text"],
+            "size_bytes": cache.size_bytes(),
+        },
+        "extraction": summarize_extraction(
+            [job_file for job_file in job_store.get_files(run_id) if job_file["file_index"] in pending_indexes]
+        ),
+        "llm_modes": summarize_llm_stats(llm_stats),
+        "rule_agreement": summarize_rule_agreement(llm_stats),
+        "memory": budget.report(),
+        "scheduling": {stage: slot.report() for stage, slot in stage_limits.items()},
+    }
+    run_span.end()
+    summary["telemetry"] = tracer.summary(success_count)
+    tracer.close()
+    job_store.complete_job(run_id, summary)
+    return summary
+
+def is_small_job(job):
+    """Whether a job has at most SMALL_JOB_FILES files left, as the job store's claim order ranks it"""
+    return job["remaining_files"] <= SMALL_JOB_FILES
+
+def run_claimed_job(job, job_store, on_progress=None):
+    """Run a claimed job while a background thread keeps its heartbeat fresh"""
+    stop = threading.Event()
+
+    def send_heartbeats():
+        while not stop.wait(WORKER_HEARTBEAT_SECONDS):
+            job_store.heartbeat(job["job_id"])
+
+    heartbeat_thread = threading.Thread(target=send_heartbeats, daemon=True)
+    heartbeat_thread.start()
+    try:
+        return run_job(job, job_store, on_progress)
+    finally:
+        stop.set()
+        heartbeat_thread.join()
+
+def process_claimed_job(job, job_store):
+    """Run a job claimed from the queue, recording an unexpected failure on the job"""
+    logger.info(f"Processing job {job['job_id']} ({job['zip_name']}, tenant {job['tenant']}, priority {job['priority']})")
+    try:
+        run_claimed_job(job, job_store)
+    except Exception as e:
+        logger.exception(f"Job {job['job_id']} failed: {str(e)}")
+        job_store.complete_job(job["job_id"], {"error": str(e)})
+
+def run_worker(job_store=None, worker_id=None, once=False, stop_event=None, poll_seconds=None, max_jobs=None):
+    """Take jobs from the queue and process them until `stop_event` is set (or the queue is empty with `once`).
+
+    Up to `max_jobs` (WORKER_MAX_JOBS) jobs run at once, plus SMALL_JOB_SLOTS more that only small jobs may
+    take. Running jobs share the parse and analysis slots through STAGE_SCHEDULERS.
+    """
+    job_store = job_store or get_job_store()
+    worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}-{threading.get_ident()}"
+    poll_seconds = WORKER_POLL_SECONDS if poll_seconds is None else poll_seconds
+    stop_event = stop_event or threading.Event()
+    max_jobs = WORKER_MAX_JOBS if max_jobs is None else max_jobs
+    stale_seconds = max(DEFAULT_STALE_SECONDS, 4 * WORKER_HEARTBEAT_SECONDS)
+
+    running = {}
+    with ThreadPoolExecutor(max_workers=max_jobs + SMALL_JOB_SLOTS) as job_executor:
+        while not stop_event.is_set():
+            for future in [future for future in running if future.done()]:
+                del running[future]
+
+            job = None
+            if len(running) < max_jobs + SMALL_JOB_SLOTS:
+                large_jobs = sum(1 for running_job in running.values() if not is_small_job(running_job))
+                job = job_store.claim_next_job(
+                    worker_id, stale_seconds, SMALL_JOB_FILES, small_only=large_jobs >= max_jobs or len(running) >= max_jobs,
+                    tenant_max_jobs=TENANT_MAX_JOBS
+                )
+            if job is None:
+                if once and not running:
+                    return
+                if running:
+                    wait(running, timeout=poll_seconds, return_when=FIRST_COMPLETED)
+                else:
+                    stop_event.wait(poll_seconds)
+                continue
+
+            running[job_executor.submit(process_claimed_job, job, job_store)] = job
+
+def queue_status(job_id, job_store):
+    """Queue depth and estimated time to completion of a job.
+
+    Returns {"status", "position" (among queued jobs, 1-based, None once running), "queued_jobs",
+    "running_jobs", "files_ahead", "remaining_files", "eta_seconds" (None while nothing has been saved
+    recently)}, or None when the job is neither queued nor running. A running job's ETA uses its own rate
+    since it started; a queued job's uses the rate of all workers over the last ETA_WINDOW_SECONDS (at most
+    since the oldest running job started) and counts the files of the queued jobs ahead of it.
+    """
+    active_jobs = job_store.list_active_jobs(SMALL_JOB_FILES)
+    queued = [active_job for active_job in active_jobs if active_job["status"] == "queued"]
+    job = next((active_job for active_job in active_jobs if active_job["job_id"] == job_id), None)
+    if job is None:
+        return None
+
+    now = time.time()
+    status = {
+        "status": job["status"],
+        "position": None,
+        "queued_jobs": len(queued),
+        "running_jobs": len(active_jobs) - len(queued),
+        "files_ahead": 0,
+        "remaining_files": job["remaining_files"],
+        "eta_seconds": None,
+    }
+    if job["status"] == "running":
+        saved = job_store.count_saved_since(job["started_at"], job_id) if job["started_at"] else 0
+        if saved and now > job["started_at"]:
+            status["eta_seconds"] = job["remaining_files"] / (saved / (now - job["started_at"]))
+        return status
+
+    position = queued.index(job)
+    status["position"] = position + 1
+    status["files_ahead"] = sum(queued_job["remaining_files"] for queued_job in queued[:position])
+    # Workers that started recently have not been saving files for the whole window
+    started = [active_job["started_at"] for active_job in active_jobs if active_job["status"] == "running" and active_job["started_at"]]
+    window = min(ETA_WINDOW_SECONDS, max(now - min(started), 1.0)) if started else ETA_WINDOW_SECONDS
+    saved = job_store.count_saved_since(now - window)
+    if saved:
+        status["eta_seconds"] = (status["files_ahead"] + job["remaining_files"]) / (saved / window)
+    return status
@@ -0,0 +1,185 @@
+import re
+import hashlib
+
+from text_compactor import HEADING_PATTERN
+
+# Bump when the rules change, so cached verdicts produced with older rules are not reused
+RULES_VERSION = 2
+
+# Gazetteers shared with the analyzer system prompt
+KNOWN_BPO_COMPANIES = (
+    "Astra Business Services Private Limited", "GLOBAL VANTEDGE", "iQor", "IDC Technologies", "Provana",
+    "Encore Capital Group", "American Express (Amex)", "Genpact", "iEnergizer", "Teleperformance", "Personiv",
+    "Fusion CX", "HCLTech", "Barclays MIS", "Accenture",
+)
+NORTHEAST_STATES = ("Arunachal Pradesh", "Assam", "Manipur", "Meghalaya", "Mizoram", "Nagaland", "Tripura")
+
+# Short state names, state capitals and district towns of the northeast, matched like the state names
+NORTHEAST_PLACES = NORTHEAST_STATES + (
+    "Arunachal", "Itanagar", "Naharlagun", "Tawang", "Pasighat", "Ziro", "Guwahati", "Dispur", "Dibrugarh", "Jorhat",
+    "Silchar", "Tezpur", "Tinsukia", "Nagaon", "Sivasagar", "Bongaigaon", "Golaghat", "Karimganj", "Imphal",
+    "Churachandpur", "Shillong", "Tura", "Jowai", "Aizawl", "Lunglei", "Kohima", "Dimapur", "Mokokchung", "Agartala",
+)
+
+# Indian mobile numbers: optional +91/91/0 prefix, ten digits starting with 6-9, single spaces or dashes allowed
+MOBILE_PATTERN = re.compile(r"(?<![\d+])(?:(?:\+|00)?91[\s-]?|0)?([6-9](?:[\s-]?\d){9})(?!\d)")
+EMAIL_PATTERN = re.compile(r"\b[\w.+-]+@[\w-]+(?:\.[\w-]+)*\.[A-Za-z]{2,}\b")
+NORTHEAST_PATTERN = re.compile(r"\b(" + "|".join(re.escape(place) for place in NORTHEAST_PLACES) + r")\b", re.I)
+COMPANY_PATTERN = re.compile(
+    r"\b(" + "|".join(re.escape(company) for company in KNOWN_BPO_COMPANIES + ("Amex", "HCL", "Barclays", "Vantedge")) + r")\b",
+    re.I
+)
+
+# Where a candidate's own details are written: the resume header (up to the first section heading), contact
+# sections, and lines labelled as an address or contact outside the sections about referees
+HEADER_LINES = 8
+ADDRESS_LINE_PATTERN = re.compile(r"\b(address|location|hometown|native|domicile|resid|permanent|city|state)\w*", re.I)
+CONTACT_LINE_PATTERN = re.compile(r"\b(mobile|mob|phone|ph|cell|contact|tel|telephone|whatsapp|e-?mail|mail)\b", re.I)
+CONTACT_SECTION_PATTERN = re.compile(r"contact|personal", re.I)
+REFERENCE_SECTION_PATTERN = re.compile(r"\b(references?|referees?)\b", re.I)
+
+NAME_LINE_PATTERN = re.compile(r"^name\s*[:\-]\s*(.+)$", re.I)
+NAME_PATTERN = re.compile(r"^[A-Za-z][A-Za-z.']*(?:\s+[A-Za-z][A-Za-z.']*){1,3}$")
+NOT_A_NAME = re.compile(r"\b(resume|curriculum|vitae|cv|bio-?data|profile|contact|objective|summary|details)\b", re.I)
+
+# Clearly unsuitable: the resume says the candidate is a fresher and shows no sign of work experience
+FRESHER_PATTERN = re.compile(
+    r"\bfreshers?\b|\bno (?:prior |previous |work |job )?experience\b|\bfresh graduate\b|\bseeking (?:my )?first (?:job|opportunity)\b",
+    re.I
+)
+EXPERIENCE_PATTERN = re.compile(
+    r"\b\d+(?:\.\d+)?\+?\s*(?:years?|yrs?|months?)\b"
+    r"|\b(?:19|20)\d{2}\s*(?:-|–|to)\s*(?:(?:19|20)\d{2}|present|current|till date|now)\b"
+    r"|\b(?:worked|working|employed)\s+(?:as|at|with|in)\b"
+    r"|\b(?:internship|intern)\b"
+    r"|\b(?:work|professional) experience\b(?!\s*[:\-]?\s*(?:nil|none|n/?a|fresher))",
+    re.I
+)
+
+# Fields taken from the rules whenever they find them, instead of the LLM's reading
+RULE_FIELDS = ("mobile", "email", "special_remarks")
+
+
+def candidate_lines(text, label_pattern):
+    """Lines holding the candidate's own details: the header, contact sections, and the lines matching
+    `label_pattern` outside reference sections (a referee's phone or address is not the candidate's)"""
+    lines = [line.strip() for line in text.splitlines() if line.strip()]
+    header_size = 1
+    while header_size < min(HEADER_LINES, len(lines)) and not HEADING_PATTERN.match(lines[header_size]):
+        header_size += 1
+    selected = lines[:header_size]
+    heading = ""
+    for line in lines[header_size:]:
+        if HEADING_PATTERN.match(line):
+            heading = line
+        elif REFERENCE_SECTION_PATTERN.search(heading):
+            continue
+        elif CONTACT_SECTION_PATTERN.search(heading) or label_pattern.search(line):
+            selected.append(line)
+    return selected
+
+
+def parse_mobile(value):
+    """First Indian mobile number in `value`, as its ten digits"""
+    match = MOBILE_PATTERN.search(value)
+    return re.sub(r"\D", "", match.group(1)) if match else None
+
+
+def extract_mobile(text):
+    for line in candidate_lines(text, CONTACT_LINE_PATTERN):
+        mobile = parse_mobile(line)
+        if mobile:
+            return mobile
+    return None
+
+
+def extract_email(text):
+    for line in candidate_lines(text, CONTACT_LINE_PATTERN):
+        match = EMAIL_PATTERN.search(line)
+        if match:
+            return match.group(0).lower()
+    return None
+
+
+def extract_name(text):
+    """Name from a "Name:" line, or the first header line that reads like a name"""
+    lines = [line.strip(" #*_|\t") for line in text.splitlines() if line.strip(" #*_|\t")]
+    for line in lines:
+        match = NAME_LINE_PATTERN.match(line)
+        if match and NAME_PATTERN.match(match.group(1).strip()):
+            return match.group(1).strip()
+    for line in lines[:5]:
+        if NAME_PATTERN.match(line) and not NOT_A_NAME.search(line):
+            return line.title() if line.isupper() else line
+    return None
+
+
+def extract_special_remarks(text):
+    """"northeast" if a northeast place is in the header or an address line, otherwise None: a place missing
+    from the gazetteer may still be in the northeast, so only the LLM can say "other_state" """
+    if any(NORTHEAST_PATTERN.search(line) for line in candidate_lines(text, ADDRESS_LINE_PATTERN)):
+        return "northeast"
+    return None
+
+
+def extract_contact_fields(text):
+    """Deterministic reading of name, mobile, email and special_remarks; None where the rules can't tell"""
+    return {
+        "name": extract_name(text),
+        "mobile": extract_mobile(text),
+        "email": extract_email(text),
+        "special_remarks": extract_special_remarks(text),
+    }
+
+
+def find_fresher_reason(text):
+    """Why a resume is clearly unsuitable without an LLM call, or None when the LLM has to judge it"""
+    fresher = FRESHER_PATTERN.search(text)
+    if not fresher or EXPERIENCE_PATTERN.search(text) or COMPANY_PATTERN.search(text):
+        return None
+    return f'The resume describes the candidate as a fresher ("{fresher.group(0)}") and lists no work experience.'
+
+
+def rule_based_verdict(fields, reason):
+    """candidate_resume dictionary of a resume classified by the rules alone"""
+    return {
+        "name": fields["name"] or "N/A",
+        "mobile": fields["mobile"] or "N/A",
+        "email": fields["email"] or "N/A",
+        "category": "unsuitable",
+        "justification": reason,
+        "special_remarks": fields["special_remarks"] or "other_state",
+    }
+
+
+def is_audit_sample(text, rate):
+    """Deterministically pick a `rate` share of resumes (by content) to also send to the LLM"""
+    return int(hashlib.sha256(text.encode("utf-8")).hexdigest()[:8], 16) / 0x100000000 < rate
+
+
+def normalize_field(field, value):
+    if not value or str(value).strip().upper() == "N/A":
+        return None
+    value = str(value).strip()
+    if field == "mobile":
+        return parse_mobile(value) or re.sub(r"\D", "", value)[-10:]
+    return value.lower()
+
+
+def merge_rule_fields(llm_result, fields):
+    """Overlay the rule-extracted fields on an LLM result.
+
+    RULE_FIELDS found by the rules replace the LLM's values; the rule name only fills an N/A name.
+    Returns the merged result and {field: whether the LLM agreed with the rules} for every field both set.
+    """
+    merged = dict(llm_result)
+    agreement = {}
+    for field, value in fields.items():
+        if value is None:
+            continue
+        llm_value = normalize_field(field, llm_result.get(field))
+        if llm_value is not None:
+            agreement[field] = llm_value == normalize_field(field, value)
+        if field in RULE_FIELDS or llm_value is None:
+            merged[field] = value
+    return merged, agreement
@@ -0,0 +1,191 @@
+import time
+import itertools
+import threading
+from contextlib import contextmanager
+
+import telemetry
+
+# Job priorities offered to users; higher is served first
+PRIORITY_LEVELS = {"low": -1, "normal": 0, "urgent": 1}
+
+# Jobs with at most this many files to process are "small"
+DEFAULT_SMALL_JOB_FILES = 50
+
+# Slots of each stage that only small jobs may take
+DEFAULT_RESERVED_SLOTS = 1
+
+# A request waiting this long is served as if its job had one more priority level, so low priorities don't starve
+DEFAULT_AGING_SECONDS = 120
+
+
+class FairScheduler:
+    """Slots of one pipeline stage (e.g. "parse" or "analyze") shared by every job running in the process.
+
+    A free slot goes to the waiting request with, in order: the highest priority (plus one level per
+    `aging_seconds` waited), a small job before a larger one, the tenant that has received the least service
+    for its weight, the job of that tenant that has received the least service, then the earliest request.
+    A tenant holds at most its `max_concurrency` slots at once. `reserved_slots` slots are only given to small
+    jobs, so a small job never waits for more than one slot to free up, however large the other jobs are.
+
+    `tenant_limits` maps a tenant to {"weight", "max_concurrency"}, overriding the default weight of 1 and
+    `tenant_max_concurrency`.
+    """
+
+    def __init__(self, name, capacity, reserved_slots=DEFAULT_RESERVED_SLOTS, tenant_max_concurrency=None,
+                 tenant_limits=None, aging_seconds=DEFAULT_AGING_SECONDS):
+        self.name = name
+        self.capacity = capacity
+        self.reserved_slots = min(reserved_slots, max(capacity - 1, 0))
+        self.tenant_max_concurrency = tenant_max_concurrency
+        self.tenant_limits = tenant_limits or {}
+        self.aging_seconds = aging_seconds
+        self._jobs = {}
+        self._tenants = {}
+        self._waiting = []
+        self._in_use = 0
+        self._in_use_large = 0
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+
+    def _tenant(self, tenant):
+        if tenant not in self._tenants:
+            limits = self.tenant_limits.get(tenant, {})
+            self._tenants[tenant] = {
+                "vtime": 0.0, "in_use": 0, "jobs": 0,
+                "weight": float(limits.get("weight", 1.0)),
+                "max_concurrency": limits.get("max_concurrency", self.tenant_max_concurrency),
+            }
+        return self._tenants[tenant]
+
+    def register(self, job_id, tenant, priority=0, small=False):
+        """Add a job to the scheduler before it requests slots"""
+        with self._condition:
+            state = self._tenant(tenant)
+            # Newcomers start at the current service level, so earlier idle time doesn't buy them a burst
+            active_tenants = [other["vtime"] for other in self._tenants.values() if other["jobs"]]
+            if active_tenants:
+                state["vtime"] = max(state["vtime"], min(active_tenants))
+            tenant_jobs = [job["vtime"] for job in self._jobs.values() if job["tenant"] == tenant]
+            state["jobs"] += 1
+            self._jobs[job_id] = {
+                "tenant": tenant, "priority": priority, "small": small, "vtime": min(tenant_jobs) if tenant_jobs else 0.0
+            }
+
+    def unregister(self, job_id):
+        with self._condition:
+            job = self._jobs.pop(job_id)
+            self._tenants[job["tenant"]]["jobs"] -= 1
+
+    def _eligible(self, request):
+        job = self._jobs[request["job_id"]]
+        tenant = self._tenants[job["tenant"]]
+        if tenant["max_concurrency"] is not None and tenant["in_use"] >= tenant["max_concurrency"]:
+            return False
+        return job["small"] or self._in_use_large < self.capacity - self.reserved_slots
+
+    def _rank(self, request, now):
+        job = self._jobs[request["job_id"]]
+        aging = int((now - request["requested_at"]) // self.aging_seconds) if self.aging_seconds else 0
+        return (-(job["priority"] + aging), not job["small"], self._tenants[job["tenant"]]["vtime"], job["vtime"], request["sequence"])
+
+    def _dispatch(self):
+        """Grant free slots to the best eligible waiting requests"""
+        now = time.monotonic()
+        granted = False
+        while self._in_use < self.capacity:
+            candidates = [request for request in self._waiting if self._eligible(request)]
+            if not candidates:
+                break
+            request = min(candidates, key=lambda candidate: self._rank(candidate, now))
+            self._waiting.remove(request)
+            job = self._jobs[request["job_id"]]
+            tenant = self._tenants[job["tenant"]]
+            job["vtime"] += 1.0
+            tenant["vtime"] += 1.0 / tenant["weight"]
+            tenant["in_use"] += 1
+            self._in_use += 1
+            self._in_use_large += int(not job["small"])
+            request["granted"] = True
+            granted = True
+        if granted:
+            self._condition.notify_all()
+
+    def acquire(self, job_id):
+        """Block until the scheduler grants `job_id` a slot"""
+        with self._condition:
+            request = {"job_id": job_id, "requested_at": time.monotonic(), "sequence": next(self._sequence), "granted": False}
+            self._waiting.append(request)
+            self._dispatch()
+            while not request["granted"]:
+                self._condition.wait()
+
+    def release(self, job_id):
+        with self._condition:
+            job = self._jobs[job_id]
+            self._tenants[job["tenant"]]["in_use"] -= 1
+            self._in_use -= 1
+            self._in_use_large -= int(not job["small"])
+            self._dispatch()
+
+    def snapshot(self):
+        """Slots in use and requests waiting, overall and per tenant"""
+        with self._condition:
+            waiting = {}
+            for request in self._waiting:
+                tenant = self._jobs[request["job_id"]]["tenant"]
+                waiting[tenant] = waiting.get(tenant, 0) + 1
+            return {
+                "capacity": self.capacity,
+                "in_use": self._in_use,
+                "waiting": len(self._waiting),
+                "tenants": {
+                    name: {"in_use": state["in_use"], "waiting": waiting.get(name, 0)}
+                    for name, state in self._tenants.items() if state["jobs"]
+                },
+            }
+
+
+class StageSlot:
+    """Context manager holding one slot of a stage for one job; its wait is timed as a "queue.<stage>" span"""
+
+    def __init__(self, scheduler, job_id):
+        self.scheduler = scheduler
+        self.job_id = job_id
+        self.acquired = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        started = time.monotonic()
+        with telemetry.span(f"queue.{self.scheduler.name}"):
+            self.scheduler.acquire(self.job_id)
+        waited = time.monotonic() - started
+        with self._lock:
+            self.acquired += 1
+            self.wait_seconds += waited
+            self.max_wait_seconds = max(self.max_wait_seconds, waited)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.scheduler.release(self.job_id)
+
+    def report(self):
+        with self._lock:
+            return {
+                "slots": self.acquired,
+                "avg_wait_seconds": self.wait_seconds / self.acquired if self.acquired else 0.0,
+                "max_wait_seconds": self.max_wait_seconds,
+            }
+
+
+@contextmanager
+def scheduled_job(schedulers, job_id, tenant, priority=0, small=False):
+    """Register a job with every stage scheduler for the duration of the block; yields {stage: StageSlot}"""
+    for scheduler in schedulers.values():
+        scheduler.register(job_id, tenant, priority, small)
+    try:
+        yield {name: StageSlot(scheduler, job_id) for name, scheduler in schedulers.items()}
+    finally:
+        for scheduler in schedulers.values():
+            scheduler.unregister(job_id)
@@ -0,0 +1,64 @@
+import threading
+
+from app_config import get_setting
+
+
+def create_groq_client():
+    from groq import Groq
+    # Retries are handled by the shared per-provider rate limiter, so it sees every 429
+    return Groq(api_key=get_setting("LLMA_API_KEY"), max_retries=0)
+
+
+def create_openai_client():
+    import openai
+    openai.api_key = get_setting("OPENAI_API_KEY")
+    openai.max_retries = 0
+    return openai
+
+
+def create_supabase_client():
+    from supabase import create_client
+    return create_client(get_setting("SUPABASE_URL"), get_setting("SUPABASE_KEY"))
+
+
+def create_parser_factory():
+    from llama_cloud_services import LlamaParse
+    api_key = get_setting("LLAMA_CLOUD_API_KEY")
+    return lambda: LlamaParse(result_type="markdown", api_key=api_key)
+
+
+# How each service client is built on first use. "llamaparse" is a factory returning a new parser per file.
+CLIENT_FACTORIES = {
+    "groq": create_groq_client,
+    "openai": create_openai_client,
+    "supabase": create_supabase_client,
+    "llamaparse": create_parser_factory,
+}
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_client(name):
+    """Shared client of a service ("groq", "openai", "supabase" or "llamaparse"), built on first use"""
+    with _clients_lock:
+        if name not in _clients:
+            _clients[name] = CLIENT_FACTORIES[name]()
+        return _clients[name]
+
+
+def set_client(name, client):
+    """Replace the client of a service, e.g. with a local stand-in from fake_services"""
+    with _clients_lock:
+        _clients[name] = client
+
+
+def reset_clients():
+    """Forget every built or injected client; the next get_client() builds the real ones again"""
+    with _clients_lock:
+        _clients.clear()
+
+
+def new_parser():
+    """A new LlamaParse-like parser, one per file to avoid session issues"""
+    return get_client("llamaparse")()
@@ -1,29 +1,29 @@
 import os
-import io
-import zipfile
 import time
 import datetime
+import tempfile
+import threading
 import pandas as pd
-import re
 import streamlit as st
-from dotenv import load_dotenv
-from supabase import create_client
-from llama_cloud_services import LlamaParse
-from LLM_Analyzer import llm_resume_analysis
-
-# Load environment variables
-load_dotenv()
-
-# Initialize Supabase client
-supabase_url = st.secrets["SUPABASE_URL"]
-supabase_key = st.secrets["SUPABASE_KEY"]
-supabase = create_client(supabase_url, supabase_key)
-
-# Initialize LlamaParse
-LLAMA_CLOUD_API_KEY = st.secrets["LLAMA_CLOUD_API_KEY"]
-parser = LlamaParse(
-    result_type="markdown" # Options: "markdown" or "text
-)
+from app_config import get_setting
+from LLM_Analyzer import ANALYSIS_MODE, ANALYSIS_MODES, CANDIDATE_RESUME_JSON_SCHEMA
+from scheduler import PRIORITY_LEVELS
+import resume_engine
+
+# Processing runs in queue workers; the app only submits jobs and polls them.
+# EMBEDDED_WORKERS worker threads run inside the app process (0 when external workers are deployed).
+EMBEDDED_WORKERS = int(get_setting("EMBEDDED_WORKERS", 1))
+UI_POLL_SECONDS = float(get_setting("UI_POLL_SECONDS", 2))
+
+# Rows shown in the results grid (one page of a finished run); exports always contain every (filtered) row of the run
+RESULTS_GRID_MAX_ROWS = int(get_setting("RESULTS_GRID_MAX_ROWS", 5000))
+
+# Export formats offered for download: file extension and MIME type
+EXPORT_FORMATS = {
+    "CSV": ("csv", "text/csv"),
+    "Excel": ("xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+    "Parquet": ("parquet", "application/vnd.apache.parquet"),
+}
 
 # Set page config
 st.set_page_config(
@@ -32,149 +32,251 @@ st.set_page_config(
     layout="wide"
 )
 
-def process_resume(file_link, parser=None):
-    """Process a single 'resume file public http link' and return extracted text"""
-    if parser is None:
-        parser = LlamaParse(
-            result_type="markdown",
-            api_key=LLAMA_CLOUD_API_KEY
-        )
-    
-    max_retries = 3
-    retry_delay = 2  # seconds
-    
-    for attempt in range(max_retries):
+@st.cache_resource
+def start_embedded_workers(count):
+    """Start `count` queue workers in background threads, once per app process"""
+    threads = []
+    for _ in range(count):
+        thread = threading.Thread(target=resume_engine.run_worker, daemon=True)
+        thread.start()
+        threads.append(thread)
+    return threads
+
+def result_filters():
+    """Category and location filters of the results grid and exports; nothing selected keeps every row"""
+    properties = CANDIDATE_RESUME_JSON_SCHEMA["schema"]["properties"]
+    filter_columns = st.columns(2)
+    return {
+        "candidate_category": filter_columns[0].multiselect(
+            "Category", properties["category"]["enum"], placeholder="All categories"
+        ),
+        "special_remarks": filter_columns[1].multiselect(
+            "Special remarks", properties["special_remarks"]["enum"], placeholder="All locations"
+        ),
+    }
+
+def filter_results(df, filters):
+    for column, values in filters.items():
+        if values and not df.empty:
+            df = df[df[column].isin(values)]
+    return df
+
+def fetch_new_results(run_id, job_store):
+    """The latest RESULTS_GRID_MAX_ROWS rows of a running job, newest first.
+
+    Each call only reads the rows of the files the job store recorded as saved since the previous call. A
+    row upserted again (a second file with the same content) is read again too, so its verdict is refreshed.
+    """
+    results = st.session_state.get("results")
+    if results is None or results["run_id"] != run_id:
+        results = st.session_state["results"] = {"run_id": run_id, "since": 0.0, "rows": {}}
+    saved_files = job_store.list_saved_since(run_id, results["since"])
+    if saved_files:
+        results["since"] = max(saved_file["updated_at"] for saved_file in saved_files)
+        for row in resume_engine.get_run_applicants_by_hash(run_id, {saved_file["content_hash"] for saved_file in saved_files}):
+            # Re-inserting moves an updated row to the newest end
+            results["rows"].pop(row["content_hash"], None)
+            results["rows"][row["content_hash"]] = row
+        while len(results["rows"]) > RESULTS_GRID_MAX_ROWS:
+            del results["rows"][next(iter(results["rows"]))]
+    return pd.DataFrame(list(results["rows"].values())[::-1])
+
+def show_results_grid(results_grid, df, saved_count):
+    """Show the latest saved rows `df` of a running job in the `results_grid` placeholder"""
+    with results_grid.container():
+        caption = f"{len(df)} matching resumes"
+        if saved_count > RESULTS_GRID_MAX_ROWS:
+            caption += f" among the latest {RESULTS_GRID_MAX_ROWS} saved (export for all)"
+        st.caption(caption)
+        st.dataframe(df, hide_index=True)
+
+def show_results_page(results_grid, run_id, filters):
+    """Show one page of a finished run's filtered rows (filtered by the database), with buttons to page through them.
+
+    Returns the page's DataFrame.
+    """
+    paging = st.session_state.get("results_page")
+    if paging is None or paging["run_id"] != run_id or paging["filters"] != filters:
+        # Cursors are the last file_index of every page before the current one
+        paging = st.session_state["results_page"] = {"run_id": run_id, "filters": filters, "cursors": [-1]}
+    df = resume_engine.get_run_applicants_page(run_id, paging["cursors"][-1], RESULTS_GRID_MAX_ROWS, filters)
+
+    with results_grid.container():
+        page_number = len(paging["cursors"])
+        st.caption(f"Page {page_number}: {len(df)} resumes (export for every row)")
+        st.dataframe(df, hide_index=True)
+        page_columns = st.columns(2)
+        if page_columns[0].button("Previous page", disabled=page_number == 1):
+            paging["cursors"].pop()
+            st.rerun()
+        if page_columns[1].button("Next page", disabled=len(df) < RESULTS_GRID_MAX_ROWS):
+            paging["cursors"].append(int(df["file_index"].iloc[-1]))
+            st.rerun()
+    return df
+
+def export_controls(job, filters):
+    """Write the run's filtered rows to a file page by page and offer it for download"""
+    run_id = job["job_id"]
+    previous_export = st.session_state.get("export")
+    if previous_export and previous_export["run_id"] != run_id:
+        remove_export()
+    timestamp = datetime.datetime.fromtimestamp(job["created_at"]).strftime("%Y%m%d_%H%M%S")
+    export_columns = st.columns([2, 1, 2], vertical_alignment="bottom")
+    format_name = export_columns[0].selectbox("Export format", list(EXPORT_FORMATS))
+    extension, mime = EXPORT_FORMATS[format_name]
+    if export_columns[1].button("Prepare export"):
+        remove_export()
+        # A temporary file, deleted once downloaded or replaced by another export
+        handle, path = tempfile.mkstemp(prefix="resume_export_", suffix=f".{extension}")
+        os.close(handle)
         try:
-            # st.write(f"Processing attempt {attempt+1} for {file_link}")
-            documents = parser.load_data(file_link)
-            
-            # Check if documents is empty
-            if not documents:
-                st.warning(f"Warning: No documents returned for {file_link}")
-                if attempt < max_retries - 1:
-                    st.info(f"Retrying in {retry_delay} seconds...")
-                    time.sleep(retry_delay)
-                    continue
-                return ""
-            
-            # Collect the text from the documents
-            extracted_text = ""
-            for doc in documents:
-                if hasattr(doc, 'text') and doc.text:
-                    extracted_text += doc.text + "\n\n"  # add a new line after each document
-            
-            # If text was successfully extracted, return it
-            if extracted_text and len(extracted_text.strip()) > 10:
-                return extracted_text
-            else:
-                st.warning(f"Warning: Empty or very short text extracted from {file_link}")
-                if attempt < max_retries - 1:
-                    st.info(f"Retrying in {retry_delay} seconds...")
-                    time.sleep(retry_delay)
-                    retry_delay *= 2  # Exponential backoff
-                    continue
-                return ""
-                
+            row_count = resume_engine.export_run_applicants(run_id, path, extension, filters)
+            st.session_state["export"] = {"run_id": run_id, "path": path, "rows": row_count, "mime": mime}
         except Exception as e:
-            st.error(f"Error in attempt {attempt+1}: {str(e)}")
-            if attempt < max_retries - 1:
-                st.info(f"Retrying in {retry_delay} seconds...")
-                time.sleep(retry_delay)
-                retry_delay *= 2  # Exponential backoff
-            else:
-                st.error(f"Failed after {max_retries} attempts for {file_link}")
-                return ""
-    
-    return ""
-
-def upload_to_supabase_storage(file_data, folder_name, file_name):
-    """Upload a file to Supabase storage and return the public URL"""
-    
-    try:
-        # Sanitize folder name and file name
-        sanitized_folder = sanitize_filename(folder_name)
-        sanitized_filename = sanitize_filename(os.path.basename(file_name))
-        
-        # Set the correct content type based on file extension
-        file_extension = sanitized_filename.split('.')[-1].lower()
-
-        content_type = None
-        if file_extension == 'pdf':
-            content_type = 'application/pdf'
-        elif file_extension == 'doc':
-            content_type = 'application/msword'
-        elif file_extension == 'docx':
-            content_type = 'application/vnd.openxmlformats-officedocument.wordprocessingml.document'
+            os.remove(path)
+            st.error(f"Export failed: {str(e)}")
+
+    export = st.session_state.get("export")
+    if export and export["run_id"] == run_id and os.path.exists(export["path"]):
+        with open(export["path"], "rb") as export_file:
+            export_columns[2].download_button(
+                label=f"Download {export['rows']} rows",
+                data=export_file,
+                file_name=f"resume_analysis_{timestamp}.{export['path'].rsplit('.', 1)[-1]}",
+                mime=export["mime"],
+                on_click=remove_export
+            )
+
+def remove_export():
+    """Delete the session's prepared export file, if any"""
+    export = st.session_state.pop("export", None)
+    if export and os.path.exists(export["path"]):
+        os.remove(export["path"])
+
+def format_eta(seconds):
+    if seconds is None:
+        return "ETA unknown"
+    if seconds < 90:
+        return f"ETA ~{seconds:.0f} s"
+    return f"ETA ~{seconds / 60:.0f} min"
+
+def poll_job(job_id, job_store, filters, progress_area, results_grid):
+    """Show the progress of a queued/running job, and its rows as they are saved, until a worker finishes it"""
+    process_progress = progress_area.progress(0)
+    process_status = progress_area.empty()
+    queue_caption = progress_area.empty()
+
+    while True:
+        job = job_store.get_job(job_id)
+        counts = job_store.stage_counts(job_id)
+        total = sum(counts.values())
+        saved = counts.get("saved", 0)
+        failed = counts.get("failed", 0)
+        process_progress.progress((saved + failed) / total if total else 0.0)
+        queue = resume_engine.queue_status(job_id, job_store)
+
+        if job["status"] == "queued":
+            position = f"position {queue['position']} of {queue['queued_jobs']}, {queue['files_ahead']} files ahead, " if queue else ""
+            eta = format_eta(queue["eta_seconds"]) if queue else "ETA unknown"
+            process_status.info(f"Waiting for a worker ({position}{eta})... ({saved}/{total} saved)")
+        elif job["status"] == "running":
+            eta = format_eta(queue["eta_seconds"]) if queue else "ETA unknown"
+            process_status.info(
+                f"Processing resumes: {saved}/{total} saved, {failed} failed, "
+                f"{counts.get('analyzed', 0)} analyzed, {counts.get('parsed', 0)} parsed ({eta})"
+            )
         else:
-            content_type = 'application/octet-stream'
-
-        # Full path in storage including folder
-        storage_path = f"{sanitized_folder}/{sanitized_filename}"
-        
-        # Debug the final storage path
-        # st.write(f"Storage path: {storage_path}")
-        
-        # Upload to Supabase storage
-        response = supabase.storage.from_("bulk-resumes").upload(
-            storage_path,
-            file_data,
-            {"content-type": content_type} 
-        )
-        
-        # Get the public URL
-        public_url = supabase.storage.from_("bulk-resumes").get_public_url(storage_path)
-        
-        return public_url
-    except Exception as e:
-        st.error(f"Error in upload_to_supabase_storage: {str(e)}")
-        raise
-
-def save_to_supabase_db(resume_data, resume_url):
-    """Save resume data to Supabase database"""
-    data = {
-        "name": resume_data["name"],
-        "mobile": resume_data["mobile"],
-        "email": resume_data["email"],
-        "resume_url": resume_url,
-        "candidate_category": resume_data["category"],
-        "special_remarks": resume_data["special_remarks"],
-        "justification": resume_data["justification"]
-    }
-    
-    # Insert data into the bulk_applicants table
-    response = supabase.table("bulk_applicants").insert(data).execute()
-    
-    # Return the ID of the inserted record
-    return response.data[0]["id"] if response.data else None
-
-def clear_supabase_table():
-    """Clear all records from the bulk_applicants table"""
-    try:
-        # Delete all records from the table
-        response = supabase.table("bulk_applicants").delete().neq('id', 0).execute()
-        return True
-    except Exception as e:
-        st.error(f"Error clearing database: {str(e)}")
-        return False
-        
-def sanitize_filename(filename):
-    """Sanitize filename to be compatible with Supabase storage keys"""
-    # Print before sanitization for debugging
-    # st.write(f"Before sanitization: {filename}")
-    
-    # Replace spaces, brackets and other problematic characters
-    # More aggressive replacement to ensure all special characters are handled
-    sanitized = re.sub(r'[^a-zA-Z0-9_\-\.]', '_', filename)
-    
-    # Print after sanitization for debugging
-    # st.write(f"After sanitization: {sanitized}")
+            process_status.empty()
+            queue_caption.empty()
+            return job
+        if queue:
+            queue_caption.caption(f"Queue depth: {queue['queued_jobs']} jobs waiting, {queue['running_jobs']} running")
+        show_results_grid(results_grid, filter_results(fetch_new_results(job_id, job_store), filters), saved)
+        time.sleep(UI_POLL_SECONDS)
+
+def show_job_results(job, job_store, filters, results_grid):
+    """Summary, per-file report and result table of a finished job"""
+    run_id = job["job_id"]
+    summary = job_store.get_summary(run_id) or {}
+    job_files = job_store.get_files(run_id)
+    saved_count = sum(1 for job_file in job_files if job_file["stage"] == "saved")
+    error_count = len(job_files) - saved_count
+
+    # Final status
+    st.success(f"Processing complete! Successfully processed {saved_count} resumes with {error_count} errors.")
+    if error_count:
+        st.info("Failed files stay in the job; resume it from 'Unfinished jobs' to retry them.")
+
+    # Cache effectiveness for this run
+    if "cache" in summary:
+        cache_stats = summary["cache"]
+        cache_columns = st.columns(3)
+        cache_columns[0].metric("Verdict cache hits / misses", f"{cache_stats['verdict_hits']} / {cache_stats['verdict_misses']}")
+        cache_columns[1].metric("Parsed text cache hits / misses", f"{cache_stats['text_hits']} / {cache_stats['text_misses']}")
+        cache_columns[2].metric("Cache size", f"{cache_stats['size_bytes'] / (1024 * 1024):.1f} MB")
+
+    # Memory used by the worker while processing the archive
+    if "memory" in summary:
+        memory_stats = summary["memory"]
+        memory_columns = st.columns(3)
+        memory_columns[0].metric("Peak worker RSS", f"{memory_stats['peak_rss_mb']:.0f} MB")
+        memory_columns[1].metric("Peak resume bytes in flight", f"{memory_stats['peak_in_flight_mb']:.0f} MB")
+        memory_columns[2].metric("Waits on the RSS cap", memory_stats["rss_cap_waits"])
+
+    # Time spent waiting for the parse/analysis slots shared with other jobs
+    if summary.get("scheduling"):
+        st.write("Waits for the parse and analysis slots shared with other jobs:")
+        st.dataframe(pd.DataFrame.from_dict(summary["scheduling"], orient="index"))
+
+    # Latency/cost of the analysis modes used in this run
+    if summary.get("llm_modes"):
+        st.write("LLM analysis latency and estimated cost per mode:")
+        st.dataframe(pd.DataFrame.from_dict(summary["llm_modes"], orient="index"))
+
+    # Per-stage latency, errors and retries from the run's trace
+    if "telemetry" in summary:
+        telemetry_stats = summary["telemetry"]
+        telemetry_columns = st.columns(3)
+        telemetry_columns[0].metric("Throughput", f"{telemetry_stats['throughput_per_minute']:.1f} resumes/min")
+        telemetry_columns[1].metric("Estimated LLM cost", f"${telemetry_stats['cost_usd']:.4f}")
+        telemetry_columns[2].metric("Wall time", f"{telemetry_stats['wall_seconds']:.0f} s")
+        with st.expander("Per-stage latency"):
+            st.dataframe(pd.DataFrame.from_dict(telemetry_stats["stages"], orient="index"))
+            trace_path = telemetry_stats.get("trace_path")
+            if trace_path and os.path.exists(trace_path):
+                with open(trace_path, "rb") as trace_file:
+                    st.download_button(
+                        label="Download trace (JSONL)",
+                        data=trace_file.read(),
+                        file_name=os.path.basename(trace_path),
+                        mime="application/jsonl"
+                    )
+
+    # How often the LLM agreed with the deterministic contact/location rules ("category": audited fresher rules)
+    if summary.get("rule_agreement"):
+        st.write("Agreement between the rule-based extraction and the LLM:")
+        st.dataframe(pd.DataFrame.from_dict(summary["rule_agreement"], orient="index"))
+
+    # Which extraction tier handled each file, and why local extraction fell back to LlamaParse
+    report_df = pd.DataFrame(job_files)[["file_name", "stage", "tier", "fallback_reason", "url", "error"]]
+    st.write("Extraction tiers: " + ", ".join(f"{tier}: {count}" for tier, count in report_df["tier"].value_counts().items()))
+    fallback_reasons = summary.get("extraction", {}).get("fallback_reasons")
+    if fallback_reasons:
+        st.write("LlamaParse fallbacks: " + ", ".join(f"{reason}: {count}" for reason, count in fallback_reasons.items()))
+    with st.expander("Per-file processing report"):
+        st.dataframe(report_df)
     
-    return sanitized
+    # The run's rows one page at a time, in ZIP order
+    df = show_results_page(results_grid, run_id, filters)
     
-def get_all_applicants_data():
-    """Retrieve all records from the bulk_applicants table"""
-    response = supabase.table("bulk_applicants").select("*").execute()
-    return response.data
+    if not df.empty:
+        # Check for potential data issues
+        null_counts = df.isnull().sum()
+        if null_counts.sum() > 0:
+            st.warning("⚠️ Warning: The following columns have null values:")
+            st.write(null_counts[null_counts > 0])
+    else:
+        st.warning("No matching resumes were saved to the database.")
 
 def main():
     st.title("Voice Process- AI Resume Processor")
@@ -226,136 +328,99 @@ def main():
     st.write("Upload a ZIP file containing resumes to process and analyze them.")
     
     uploaded_file = st.file_uploader("Choose a ZIP file", type="zip")
-    
-    if uploaded_file:
-        # Create a unique folder name for Supabase storage
-        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-        zip_filename = os.path.splitext(uploaded_file.name)[0]
-        # Sanitize the folder name right when creating it
-        storage_folder_name = sanitize_filename(f"{zip_filename}_{timestamp}")
-
-
-        # Read the uploaded file as bytes and wrap into a BytesIO
-        try:
-            zip_bytes = uploaded_file.read()
-            zip_io = io.BytesIO(zip_bytes)
-
-            # Open the zip file
-            with zipfile.ZipFile(zip_io, 'r') as zip_ref:
-                # Filter .pdf, .doc, .docx files
-                resume_files = [file for file in zip_ref.infolist() if file.filename.lower().endswith(('.pdf', '.doc', '.docx'))]
-
-                if resume_files:
-                    st.write(f"Found {len(resume_files)} resume files. Uploading...")
-
-                    resume_public_urls = []
-                    for file_info in resume_files:
-                        file_data = zip_ref.read(file_info.filename)
-                        # upload to supabase storage
-                        resume_url = upload_to_supabase_storage(file_data, storage_folder_name, file_info.filename)
-                        resume_public_urls.append({"file_name": file_info.filename, "url": resume_url})
-
-                    st.write(f"Successfully uploaded {len(resume_public_urls)} resumes to storage.")
-
-                    # Clear the existing data in the table
-                    if clear_supabase_table():
-                        st.info("Cleared existing data from the database.")
-                    
-                    # Now process each resume from its public URL
-                    process_progress = st.progress(0)
-                    process_status = st.empty()
-                    process_status.info("Processing resumes...")
-                    
-                    # Process each resume file
-                    results = []
-                    success_count = 0
-                    error_count = 0
-                    
-                    for i, resume_data in enumerate(resume_public_urls):
-                        file_name = resume_data["file_name"]
-                        resume_url = resume_data["url"]
-                        process_status.info(f"[{i+1}/{len(resume_public_urls)}] Processing {file_name}...")
-                        
-                        try:
-                            # Re-initialize parser for each file to avoid session issues
-                            file_parser = LlamaParse(
-                                result_type="markdown",  # Options: "markdown" or "text"
-                                api_key=LLAMA_CLOUD_API_KEY  # Ensure API key is passed explicitly
-                            )
-                            
-                            # Extract text from the resume using the public URL
-                            
-                            extracted_text = process_resume(resume_url, file_parser)  # Pass parser as parameter
-                    
-
-                            if not extracted_text or len(extracted_text.strip()) < 10:
-                                raise ValueError(f"Insufficient text extracted from file")
-                            
-                            # Analyze the resume using LLM
-                            result = llm_resume_analysis(extracted_text)
-                            
-                            # Validate the result contains required fields
-                            required_fields = ["name", "mobile", "email", "category", "special_remarks", "justification"]
-                            missing_fields = [field for field in required_fields if field not in result or not result[field]]
-                            
-                            if missing_fields:
-                                raise ValueError(f"LLM analysis missing required fields: {', '.join(missing_fields)}")
-                            
-                            # Save the data to Supabase database
-                            record_id = save_to_supabase_db(result, resume_url)
-                            
-                            # Add to results
-                            results.append(result)
-                            success_count += 1
-                            process_status.success(f"✅ Successfully processed {file_name}")
-                            
-                        except Exception as e:
-                            error_count += 1
-                            error_msg = f"❌ Error processing {file_name}: {str(e)}"
-                            process_status.error(error_msg)
-                        
-                        # Update progress bar
-                        process_progress.progress((i + 1) / len(resume_public_urls))
-                        
-                        # Add a small delay between files to avoid rate limiting
-                        if i > 0:  # Don't delay before the first file
-                            time.sleep(1)  # 1 second pause between files
-                    
-                    # Final status
-                    process_status.empty()
-                    st.success(f"Processing complete! Successfully processed {success_count} resumes with {error_count} errors.")
-                    
-                    # Get all data from the database
-                    applicants_data = get_all_applicants_data()
-                    
-                    if applicants_data:
-                        # Convert to DataFrame
-                        df = pd.DataFrame(applicants_data)
-                        
-                        # Display the data
-                        st.subheader("Processed Resumes")
-                        st.dataframe(df)
-                        
-                        # Create a download button for CSV
-                        csv = df.to_csv(index=False)
-                        st.download_button(
-                            label="Download CSV",
-                            data=csv,
-                            file_name=f"resume_analysis_{timestamp}.csv",
-                            mime="text/csv"
-                        )
-                        
-                        # Check for potential data issues
-                        null_counts = df.isnull().sum()
-                        if null_counts.sum() > 0:
-                            st.warning("⚠️ Warning: The following columns have null values:")
-                            st.write(null_counts[null_counts > 0])
-                    else:
-                        st.warning("No data was saved to the database.")
+    force_reprocess = st.checkbox("Force reprocess (ignore cached parse results and verdicts)", value=False)
+    analysis_mode = st.selectbox(
+        "Analysis mode",
+        ANALYSIS_MODES,
+        index=ANALYSIS_MODES.index(ANALYSIS_MODE),
+        help="single_pass: one model returns the structured verdict directly (falls back to two_stage on failure). "
+             "two_stage: deepseek-r1 analysis followed by gpt-4o structuring."
+    )
+    job_columns = st.columns(2)
+    tenant = job_columns[0].text_input(
+        "Recruiter / team",
+        value="default",
+        help="Workers are shared fairly between recruiters, so a large upload doesn't hold up everyone else's jobs."
+    ).strip() or "default"
+    priority = job_columns[1].selectbox(
+        "Priority",
+        list(PRIORITY_LEVELS),
+        index=list(PRIORITY_LEVELS).index("normal"),
+        help="Urgent jobs are picked up and processed first. Small jobs always get a reserved share of the workers."
+    )
+    batch_mode = st.checkbox(
+        "Batch mode (offline processing for large ZIPs)",
+        value=False,
+        help="Submits single-pass analysis requests as provider batch jobs and polls until they finish. "
+             "Cheaper and avoids rate limits, but results can take hours."
+    )
+
+    if EMBEDDED_WORKERS:
+        start_embedded_workers(EMBEDDED_WORKERS)
+    job_store = resume_engine.get_job_store()
+
+    # Jobs interrupted by a crash, or finished with failed files, can be continued from their checkpoints
+    resume_job_id = None
+    unfinished_jobs = [
+        job for job in job_store.list_unfinished_jobs()
+        if job["job_id"] != st.session_state.get("job_id") and job["status"] not in ("queued", "running")
+    ]
+    if unfinished_jobs:
+        with st.expander(f"Unfinished jobs ({len(unfinished_jobs)})"):
+            for unfinished_job in unfinished_jobs:
+                started = datetime.datetime.fromtimestamp(unfinished_job["created_at"]).strftime("%Y-%m-%d %H:%M")
+                job_columns = st.columns([4, 1, 1])
+                job_columns[0].write(
+                    f"{unfinished_job['zip_name']}: {unfinished_job['saved_files']}/{unfinished_job['total_files']} saved, started {started}"
+                )
+                if job_columns[1].button("Resume", key=f"resume_{unfinished_job['job_id']}"):
+                    resume_job_id = unfinished_job["job_id"]
+                if job_columns[2].button("Discard", key=f"discard_{unfinished_job['job_id']}"):
+                    job_store.finish_job(unfinished_job["job_id"])
+                    st.rerun()
+
+    job = None
+    try:
+        if resume_job_id:
+            # Workers only process the files of a resumed job that were not saved yet
+            job_store.requeue_job(resume_job_id)
+            job = job_store.get_job(resume_job_id)
+        elif uploaded_file:
+            zip_hash = resume_engine.hash_file(uploaded_file)
+            current_job = job_store.get_job(st.session_state["job_id"]) if st.session_state.get("job_id") else None
+            if current_job and current_job["zip_hash"] == zip_hash:
+                # Rerun of this session: keep following the job submitted for this ZIP
+                job = current_job
+            else:
+                job = job_store.find_unfinished_job(zip_hash)
+                if job:
+                    st.info("Continuing the unfinished job for this ZIP file.")
+                    if job["status"] == "incomplete":
+                        job_store.requeue_job(job["job_id"])
                 else:
-                    st.warning("No resume files found in the ZIP file.")
-        except Exception as e:
-            st.error(f"Error processing ZIP file: {str(e)}")
+                    job = resume_engine.submit_job(
+                        uploaded_file, uploaded_file.name, job_store, analysis_mode, batch_mode, force_reprocess,
+                        tenant, PRIORITY_LEVELS[priority]
+                    )
+                    if job is None:
+                        st.warning("No resume files found in the ZIP file.")
+        elif st.session_state.get("job_id"):
+            job = job_store.get_job(st.session_state["job_id"])
+
+        if job:
+            st.session_state["job_id"] = job["job_id"]
+            progress_area = st.container()
+
+            # Rows appear in the grid as they are saved; filters and exports also work while the job runs
+            st.subheader("Processed Resumes")
+            filters = result_filters()
+            export_controls(job, filters)
+            results_grid = st.empty()
+
+            job = poll_job(job["job_id"], job_store, filters, progress_area, results_grid)
+            show_job_results(job, job_store, filters, results_grid)
+    except Exception as e:
+        st.error(f"Error processing ZIP file: {str(e)}")
 
 if __name__ == "__main__":
     main()
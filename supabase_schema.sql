@@ -0,0 +1,49 @@
+-- Schema of the tables used by st_app_modified_final.py
+
+-- One row per processed ZIP upload; deleting a run deletes its applicants
+create table if not exists applicant_runs (
+    run_id text primary key,
+    zip_name text,
+    created_at timestamptz not null default now()
+);
+
+create index if not exists applicant_runs_created_at_idx on applicant_runs (created_at);
+
+create table if not exists bulk_applicants (
+    id bigint generated by default as identity primary key,
+    created_at timestamptz not null default now(),
+    run_id text references applicant_runs (run_id) on delete cascade,
+    name text,
+    mobile text,
+    email text,
+    resume_url text,
+    candidate_category text,
+    special_remarks text,
+    justification text,
+    -- SHA-256 of the resume file; rows are upserted on (run_id, content_hash) so re-processed resumes don't duplicate
+    content_hash text,
+    -- Position of the file in the run's ZIP; results are shown and exported in this order
+    file_index integer,
+    -- Near-duplicate of an earlier resume: (run_id, content_hash) of the row whose verdict was reused.
+    -- Not a foreign key, the earlier run may be purged first.
+    duplicate_of_run_id text,
+    duplicate_of_hash text
+);
+
+alter table bulk_applicants add column if not exists content_hash text;
+alter table bulk_applicants add column if not exists run_id text references applicant_runs (run_id) on delete cascade;
+alter table bulk_applicants add column if not exists duplicate_of_run_id text;
+alter table bulk_applicants add column if not exists duplicate_of_hash text;
+alter table bulk_applicants add column if not exists file_index integer;
+-- Rows saved before file_index existed keep the order they were saved in
+update bulk_applicants set file_index = numbered.position
+from (
+    select id, row_number() over (partition by run_id order by id) - 1 as position
+    from bulk_applicants where file_index is null
+) as numbered
+where bulk_applicants.id = numbered.id;
+drop index if exists bulk_applicants_content_hash_key;
+create unique index if not exists bulk_applicants_run_content_hash_key on bulk_applicants (run_id, content_hash);
+-- Keyset pagination of one run's results in ZIP order
+drop index if exists bulk_applicants_run_id_id_idx;
+create index if not exists bulk_applicants_run_file_index_idx on bulk_applicants (run_id, file_index);
@@ -0,0 +1,96 @@
+import threading
+from concurrent.futures import Future
+
+from rate_limiter import call_with_retry, get_limiter
+
+# Default flush policy of the buffered writer
+DEFAULT_FLUSH_ROWS = 20
+DEFAULT_FLUSH_SECONDS = 1.0
+
+
+class BulkApplicantWriter:
+    """Buffers rows for the bulk_applicants table and upserts them in bulk.
+
+    A flush happens every `flush_rows` rows or `flush_seconds` seconds, whichever comes first, always on the
+    background flusher thread so the callers of `add()` never wait on the upsert. Every row
+    is stamped with `run_id` and upserted on `conflict_columns` (the run and the resume content hash), so
+    a retried or re-run resume updates its existing row instead of adding a duplicate. `add()` returns a
+    Future that resolves once the row's flush has succeeded (or raises its error).
+    """
+
+    def __init__(self, supabase, run_id, table="bulk_applicants", conflict_columns=("run_id", "content_hash"),
+                 flush_rows=DEFAULT_FLUSH_ROWS, flush_seconds=DEFAULT_FLUSH_SECONDS):
+        self.supabase = supabase
+        self.run_id = run_id
+        self.table = table
+        self.conflict_columns = conflict_columns
+        self.flush_rows = flush_rows
+        self.flush_seconds = flush_seconds
+        self.flush_count = 0
+        self.row_count = 0
+
+        self._pending = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._closed = threading.Event()
+        self._wake = threading.Event()
+        self._timer = threading.Thread(target=self._flush_periodically, daemon=True)
+        self._timer.start()
+
+    def add(self, row):
+        future = Future()
+        with self._lock:
+            if self._closed.is_set():
+                raise RuntimeError("BulkApplicantWriter is closed")
+            self._pending.append((dict(row, run_id=self.run_id), future))
+            if len(self._pending) >= self.flush_rows:
+                self._wake.set()
+        return future
+
+    def flush(self):
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, []
+            if not batch:
+                return
+
+            # Postgres rejects an upsert that touches the same key twice, keep the last row per key
+            latest = {}
+            for row, future in batch:
+                latest[tuple(row[column] for column in self.conflict_columns)] = row
+
+            try:
+                call_with_retry(
+                    get_limiter("supabase"),
+                    self.supabase.table(self.table).upsert(list(latest.values()), on_conflict=",".join(self.conflict_columns)).execute
+                )
+            except Exception as e:
+                for row, future in batch:
+                    future.set_exception(e)
+                return
+
+            self.flush_count += 1
+            self.row_count += len(latest)
+            for row, future in batch:
+                future.set_result(None)
+
+    def _flush_periodically(self):
+        while not self._closed.is_set():
+            # Woken early by add() once `flush_rows` rows are buffered
+            self._wake.wait(self.flush_seconds)
+            self._wake.clear()
+            self.flush()
+
+    def close(self):
+        """Flush the remaining rows and stop the background flusher"""
+        with self._lock:
+            self._closed.set()
+        self._wake.set()
+        self._timer.join()
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
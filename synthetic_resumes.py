@@ -0,0 +1,144 @@
+"""Synthetic resume ZIPs for the offline benchmark.
+
+    python synthetic_resumes.py resumes_1000.zip --files 1000
+"""
+import sys
+import random
+import zipfile
+import argparse
+
+from rule_extractor import KNOWN_BPO_COMPANIES, NORTHEAST_PLACES
+
+FIRST_NAMES = ("Rahul", "Priya", "Amit", "Sneha", "Vikram", "Anjali", "Rohan", "Pooja", "Arjun", "Neha", "Karan", "Divya")
+LAST_NAMES = ("Sharma", "Verma", "Singh", "Gupta", "Das", "Nair", "Iyer", "Bora", "Sangma", "Khan", "Patel", "Reddy")
+OTHER_CITIES = ("Delhi", "Noida", "Gurugram", "Kolkata", "Mumbai", "Pune", "Bengaluru", "Hyderabad", "Jaipur", "Lucknow")
+OTHER_COMPANIES = ("Reliance Retail", "Big Bazaar", "Tata Motors", "HDFC Bank", "Zomato", "Flipkart", "Infosys")
+
+# Experience profiles and their share of the generated resumes
+PROFILES = (
+    ("collections", 0.3, "Voice Agent - International Debt Collection", "Handled US debt collection calls and loan recovery."),
+    ("customer_service", 0.3, "Customer Service Executive", "Resolved customer support calls and handled sales follow-ups."),
+    ("unrelated", 0.2, "Accounts Assistant", "Maintained ledgers and prepared monthly reports."),
+    ("fresher", 0.2, None, None),
+)
+
+SKILLS = (
+    "Communication", "Negotiation", "MS Excel", "CRM tools", "Typing 40 WPM", "English and Hindi", "Problem solving",
+    "Objection handling", "Time management", "Data entry",
+)
+
+
+def _pick_profile(rng):
+    draw = rng.random()
+    for name, share, role, duty in PROFILES:
+        draw -= share
+        if draw < 0:
+            return name, role, duty
+    return PROFILES[-1][0], PROFILES[-1][2], PROFILES[-1][3]
+
+
+def generate_resume_text(rng, index, northeast_rate=0.15):
+    """Text of one synthetic resume; the profile, location and filler length vary with `rng`"""
+    name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+    mobile = f"{rng.choice('6789')}{rng.randrange(10 ** 8, 10 ** 9)}"
+    email = f"{name.lower().replace(' ', '.')}{index}@example.com"
+    city = rng.choice(NORTHEAST_PLACES) if rng.random() < northeast_rate else rng.choice(OTHER_CITIES)
+    profile, role, duty = _pick_profile(rng)
+
+    lines = [name, f"Mobile: +91 {mobile}", f"Email: {email}", f"Address: {city}, India", "", "SUMMARY"]
+    if profile == "fresher":
+        lines.append("Fresher seeking my first job in a customer facing role.")
+    else:
+        lines.append(f"{role} with a track record of meeting targets.")
+        lines += ["", "WORK EXPERIENCE"]
+        start = rng.randrange(2012, 2022)
+        for _ in range(rng.randint(1, 3)):
+            company = rng.choice(KNOWN_BPO_COMPANIES if profile == "collections" else OTHER_COMPANIES)
+            end = min(start + rng.randint(1, 3), 2024)
+            lines += [f"{role}, {company}", f"{start} - {end}", duty]
+            start = end
+    lines += ["", "EDUCATION", f"B.Com, University of {rng.choice(OTHER_CITIES)}, {rng.randrange(2008, 2023)}", "", "SKILLS"]
+    lines += rng.sample(SKILLS, rng.randint(3, len(SKILLS)))
+    # Filler of varying length, like hobbies and declarations of real resumes
+    lines += ["", "DECLARATION"] + [
+        "I hereby declare that the above information is true to the best of my knowledge." for _ in range(rng.randint(1, 20))
+    ]
+    return "\n".join(lines)
+
+
+def _pdf_string(text):
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)").encode("latin-1", "replace")
+
+
+def render_pdf(text, scanned=False):
+    """A one-page PDF of `text`. A `scanned` PDF has no text layer, so local extraction fails and it goes to
+    the parser; both carry the text in their document info for fake_services.FakeLlamaParse."""
+    content = b""
+    if not scanned:
+        content = b"BT /F1 10 Tf 12 TL 40 800 Td\n" + b"".join(
+            b"(" + _pdf_string(line) + b") Tj T*\n" for line in text.splitlines()
+        ) + b"ET"
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] /Contents 4 0 R /Resources << /Font << /F1 5 0 R >> >> >>",
+        b"<< /Length " + str(len(content)).encode() + b" >>\nstream\n" + content + b"\nendstream",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+        b"<< /Producer (synthetic_resumes) /SyntheticText <" + text.encode("utf-8").hex().encode("ascii") + b"> >>",
+    ]
+    pdf = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(pdf))
+        pdf += f"{number} 0 obj\n".encode() + body + b"\nendobj\n"
+    xref = len(pdf)
+    pdf += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    pdf += b"".join(f"{offset:010d} 00000 n \n".encode() for offset in offsets)
+    pdf += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R /Info 6 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return bytes(pdf)
+
+
+def write_resume_zip(path, file_count, seed=0, scanned_rate=0.3, duplicate_rate=0.05, near_duplicate_rate=0.05):
+    """Write a ZIP of `file_count` synthetic PDF resumes and return a summary of its contents.
+
+    `scanned_rate` of the files have no text layer. `duplicate_rate` are byte-identical copies of an earlier
+    file under another name, and `near_duplicate_rate` are lightly edited copies (as re-exported by another
+    vendor), to exercise the content cache and the near-duplicate index.
+    """
+    rng = random.Random(seed)
+    texts = []
+    counts = {"files": file_count, "scanned": 0, "duplicates": 0, "near_duplicates": 0}
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zip_ref:
+        for index in range(file_count):
+            draw = rng.random()
+            if texts and draw < duplicate_rate:
+                text, scanned = rng.choice(texts)
+                counts["duplicates"] += 1
+            elif texts and draw < duplicate_rate + near_duplicate_rate:
+                text, scanned = rng.choice(texts)
+                text += f"\nHobbies: {rng.choice(('Cricket', 'Music', 'Reading', 'Travel'))}"
+                counts["near_duplicates"] += 1
+            else:
+                text, scanned = generate_resume_text(rng, index), rng.random() < scanned_rate
+                texts.append((text, scanned))
+            counts["scanned"] += int(scanned)
+            zip_ref.writestr(f"resumes/resume_{index:05d}.pdf", render_pdf(text, scanned))
+    return counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write a ZIP of synthetic resumes")
+    parser.add_argument("zip_path")
+    parser.add_argument("--files", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--scanned-rate", type=float, default=0.3, help="Share of PDFs without a text layer")
+    parser.add_argument("--duplicate-rate", type=float, default=0.05, help="Share of byte-identical copies")
+    parser.add_argument("--near-duplicate-rate", type=float, default=0.05, help="Share of lightly edited copies")
+    args = parser.parse_args(argv)
+    counts = write_resume_zip(args.zip_path, args.files, args.seed, args.scanned_rate, args.duplicate_rate, args.near_duplicate_rate)
+    print(f"Wrote {args.zip_path}: {counts}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,222 @@
+import os
+import json
+import time
+import uuid
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+DEFAULT_TRACE_DIRECTORY = os.path.join(".cache", "traces")
+
+# Span attributes summed into the run report
+USAGE_ATTRIBUTES = ("prompt_tokens", "completion_tokens", "cost_usd")
+
+_current_span = ContextVar("current_span", default=None)
+
+
+def classify_error(error):
+    """Coarse error class recorded on failed spans: rate_limited, timeout, server_error, client_error,
+    invalid_output, input_rejected or other"""
+    # Imported here: rate_limiter reports its retries to this module
+    from rate_limiter import get_status_code, is_rate_limited
+
+    if is_rate_limited(error):
+        return "rate_limited"
+    status = get_status_code(error)
+    if status is not None:
+        return "server_error" if status >= 500 else "timeout" if status == 408 else "client_error"
+    name = type(error).__name__.lower()
+    if "timeout" in name:
+        return "timeout"
+    if "connect" in name:
+        return "server_error"
+    if name == "ziplimiterror":
+        return "input_rejected"
+    if isinstance(error, (ValueError, KeyError)):
+        return "invalid_output"
+    return "other"
+
+
+class Span:
+    """One timed operation of a trace, exported in an OpenTelemetry-like JSON shape"""
+
+    def __init__(self, tracer, name, parent=None, attributes=None):
+        self.tracer = tracer
+        self.name = name
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_span_id = parent.span_id if parent is not None else None
+        self.attributes = dict(attributes or {})
+        self.retries = 0
+        self.start_ns = time.time_ns()
+        self._start = time.perf_counter()
+        self._ended = False
+
+    def set_attributes(self, **attributes):
+        self.attributes.update(attributes)
+
+    def add_attributes(self, **attributes):
+        """Add numeric attributes to the values already recorded (e.g. tokens of several calls)"""
+        for key, value in attributes.items():
+            self.attributes[key] = self.attributes.get(key, 0) + value
+
+    def end(self, error=None):
+        if self._ended:
+            return
+        self._ended = True
+        self.duration_seconds = time.perf_counter() - self._start
+        self.error_type = classify_error(error) if error is not None else None
+        self.tracer.record(self, error)
+
+
+class Tracer:
+    """Collects the spans of one run, appends them to a JSONL file and aggregates them for the run report.
+
+    The trace ID is the run ID. Each line of the file is one finished span with trace_id, span_id,
+    parent_span_id, name, start/end times in Unix nanoseconds, status and attributes.
+    """
+
+    def __init__(self, trace_id, directory=DEFAULT_TRACE_DIRECTORY):
+        self.trace_id = trace_id
+        self.path = None
+        self._file = None
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            self.path = os.path.join(directory, f"{trace_id}.jsonl")
+            self._file = open(self.path, "a", encoding="utf-8")
+        self._lock = threading.Lock()
+        self._durations = {}
+        self._errors = {}
+        self._retries = {}
+        self._usage = {}
+        self._started = time.perf_counter()
+
+    def start_span(self, name, parent=None, **attributes):
+        return Span(self, name, parent, attributes)
+
+    def record(self, span, error=None):
+        record = {
+            "trace_id": self.trace_id,
+            "span_id": span.span_id,
+            "parent_span_id": span.parent_span_id,
+            "name": span.name,
+            "start_time_unix_nano": span.start_ns,
+            "end_time_unix_nano": span.start_ns + int(span.duration_seconds * 1e9),
+            "status": {"code": "ERROR", "message": str(error)} if error is not None else {"code": "OK"},
+            "attributes": dict(span.attributes, retries=span.retries, **({"error.type": span.error_type} if error is not None else {})),
+        }
+        with self._lock:
+            self._durations.setdefault(span.name, []).append(span.duration_seconds)
+            self._retries[span.name] = self._retries.get(span.name, 0) + span.retries
+            if error is not None:
+                errors = self._errors.setdefault(span.name, {})
+                errors[span.error_type] = errors.get(span.error_type, 0) + 1
+            for key in USAGE_ATTRIBUTES:
+                if key in span.attributes:
+                    self._usage[key] = self._usage.get(key, 0) + span.attributes[key]
+            if self._file is not None:
+                self._file.write(json.dumps(record, default=str) + "\n")
+                self._file.flush()
+
+    def summary(self, completed_resumes):
+        """Per-stage count, p50/p95 latency, errors by class and retries, plus throughput and usage totals"""
+        wall_seconds = time.perf_counter() - self._started
+        with self._lock:
+            stages = {
+                name: {
+                    "count": len(durations),
+                    "p50_seconds": percentile(durations, 50),
+                    "p95_seconds": percentile(durations, 95),
+                    "total_seconds": sum(durations),
+                    "errors": dict(self._errors.get(name, {})),
+                    "retries": self._retries.get(name, 0),
+                }
+                for name, durations in self._durations.items()
+            }
+            usage = dict(self._usage)
+        return {
+            "stages": stages,
+            "wall_seconds": wall_seconds,
+            "throughput_per_minute": completed_resumes / wall_seconds * 60 if wall_seconds else 0.0,
+            "prompt_tokens": usage.get("prompt_tokens", 0),
+            "completion_tokens": usage.get("completion_tokens", 0),
+            "cost_usd": usage.get("cost_usd", 0.0),
+            "trace_path": self.path,
+        }
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    if not ordered:
+        return None
+    return ordered[min(len(ordered) - 1, int(pct / 100 * len(ordered)))]
+
+
+def current_span():
+    return _current_span.get()
+
+
+@contextmanager
+def activate(span):
+    """Make `span` the parent of the spans opened in this block (in the current thread)"""
+    token = _current_span.set(span)
+    try:
+        yield span
+    finally:
+        _current_span.reset(token)
+
+
+@contextmanager
+def span(name, **attributes):
+    """Time a block as a child of the current span; a no-op outside a trace"""
+    parent = _current_span.get()
+    if parent is None:
+        yield None
+        return
+    child = parent.tracer.start_span(name, parent, **attributes)
+    token = _current_span.set(child)
+    try:
+        yield child
+    except BaseException as e:
+        child.end(e)
+        raise
+    else:
+        child.end()
+    finally:
+        _current_span.reset(token)
+
+
+def submit(executor, parent, fn, *args, **kwargs):
+    """Submit `fn` to an executor so that it runs with `parent` as its current span"""
+    def run():
+        with activate(parent):
+            return fn(*args, **kwargs)
+    return executor.submit(run)
+
+
+def set_attributes(**attributes):
+    """Set attributes on the current span, if any"""
+    current = _current_span.get()
+    if current is not None:
+        current.set_attributes(**attributes)
+
+
+def add_attributes(**attributes):
+    current = _current_span.get()
+    if current is not None:
+        current.add_attributes(**attributes)
+
+
+def record_retry(error=None):
+    """Count a retry (and the class of the error that caused it) on the current span"""
+    current = _current_span.get()
+    if current is not None:
+        current.retries += 1
+        if error is not None:
+            key = f"retry.{classify_error(error)}"
+            current.attributes[key] = current.attributes.get(key, 0) + 1
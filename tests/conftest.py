@@ -0,0 +1,33 @@
+import os
+import sys
+import json
+import shutil
+import atexit
+import tempfile
+
+# The modules live at the top of the repository
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# resume_engine reads its settings on import: keep every store of the test run in a temporary directory, and
+# give the fake services placeholder credentials and quotas high enough not to slow the tests down
+TEST_DIRECTORY = tempfile.mkdtemp(prefix="resume_tests_")
+atexit.register(shutil.rmtree, TEST_DIRECTORY, True)
+
+os.environ.update({
+    "CACHE_PATH": os.path.join(TEST_DIRECTORY, "cache.sqlite3"),
+    "DEDUP_PATH": os.path.join(TEST_DIRECTORY, "dedup.sqlite3"),
+    "JOB_DB_PATH": os.path.join(TEST_DIRECTORY, "jobs.sqlite3"),
+    "JOBS_DIRECTORY": os.path.join(TEST_DIRECTORY, "jobs"),
+    "TRACE_DIRECTORY": os.path.join(TEST_DIRECTORY, "traces"),
+    "BATCH_DIRECTORY": os.path.join(TEST_DIRECTORY, "batches"),
+    # Batch jobs go to the local mock provider, polled without waiting
+    "BATCH_PROVIDER": "mock",
+    "BATCH_POLL_SECONDS": "0",
+    "RATE_LIMITS": json.dumps({
+        name: {"requests_per_minute": 60000, "tokens_per_minute": None}
+        for name in ("llamaparse", "groq", "openai", "supabase")
+    }),
+})
+for name in ("SUPABASE_KEY", "OPENAI_API_KEY", "LLMA_API_KEY", "LLAMA_CLOUD_API_KEY"):
+    os.environ.setdefault(name, "test")
+os.environ.setdefault("SUPABASE_URL", "http://supabase.test")
@@ -0,0 +1,56 @@
+import os
+import json
+
+import pytest
+
+# batch_processor builds its requests with LLM_Analyzer, which reads the settings through python-dotenv
+pytest.importorskip("dotenv")
+
+from LLM_Analyzer import MODEL_PRICING, SINGLE_PASS_MODEL
+from batch_processor import MockBatchProvider, batch_usage_stats, run_batch_analysis, write_batch_files
+
+TEXTS = {str(i): f"Candidate {i}\nSales executive at a loan recovery agency for {i} years" for i in range(5)}
+
+
+def test_batch_files_are_split_at_the_request_limit(tmp_path):
+    paths = write_batch_files(TEXTS, str(tmp_path), max_requests=2)
+    assert [os.path.basename(path) for path in paths] == ["batch_input_0000.jsonl", "batch_input_0001.jsonl", "batch_input_0002.jsonl"]
+    with open(paths[0], encoding="utf-8") as f:
+        requests = [json.loads(line) for line in f]
+    assert [request["custom_id"] for request in requests] == ["0", "1"]
+    assert all(request["url"] == "/v1/chat/completions" for request in requests)
+
+
+def test_mock_batch_run_returns_verdicts_with_usage_and_deletes_its_files(tmp_path):
+    directory = str(tmp_path / "batch")
+    statuses = []
+    outcomes = run_batch_analysis(
+        TEXTS, MockBatchProvider(polls_until_complete=2), directory, poll_interval=0,
+        on_status=lambda batch_id, status: statuses.append(status)
+    )
+
+    assert statuses == ["in_progress", "in_progress", "completed"]
+    assert set(outcomes) == set(TEXTS)
+    for result, error, usage in outcomes.values():
+        assert error is None
+        assert result["category"] == "unsuitable"
+        assert usage["prompt_tokens"] > 0 and usage["completion_tokens"] > 0
+    assert not os.path.exists(directory)
+
+
+def test_requests_missing_from_the_output_are_reported_as_errors(tmp_path):
+    class LosingProvider(MockBatchProvider):
+        def read_file(self, file_id):
+            return super().read_file(file_id)[1:]
+
+    outcomes = run_batch_analysis(TEXTS, LosingProvider(polls_until_complete=0), str(tmp_path), poll_interval=0)
+    assert outcomes["0"] == (None, "no result returned by the batch job", {})
+    assert all(outcomes[custom_id][0] is not None for custom_id in ("1", "2", "3", "4"))
+
+
+def test_batch_usage_is_priced_at_half_the_interactive_price():
+    input_price, output_price = MODEL_PRICING[SINGLE_PASS_MODEL]
+    stats = batch_usage_stats({"prompt_tokens": 1_000_000, "completion_tokens": 1_000_000})
+    assert stats["prompt_tokens"] == stats["completion_tokens"] == 1_000_000
+    assert stats["cost_usd"] == pytest.approx((input_price + output_price) / 2)
+    assert batch_usage_stats({})["cost_usd"] == 0
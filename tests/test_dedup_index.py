@@ -0,0 +1,88 @@
+import time
+import random
+
+import pytest
+
+from dedup_index import DuplicateIndex, minhash_signature, signature_similarity
+
+FINGERPRINT = "single_pass:v1"
+VERDICT = {"category": "suitable", "justification": "Field sales experience."}
+
+
+def resume_text(seed, words=400):
+    rng = random.Random(seed)
+    vocabulary = [f"word{i}" for i in range(2000)]
+    return " ".join(rng.choice(vocabulary) for _ in range(words))
+
+
+def edited(text, changed_words, seed=0):
+    """The text with `changed_words` words, spread evenly, replaced"""
+    words = text.split()
+    rng = random.Random(seed)
+    step = len(words) // changed_words
+    for i in range(0, step * changed_words, step):
+        words[i] = f"edit{rng.randrange(10 ** 6)}"
+    return " ".join(words)
+
+
+@pytest.fixture
+def index(tmp_path):
+    return DuplicateIndex(str(tmp_path / "dedup.sqlite3"))
+
+
+def test_similarity_estimates_follow_the_amount_of_change():
+    text = resume_text(1)
+    signature = minhash_signature(text)
+    assert signature_similarity(signature, minhash_signature(text)) == 1.0
+    assert signature_similarity(signature, minhash_signature(text.upper().replace(" ", ",\n"))) == 1.0
+    assert signature_similarity(signature, minhash_signature(edited(text, 4))) > 0.85
+    assert signature_similarity(signature, minhash_signature(resume_text(2))) < 0.1
+
+
+def test_finds_near_duplicates_above_the_threshold_only(index):
+    text = resume_text(1)
+    index.add("original", "run1", minhash_signature(text), {}, FINGERPRINT, VERDICT)
+
+    match = index.find(minhash_signature(edited(text, 4)), {}, FINGERPRINT)
+    assert match["content_hash"] == "original"
+    assert match["run_id"] == "run1"
+    assert match["verdict"] == VERDICT
+    assert match["similarity"] >= index.threshold
+
+    assert index.find(minhash_signature(edited(text, 40)), {}, FINGERPRINT) is None
+    assert index.find(minhash_signature(resume_text(2)), {}, FINGERPRINT) is None
+
+
+def test_shared_contact_lowers_the_threshold(index):
+    text = resume_text(1)
+    contacts = {"mobile": "9876543210", "email": "ravi@example.com"}
+    index.add("original", "run1", minhash_signature(text), contacts, FINGERPRINT, VERDICT)
+
+    signature = minhash_signature(edited(text, 12))
+    similarity = signature_similarity(signature, minhash_signature(text))
+    assert index.contact_threshold <= similarity < index.threshold
+    assert index.find(signature, {}, FINGERPRINT) is None
+    assert index.find(signature, {"mobile": "9876543210"}, FINGERPRINT)["content_hash"] == "original"
+
+
+def test_verdicts_are_only_reused_within_the_same_fingerprint(index):
+    signature = minhash_signature(resume_text(1))
+    index.add("original", "run1", signature, {}, FINGERPRINT, VERDICT)
+    assert index.find(signature, {}, "two_stage:v1") is None
+    assert index.find(signature, {}, FINGERPRINT, exclude_hash="original") is None
+
+
+def test_re_adding_a_file_replaces_its_entry(index):
+    signature = minhash_signature(resume_text(1))
+    index.add("original", "run1", signature, {}, FINGERPRINT, VERDICT)
+    index.add("original", "run2", signature, {}, FINGERPRINT, VERDICT)
+    assert index.count() == 1
+    assert index.find(signature, {}, FINGERPRINT)["run_id"] == "run2"
+
+
+def test_remove_older_than_drops_expired_entries(index):
+    index.add("old", "run1", minhash_signature(resume_text(1)), {"email": "a@example.com"}, FINGERPRINT, VERDICT)
+    cutoff = time.time() + 1
+    assert index.remove_older_than(cutoff) == 1
+    assert index.count() == 0
+    assert index.find(minhash_signature(resume_text(1)), {"email": "a@example.com"}, FINGERPRINT) is None
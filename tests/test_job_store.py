@@ -0,0 +1,110 @@
+import os
+import time
+
+import pytest
+
+from job_store import JobStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    return JobStore(str(tmp_path / "jobs.sqlite3"), str(tmp_path / "jobs"))
+
+
+def create(store, job_id, file_count=3, **kwargs):
+    with open(store.zip_path_for(job_id), "wb") as f:
+        f.write(b"zip")
+    return store.create_job(job_id, f"{job_id}.zip", f"hash_{job_id}", job_id,
+                            [f"resume_{i}.pdf" for i in range(file_count)], **kwargs)
+
+
+def test_claims_by_priority_then_small_jobs_then_age(store):
+    create(store, "old_large", file_count=5)
+    create(store, "new_small", file_count=1)
+    create(store, "urgent_large", file_count=5, priority=10)
+
+    claimed = [store.claim_next_job("w", small_job_files=2)["job_id"] for _ in range(3)]
+    assert claimed == ["urgent_large", "new_small", "old_large"]
+    assert store.claim_next_job("w") is None
+
+
+def test_small_only_claims_count_remaining_files(store):
+    create(store, "large", file_count=4)
+    assert store.claim_next_job("w", small_job_files=2, small_only=True) is None
+
+    for i in range(3):
+        store.update_file("large", i, stage="saved")
+    job = store.claim_next_job("w", small_job_files=2, small_only=True)
+    assert job["job_id"] == "large"
+    assert job["remaining_files"] == 1
+
+
+def test_stale_running_job_is_reclaimed(store):
+    create(store, "job")
+    assert store.claim_next_job("w1")["worker_id"] == "w1"
+    assert store.claim_next_job("w2") is None
+
+    with store._conn:
+        store._conn.execute("UPDATE jobs SET heartbeat_at = ? WHERE job_id = 'job'", (time.time() - 3600,))
+    assert store.claim_next_job("w2", stale_seconds=60)["worker_id"] == "w2"
+
+
+def test_tenant_limit_skips_busy_tenants(store):
+    create(store, "a1", tenant="a")
+    create(store, "a2", tenant="a")
+    create(store, "b1", tenant="b")
+
+    claimed = [store.claim_next_job("w", tenant_max_jobs=1)["job_id"] for _ in range(2)]
+    assert claimed == ["a1", "b1"]
+    assert store.claim_next_job("w", tenant_max_jobs=1) is None
+
+
+def test_requeued_job_only_counts_new_failures(store):
+    create(store, "job")
+    store.claim_job("job", "w")
+    store.update_file("job", 0, stage="saved")
+    store.update_file("job", 1, error="parse failed")
+    store.complete_job("job")
+    assert store.get_job("job")["status"] == "incomplete"
+    assert store.stage_counts("job") == {"saved": 1, "failed": 1, "pending": 1}
+
+    store.requeue_job("job")
+    job = store.claim_next_job("w")
+    assert job["job_id"] == "job"
+    assert job["remaining_files"] == 2
+    assert store.stage_counts("job") == {"saved": 1, "pending": 2}
+
+
+def test_completed_job_deletes_its_zip(store):
+    create(store, "job", file_count=1)
+    store.claim_job("job", "w")
+    store.update_file("job", 0, stage="saved")
+    store.complete_job("job", summary={"saved": 1})
+    assert store.get_job("job")["status"] == "completed"
+    assert store.get_summary("job") == {"saved": 1}
+    assert not os.path.exists(store.zip_path_for("job"))
+
+
+def test_saved_since_counts_and_lists_recent_files(store):
+    create(store, "job")
+    since = time.time()
+    store.update_file("job", 0, stage="saved", content_hash="h0")
+    store.update_file("job", 1, stage="analyzed", content_hash="h1")
+
+    assert store.count_saved_since(since) == 1
+    assert store.count_saved_since(since, job_id="other") == 0
+    assert [row["content_hash"] for row in store.list_saved_since("job", since)] == ["h0"]
+    assert store.list_saved_since("job", time.time() + 1) == []
+
+
+def test_remove_finished_older_than_keeps_active_jobs(store):
+    create(store, "finished")
+    create(store, "queued")
+    store.complete_job("finished")
+    cutoff = time.time() + 1
+
+    assert store.remove_finished_older_than(cutoff) == 1
+    assert store.get_job("finished") is None
+    assert store.get_files("finished") == []
+    assert not os.path.exists(store.zip_path_for("finished"))
+    assert store.get_job("queued")["status"] == "queued"
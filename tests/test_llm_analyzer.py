@@ -0,0 +1,77 @@
+import os
+import json
+
+import pytest
+
+# LLM_Analyzer reads its settings through python-dotenv
+pytest.importorskip("dotenv")
+
+import service_clients
+from rate_limiter import configure_limiters
+from fake_services import FakeGroq, FakeOpenAI
+from LLM_Analyzer import ANALYZER_MAX_COMPLETION_TOKENS, ANALYZER_RETRY_MAX_COMPLETION_TOKENS, two_stage_analysis
+
+RESUME = "Ravi Kumar\n+91 98765 43210\nravi.kumar@example.com\nDebt collection agent, US process, iQor, 2019-2022"
+REASONING = "<think>Three years of debt collection for a US process at iQor, so the candidate is good"
+
+
+class CappedGroq(FakeGroq):
+    """Analyzer whose reasoning needs `needed_tokens` completion tokens before it answers"""
+
+    def __init__(self, needed_tokens, reasoning=REASONING):
+        super().__init__()
+        self.caps = []
+
+        def respond(messages, kwargs):
+            self.caps.append(kwargs["max_completion_tokens"])
+            if kwargs["max_completion_tokens"] < needed_tokens:
+                return reasoning
+            return FakeGroq.respond(messages, kwargs)
+        self.chat.completions.respond = respond
+
+
+@pytest.fixture
+def analyzer():
+    configure_limiters(json.loads(os.environ["RATE_LIMITS"]))
+    service_clients.set_client("openai", FakeOpenAI())
+
+    def install(needed_tokens, **kwargs):
+        groq = CappedGroq(needed_tokens, **kwargs)
+        service_clients.set_client("groq", groq)
+        return groq
+    yield install
+    service_clients.reset_clients()
+
+
+def test_answer_within_the_cap_needs_one_call(analyzer):
+    groq = analyzer(0)
+    stats = {}
+    result = two_stage_analysis(RESUME, stats)
+    assert groq.caps == [ANALYZER_MAX_COMPLETION_TOKENS]
+    assert "analyzer_fallback" not in stats
+    assert result["category"] == "good"
+
+
+def test_reasoning_cut_off_is_retried_once_with_a_larger_cap(analyzer):
+    groq = analyzer(ANALYZER_MAX_COMPLETION_TOKENS + 1)
+    stats = {}
+    result = two_stage_analysis(RESUME, stats)
+    assert groq.caps == [ANALYZER_MAX_COMPLETION_TOKENS, ANALYZER_RETRY_MAX_COMPLETION_TOKENS]
+    assert stats["analyzer_fallback"] == "retried"
+    assert result["category"] == "good"
+    assert len(stats["calls"]) == 3
+
+
+def test_reasoning_cut_off_twice_is_structured_instead_of_failing(analyzer):
+    groq = analyzer(ANALYZER_RETRY_MAX_COMPLETION_TOKENS + 1)
+    stats = {}
+    result = two_stage_analysis(RESUME, stats)
+    assert groq.caps == [ANALYZER_MAX_COMPLETION_TOKENS, ANALYZER_RETRY_MAX_COMPLETION_TOKENS]
+    assert stats["analyzer_fallback"] == "truncated_reasoning"
+    assert result["category"] == "good"
+
+
+def test_no_answer_and_no_reasoning_still_fails(analyzer):
+    analyzer(ANALYZER_RETRY_MAX_COMPLETION_TOKENS + 1, reasoning="<think>")
+    with pytest.raises(ValueError, match="neither an answer nor reasoning"):
+        two_stage_analysis(RESUME, {})
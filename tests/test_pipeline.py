@@ -0,0 +1,108 @@
+import csv
+
+import pytest
+
+# The engine needs the packages of requirements.txt; skip the end-to-end tests where they aren't installed
+pytest.importorskip("dotenv")
+pytest.importorskip("pandas")
+
+import service_clients
+import resume_engine
+from job_store import JobStore
+from fake_services import FakeLlamaParse, FakeServiceError, ServiceBehavior, install_fake_services
+from synthetic_resumes import write_resume_zip
+
+
+@pytest.fixture
+def fakes():
+    yield install_fake_services()
+    service_clients.reset_clients()
+
+
+@pytest.fixture
+def job_store(tmp_path):
+    return JobStore(str(tmp_path / "jobs.sqlite3"), str(tmp_path / "jobs"))
+
+
+def submit_and_run(tmp_path, job_store, file_count, seed, batch_mode=False):
+    zip_path = tmp_path / "resumes.zip"
+    write_resume_zip(str(zip_path), file_count, seed=seed, duplicate_rate=0, near_duplicate_rate=0)
+    with open(zip_path, "rb") as zip_file:
+        job = resume_engine.submit_job(zip_file, "resumes.zip", job_store, batch_mode=batch_mode)
+    job = job_store.claim_job(job["job_id"], worker_id="test")
+    return job, resume_engine.run_claimed_job(job, job_store)
+
+
+def test_job_runs_every_file_through_to_the_database(tmp_path, job_store, fakes):
+    job, summary = submit_and_run(tmp_path, job_store, 8, seed=101)
+
+    assert summary["success_count"] == 8
+    assert summary["error_count"] == 0
+    assert job_store.get_job(job["job_id"])["status"] == "completed"
+    assert job_store.stage_counts(job["job_id"]) == {"saved": 8}
+    assert all(f["url"] and f["content_hash"] for f in job_store.get_files(job["job_id"]))
+    assert len(fakes["supabase"].objects) == 8
+
+
+def test_results_are_paged_and_exported_in_zip_order(tmp_path, job_store, fakes):
+    # Random parse latencies make the files finish out of ZIP order
+    service_clients.set_client("llamaparse", FakeLlamaParse(ServiceBehavior(latency_seconds=0.01, jitter=1.0, seed=7)))
+    job, summary = submit_and_run(tmp_path, job_store, 8, seed=404)
+    zip_order = [f["content_hash"] for f in job_store.get_files(job["job_id"])]
+
+    pages = list(resume_engine.iter_run_applicants_pages(job["job_id"], page_size=3))
+    assert [len(page) for page in pages] == [3, 3, 2]
+    assert [row["content_hash"] for page in pages for row in page] == zip_order
+    second_page = next(resume_engine.iter_run_applicants_pages(job["job_id"], page_size=3, after_index=pages[0][-1]["file_index"]))
+    assert [row["content_hash"] for row in second_page] == zip_order[3:6]
+
+    export_path = tmp_path / "results.csv"
+    assert resume_engine.export_run_applicants(job["job_id"], str(export_path)) == 8
+    with open(export_path, newline="", encoding="utf-8") as f:
+        assert [row["content_hash"] for row in csv.DictReader(f)] == zip_order
+
+def test_batch_job_saves_every_file_and_reports_batch_verdicts(tmp_path, job_store, fakes):
+    # Clear freshers are classified by the rules, the rest go through the mock batch provider
+    job, summary = submit_and_run(tmp_path, job_store, 8, seed=303, batch_mode=True)
+
+    assert summary["success_count"] == 8
+    assert job_store.get_job(job["job_id"])["status"] == "completed"
+    assert job_store.stage_counts(job["job_id"]) == {"saved": 8}
+    job_files = job_store.get_files(job["job_id"])
+    assert all(f["url"] and f["tier"] for f in job_files)
+
+    rows = [row for row in fakes["supabase"].tables["bulk_applicants"] if row["run_id"] == job["job_id"]]
+    assert sorted(row["content_hash"] for row in rows) == sorted(f["content_hash"] for f in job_files)
+    batch = summary["llm_modes"]["batch"]
+    assert batch["resumes"] == 8 - summary["llm_modes"].get("rules", {}).get("resumes", 0)
+    assert batch["tokens"] > 0 and batch["cost_usd"] > 0
+
+
+class FailingParser(FakeLlamaParse):
+    """Rejects every file with a non-retryable error until `failing` is cleared"""
+
+    failing = True
+
+    def load_data(self, file_source, extra_info=None):
+        if self.failing:
+            raise FakeServiceError(400, "Unsupported file")
+        return super().load_data(file_source, extra_info)
+
+
+def test_requeued_job_only_reprocesses_its_failed_files(tmp_path, job_store, fakes):
+    parser = FailingParser()
+    service_clients.set_client("llamaparse", parser)
+    job, summary = submit_and_run(tmp_path, job_store, 4, seed=202)
+
+    assert summary["success_count"] < 4
+    assert job_store.get_job(job["job_id"])["status"] == "incomplete"
+    saved_before = job_store.stage_counts(job["job_id"]).get("saved", 0)
+
+    parser.failing = False
+    job_store.requeue_job(job["job_id"])
+    job = job_store.claim_next_job("test")
+    summary = resume_engine.run_claimed_job(job, job_store)
+
+    assert summary["success_count"] == 4 - saved_before
+    assert job_store.get_job(job["job_id"])["status"] == "completed"
+    assert job_store.stage_counts(job["job_id"]) == {"saved": 4}
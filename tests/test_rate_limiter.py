@@ -0,0 +1,80 @@
+from types import SimpleNamespace
+
+import pytest
+
+from rate_limiter import RateLimiter, RateLimitExceeded, _TokenBucket, call_with_retry
+
+
+class HTTPError(Exception):
+    """Shaped like the SDK errors rate_limiter inspects"""
+
+    def __init__(self, status_code, retry_after=None):
+        super().__init__(f"Error code: {status_code}")
+        headers = {"retry-after": str(retry_after)} if retry_after is not None else {}
+        self.response = SimpleNamespace(status_code=status_code, headers=headers)
+
+
+def test_bucket_refills_at_its_per_minute_rate():
+    bucket = _TokenBucket(60)
+    bucket.take(60)
+    assert bucket.level == 0
+
+    bucket.refill(bucket.updated + 10, 1.0)
+    assert bucket.level == pytest.approx(10)
+    assert bucket.wait_time(20, 1.0) == pytest.approx(10)
+
+
+def test_bucket_refill_is_capped_and_slowed_by_the_factor():
+    bucket = _TokenBucket(60)
+    bucket.take(60)
+    bucket.refill(bucket.updated + 10, 0.5)
+    assert bucket.level == pytest.approx(5)
+
+    bucket.refill(bucket.updated + 3600, 1.0)
+    assert bucket.level == 60
+
+
+def test_request_larger_than_the_bucket_waits_for_a_full_bucket_only():
+    bucket = _TokenBucket(60)
+    assert bucket.wait_time(1000, 1.0) == 0
+    bucket.take(1000)
+    assert bucket.level == 0
+    assert bucket.wait_time(1000, 1.0) == pytest.approx(60)
+
+
+def test_throttled_call_is_retried_after_retry_after():
+    limiter = RateLimiter("test", requests_per_minute=6000)
+    responses = [HTTPError(429, retry_after=0), "ok"]
+
+    def call():
+        response = responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    assert call_with_retry(limiter, call) == "ok"
+    assert limiter.throttled_count == 1
+
+
+def test_call_still_throttled_after_the_retries_raises_rate_limit_exceeded():
+    limiter = RateLimiter("test", requests_per_minute=6000)
+
+    def call():
+        raise HTTPError(429, retry_after=0)
+
+    with pytest.raises(RateLimitExceeded):
+        call_with_retry(limiter, call, max_retries=2)
+    assert limiter.throttled_count == 2
+
+
+def test_client_errors_are_not_retried():
+    limiter = RateLimiter("test", requests_per_minute=6000)
+    calls = []
+
+    def call():
+        calls.append(1)
+        raise HTTPError(400)
+
+    with pytest.raises(HTTPError):
+        call_with_retry(limiter, call)
+    assert len(calls) == 1
@@ -0,0 +1,94 @@
+import pytest
+
+from rule_extractor import (
+    extract_contact_fields, extract_email, extract_mobile, extract_special_remarks, find_fresher_reason, merge_rule_fields,
+    rule_based_verdict
+)
+
+HEADER = "Ravi Kumar\n{line}\nravi.kumar@example.com\n\nEXPERIENCE\nCollections agent at iQor, 2019 - 2022"
+
+
+@pytest.mark.parametrize("line, mobile", [
+    ("9876543210", "9876543210"),
+    ("+91 98765 43210", "9876543210"),
+    ("+91-9876543210", "9876543210"),
+    ("0091 9876543210", "9876543210"),
+    ("09876543210", "9876543210"),
+    ("(+91) 98765-43210", "9876543210"),
+    ("Mob: 987 654 3210", "9876543210"),
+    ("Phone: 5876543210", None),
+    ("Phone: 98765432101", None),
+    ("Pin: 781001", None),
+])
+def test_mobile_formats(line, mobile):
+    assert extract_mobile(HEADER.format(line=line)) == mobile
+
+
+@pytest.mark.parametrize("text, mobile", [
+    # A referee's number is not the candidate's
+    ("Ravi Kumar\nravi@example.com\n\nEXPERIENCE\nAgent at iQor\n\nREFERENCES\nMr. Sharma, Manager\nPhone: 9123456789", None),
+    ("Ravi Kumar\n\nEXPERIENCE\nAgent at iQor\n\nREFERENCES\nMr. Sharma: 9123456789\n\nPERSONAL DETAILS\nMobile: 9876543210", "9876543210"),
+    # Contact sections and labelled lines further down count
+    ("Ravi Kumar\n\nEXPERIENCE\nAgent at iQor\n\nCONTACT\n98765 43210", "9876543210"),
+    ("Ravi Kumar\n\nEXPERIENCE\nAgent at iQor\nWhatsApp: 9876543210", "9876543210"),
+    # A number in the body that isn't labelled as a contact
+    ("Ravi Kumar\n\nEXPERIENCE\nHandled escalations on the 9876543210 helpline", None),
+])
+def test_mobile_is_only_read_from_the_candidates_own_contact_lines(text, mobile):
+    assert extract_mobile(text) == mobile
+
+
+@pytest.mark.parametrize("text, email", [
+    (HEADER.format(line="9876543210"), "ravi.kumar@example.com"),
+    ("Ravi Kumar\nEmail: Ravi.Kumar+jobs@Example.co.in", "ravi.kumar+jobs@example.co.in"),
+    ("Ravi Kumar\n\nREFERENCES\nMail: sharma@example.com", None),
+    ("Ravi Kumar\nnot-an-email@localhost", None),
+])
+def test_email(text, email):
+    assert extract_email(text) == email
+
+
+@pytest.mark.parametrize("text, remarks", [
+    ("Ravi Kumar\nGuwahati, Assam\n\nEXPERIENCE\nAgent at iQor", "northeast"),
+    ("Ravi Kumar\n\nEXPERIENCE\nAgent at iQor\nAddress: Tawang, Arunachal", "northeast"),
+    ("Ravi Kumar\n\nEXPERIENCE\nAgent at iQor\nAddress: Tinsukia", "northeast"),
+    ("Ravi Kumar\n\nPERSONAL DETAILS\nNative place: Shillong", "northeast"),
+    # A place missing from the gazetteer, or no place at all: the LLM decides
+    ("Ravi Kumar\n\nEXPERIENCE\nAgent at iQor\nAddress: Haflong", None),
+    ("Ravi Kumar\nPune, Maharashtra\n\nEXPERIENCE\nAgent at iQor", None),
+    # A northeast job location or referee address is not where the candidate is from
+    ("Ravi Kumar\nPune\n\nEXPERIENCE\nAgent at the Guwahati branch of iQor", None),
+    ("Ravi Kumar\nPune\n\nREFERENCES\nMr. Sharma\nAddress: Shillong", None),
+    ("Ravi Kumar\nLanguages: Assamese, Hindi", None),
+])
+def test_northeast_is_only_flagged_from_the_candidates_address(text, remarks):
+    assert extract_special_remarks(text) == remarks
+
+
+def test_rules_do_not_overwrite_an_llm_northeast_they_cannot_confirm():
+    llm_result = {"name": "Ravi Kumar", "mobile": "9876543210", "email": "N/A", "category": "good",
+                  "justification": "Debt collection.", "special_remarks": "northeast"}
+    text = "Ravi Kumar\n9876543210\n\nEXPERIENCE\nAgent at iQor\nAddress: Haflong\n\nREFERENCES\nPhone: 9123456789"
+    merged, agreement = merge_rule_fields(llm_result, extract_contact_fields(text))
+    assert merged["special_remarks"] == "northeast"
+    assert merged["mobile"] == "9876543210"
+    assert agreement == {"name": True, "mobile": True}
+
+
+@pytest.mark.parametrize("text, is_fresher", [
+    ("Ravi Kumar\nFresher seeking my first job in a voice process", True),
+    ("Ravi Kumar\nObjective: fresh graduate seeking first opportunity", True),
+    ("Ravi Kumar\nFresher\nWork experience: nil", True),
+    ("Ravi Kumar\nFresher\nInternship at a call centre", False),
+    ("Ravi Kumar\nFresher\nWorked as a tele-caller, 2 years", False),
+    ("Ravi Kumar\nFresher\nTraining at Teleperformance", False),
+    ("Ravi Kumar\nB.Com 2021\nCollections agent at iQor", False),
+])
+def test_fresher_short_circuit(text, is_fresher):
+    reason = find_fresher_reason(text)
+    assert (reason is not None) == is_fresher
+    if is_fresher:
+        verdict = rule_based_verdict(extract_contact_fields(text), reason)
+        assert verdict["category"] == "unsuitable"
+        assert verdict["special_remarks"] == "other_state"
+        assert verdict["name"] == "Ravi Kumar"
@@ -0,0 +1,53 @@
+import time
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from supabase_writer import BulkApplicantWriter
+
+
+class SlowTable:
+    """Records bulk upserts; each one waits until `release` is set"""
+
+    def __init__(self):
+        self.upserts = []
+        self.release = threading.Event()
+
+    def table(self, name):
+        return self
+
+    def upsert(self, rows, on_conflict):
+        def execute():
+            self.release.wait(5)
+            self.upserts.append(rows)
+            return SimpleNamespace(data=rows)
+        return SimpleNamespace(execute=execute)
+
+
+def test_add_does_not_wait_for_the_flush_it_triggers():
+    supabase = SlowTable()
+    writer = BulkApplicantWriter(supabase, "run", flush_rows=2, flush_seconds=60)
+    started = time.monotonic()
+    futures = [writer.add({"content_hash": f"h{i}"}) for i in range(4)]
+    assert time.monotonic() - started < 0.5
+    assert not any(future.done() for future in futures)
+
+    supabase.release.set()
+    for future in futures:
+        future.result(timeout=5)
+    writer.close()
+    assert sum(len(rows) for rows in supabase.upserts) == 4
+    assert all(row["run_id"] == "run" for rows in supabase.upserts for row in rows)
+
+
+def test_close_flushes_the_remaining_rows_and_keeps_the_last_row_per_key():
+    supabase = SlowTable()
+    supabase.release.set()
+    with BulkApplicantWriter(supabase, "run", flush_rows=100, flush_seconds=60) as writer:
+        first = writer.add({"content_hash": "h", "name": "old"})
+        second = writer.add({"content_hash": "h", "name": "new"})
+    assert first.done() and second.done()
+    assert supabase.upserts == [[{"content_hash": "h", "name": "new", "run_id": "run"}]]
+    with pytest.raises(RuntimeError):
+        writer.add({"content_hash": "h2"})
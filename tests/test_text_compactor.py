@@ -0,0 +1,36 @@
+from text_compactor import compact_resume_text, count_tokens, normalize_markdown
+
+RESUME = "\n".join(
+    ["Ravi Kumar", "+91 98765 43210", "ravi.kumar@example.com", "Pune, Maharashtra", "Date of birth: 1990",
+     "Gender: Male", "Marital status: Single", "Languages: Marathi, Hindi"]
+    + ["EXPERIENCE"] + [f"Sales executive at Company {i}, handled {i} dealer accounts across the region" for i in range(40)]
+    + ["SKILLS"] + [f"Skill number {i} with a long description of the tools used" for i in range(40)]
+    + ["HOBBIES", "Native place: Nashik district"] + [f"Hobby {i} that nobody asked about at length" for i in range(80)]
+)
+
+
+def test_markdown_noise_and_repeated_boilerplate_are_removed():
+    text = "# Name\n![photo](x.png)\n| a | b |\n|---|---|\n<b>bold</b>\nPage 1 of 2\n" + "Confidential resume footer line\n" * 3
+    assert normalize_markdown(text) == "# Name\n\na | b\nbold\nConfidential resume footer line"
+
+
+def test_text_within_budget_is_only_normalized():
+    assert compact_resume_text("Ravi\n\n\n\nSales", token_budget=100) == "Ravi\n\nSales"
+    assert compact_resume_text(RESUME, token_budget=0) == normalize_markdown(RESUME)
+
+
+def test_compacted_text_fits_the_budget():
+    for budget in (100, 300, 600):
+        compacted = compact_resume_text(RESUME, token_budget=budget)
+        # Lines are counted one by one, so the joined text may differ from the budget by a few tokens
+        assert count_tokens(compacted) <= budget * 1.05 + 5
+        assert count_tokens(compacted) < count_tokens(RESUME)
+
+
+def test_header_experience_and_contact_lines_are_kept_first():
+    compacted = compact_resume_text(RESUME, token_budget=600)
+    assert compacted.startswith("Ravi Kumar\n+91 98765 43210\nravi.kumar@example.com")
+    assert "Company 0," in compacted
+    assert "Native place: Nashik district" in compacted
+    assert "Hobby 79" not in compacted
+    assert "[...]" in compacted
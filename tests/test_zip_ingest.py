@@ -0,0 +1,75 @@
+import io
+import time
+import zipfile
+import threading
+
+import pytest
+
+from zip_ingest import MemoryBudget, ZipLimitError, check_archive, check_member, read_member
+
+
+def make_zip(members, compression=zipfile.ZIP_DEFLATED):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", compression) as zip_ref:
+        for name, data in members.items():
+            zip_ref.writestr(name, data)
+    buffer.seek(0)
+    return zipfile.ZipFile(buffer)
+
+
+def test_archive_member_count_and_total_size_limits():
+    zip_ref = make_zip({f"resume_{i}.pdf": b"x" * 100 for i in range(3)})
+    check_archive(zip_ref, max_members=3, max_total_bytes=300)
+    with pytest.raises(ZipLimitError, match="3 members"):
+        check_archive(zip_ref, max_members=2)
+    with pytest.raises(ZipLimitError, match="expands to"):
+        check_archive(zip_ref, max_total_bytes=299)
+
+
+def test_member_size_limit():
+    info = make_zip({"resume.pdf": b"x" * 1000}).getinfo("resume.pdf")
+    check_member(info, max_file_bytes=1000)
+    with pytest.raises(ZipLimitError, match="resume.pdf"):
+        check_member(info, max_file_bytes=999)
+
+
+def test_compression_ratio_is_only_checked_from_64_kb():
+    zip_ref = make_zip({"small.docx": b"\0" * 60 * 1024, "bomb.pdf": b"\0" * 1024 * 1024})
+    check_member(zip_ref.getinfo("small.docx"), max_compression_ratio=10)
+    with pytest.raises(ZipLimitError, match="compression ratio"):
+        check_member(zip_ref.getinfo("bomb.pdf"), max_compression_ratio=10)
+
+
+def test_read_member_stops_once_past_the_limit(monkeypatch):
+    monkeypatch.setattr("zip_ingest.CHUNK_SIZE", 1024)
+    zip_ref = make_zip({"resume.pdf": b"x" * 5000})
+    info = zip_ref.getinfo("resume.pdf")
+    assert read_member(zip_ref, info, max_file_bytes=5000) == b"x" * 5000
+    with pytest.raises(ZipLimitError, match="decompresses past"):
+        read_member(zip_ref, info, max_file_bytes=4000)
+
+
+def test_memory_budget_rejects_files_larger_than_the_budget():
+    budget = MemoryBudget(max_bytes=100)
+    with pytest.raises(ZipLimitError, match="in-flight memory budget"):
+        budget.acquire(101)
+    assert budget.reserved == 0
+    with budget.reserve(100):
+        assert budget.reserved == 100
+    assert budget.reserved == 0
+
+
+def test_memory_budget_blocks_until_bytes_are_released():
+    budget = MemoryBudget(max_bytes=100, rss_poll_seconds=0.01)
+    budget.acquire(60)
+    admitted = threading.Event()
+    thread = threading.Thread(target=lambda: (budget.acquire(60), admitted.set()))
+    thread.start()
+
+    time.sleep(0.05)
+    assert not admitted.is_set()
+    budget.release(60)
+    assert admitted.wait(2)
+    thread.join(timeout=2)
+    assert budget.reserved == 60
+    assert budget.peak_reserved == 60
@@ -0,0 +1,135 @@
+import re
+
+# tiktoken is optional: without it tokens are estimated at ~4 characters per token
+try:
+    import tiktoken
+    _ENCODING = tiktoken.get_encoding("o200k_base")
+except Exception:
+    _ENCODING = None
+
+# Tokens of resume text sent to the LLMs
+DEFAULT_TOKEN_BUDGET = 3000
+
+# Lines of the resume header (name, phone, email, address) that always keep the highest priority
+HEADER_LINES = 8
+
+# Duplicate lines at least this long are boilerplate (page headers/footers, repeated summaries)
+MIN_DUPLICATE_LINE_CHARS = 30
+
+# Section headings by priority: contact and location, then experience and companies, then the rest
+SECTION_PRIORITIES = (
+    (0, re.compile(r"contact|personal|address|location|permanent|correspondence|native|domicile", re.I)),
+    (1, re.compile(r"experience|employment|work|career|professional|internship|employer|compan", re.I)),
+    (2, re.compile(r"summary|objective|profile|about", re.I)),
+    (3, re.compile(r"skill|education|qualification|language|academic", re.I)),
+)
+DEFAULT_SECTION_PRIORITY = 4
+
+# Lines kept from any section that doesn't fit whole: phone numbers, emails and locations
+CONTACT_LINE_PATTERN = re.compile(
+    r"[\w.+-]+@[\w-]+\.[\w.]+|\+?\d[\d\s()-]{8,}\d|\b(address|location|city|state|district|village|hometown|native)\b",
+    re.I
+)
+
+IMAGE_PATTERN = re.compile(r"!\[[^\]]*\]\([^)]*\)")
+HTML_TAG_PATTERN = re.compile(r"</?[a-zA-Z][^>]*>")
+TABLE_SEPARATOR_PATTERN = re.compile(r"^\|?\s*:?-{3,}:?\s*(\|\s*:?-{3,}:?\s*)*\|?$")
+PAGE_MARKER_PATTERN = re.compile(r"^(page\s+\d+(\s+of\s+\d+)?|-{3,}|\*{3,}|_{3,})$", re.I)
+HEADING_PATTERN = re.compile(r"^(#{1,6}\s+.+|\*\*[^*]{2,60}\*\*:?|[A-Z][A-Z &/-]{2,40}:?|[A-Za-z][A-Za-z &/-]{2,40}:)$")
+
+
+def count_tokens(text):
+    """Token count of `text`, exact with tiktoken installed, otherwise estimated"""
+    if _ENCODING is not None:
+        return len(_ENCODING.encode(text, disallowed_special=()))
+    return len(text) // 4 + 1
+
+
+def normalize_markdown(text):
+    """Strip markdown noise and boilerplate from parsed resume text.
+
+    Removes images, HTML tags, table rules and page markers, flattens table rows, collapses whitespace and
+    drops repeated boilerplate lines and blank runs.
+    """
+    lines = []
+    seen = set()
+    for line in text.splitlines():
+        line = HTML_TAG_PATTERN.sub(" ", IMAGE_PATTERN.sub("", line))
+        line = line.strip()
+        if TABLE_SEPARATOR_PATTERN.match(line) or PAGE_MARKER_PATTERN.match(line):
+            continue
+        if line.startswith("|"):
+            cells = [cell.strip() for cell in line.strip("|").split("|")]
+            line = " | ".join(cell for cell in cells if cell)
+        line = re.sub(r"[ \t\u00a0]+", " ", line)
+
+        key = line.lower()
+        if key and lines and key == lines[-1].lower():
+            continue
+        if len(key) >= MIN_DUPLICATE_LINE_CHARS:
+            if key in seen:
+                continue
+            seen.add(key)
+        if not line and (not lines or not lines[-1]):
+            continue
+        lines.append(line)
+    return "\n".join(lines).strip()
+
+
+def split_sections(text):
+    """Split normalized text into [heading, lines] sections; the resume header is the first section"""
+    sections = [["", []]]
+    for i, line in enumerate(text.splitlines()):
+        if i >= HEADER_LINES and HEADING_PATTERN.match(line):
+            sections.append([line, [line]])
+        else:
+            sections[-1][1].append(line)
+    return sections
+
+
+def section_priority(heading):
+    if not heading:
+        return 0
+    for priority, pattern in SECTION_PRIORITIES:
+        if pattern.search(heading):
+            return priority
+    return DEFAULT_SECTION_PRIORITY
+
+
+def compact_resume_text(text, token_budget=DEFAULT_TOKEN_BUDGET):
+    """Normalize resume text and fit it into `token_budget` tokens.
+
+    Whole sections are kept by priority (header and contact, experience, summary, skills and education,
+    the rest). Sections that don't fit keep their contact/location lines, then as many lines as still
+    fit. Kept text stays in its original order; a budget of 0 only normalizes.
+    """
+    normalized = normalize_markdown(text)
+    if not token_budget or count_tokens(normalized) <= token_budget:
+        return normalized
+
+    sections = split_sections(normalized)
+    kept = [None] * len(sections)
+    remaining = token_budget
+    by_priority = sorted(range(len(sections)), key=lambda i: (section_priority(sections[i][0]), i))
+
+    for i in by_priority:
+        section_tokens = count_tokens("\n".join(sections[i][1]))
+        if section_tokens <= remaining:
+            kept[i] = sections[i][1]
+            remaining -= section_tokens
+
+    for i in by_priority:
+        if kept[i] is not None:
+            continue
+        lines = sections[i][1]
+        contact_lines = [n for n, line in enumerate(lines) if CONTACT_LINE_PATTERN.search(line)]
+        candidates = contact_lines + sorted(set(range(len(lines))) - set(contact_lines))
+        chosen = set()
+        for n in candidates:
+            line_tokens = count_tokens(lines[n]) + 1
+            if line_tokens <= remaining:
+                chosen.add(n)
+                remaining -= line_tokens
+        kept[i] = [lines[n] for n in sorted(chosen)] + ["[...]"] if chosen else []
+
+    return "\n".join(line for lines in kept for line in lines).strip()
@@ -0,0 +1,174 @@
+import os
+import sys
+import threading
+from contextlib import contextmanager
+
+# resource is POSIX-only; peak RSS falls back to the sampled value without it
+try:
+    import resource
+except ImportError:
+    resource = None
+
+# Default ingestion limits
+DEFAULT_MAX_FILE_BYTES = 25 * 1024 * 1024
+DEFAULT_MAX_TOTAL_BYTES = 10 * 1024 * 1024 * 1024
+DEFAULT_MAX_MEMBERS = 50000
+DEFAULT_MAX_COMPRESSION_RATIO = 200
+
+# Resume bytes held in memory across all in-flight files
+DEFAULT_IN_FLIGHT_BYTES = 256 * 1024 * 1024
+
+CHUNK_SIZE = 1024 * 1024
+
+# Members smaller than this skip the compression ratio check: tiny files can compress very well legitimately
+MIN_RATIO_CHECK_BYTES = 64 * 1024
+
+
+class ZipLimitError(ValueError):
+    """Raised when an archive or one of its members exceeds the ingestion limits"""
+
+
+def check_archive(zip_ref, max_members=DEFAULT_MAX_MEMBERS, max_total_bytes=DEFAULT_MAX_TOTAL_BYTES):
+    """Reject an archive whose member count or declared uncompressed size is over the limits"""
+    infos = zip_ref.infolist()
+    if len(infos) > max_members:
+        raise ZipLimitError(f"ZIP has {len(infos)} members, the limit is {max_members}")
+    total_bytes = sum(info.file_size for info in infos)
+    if total_bytes > max_total_bytes:
+        raise ZipLimitError(
+            f"ZIP expands to {total_bytes / (1024 * 1024):.0f} MB, the limit is {max_total_bytes / (1024 * 1024):.0f} MB"
+        )
+
+
+def check_member(info, max_file_bytes=DEFAULT_MAX_FILE_BYTES, max_compression_ratio=DEFAULT_MAX_COMPRESSION_RATIO):
+    """Raise ZipLimitError if a member is too large or compressed suspiciously well (a zip bomb)"""
+    if info.file_size > max_file_bytes:
+        raise ZipLimitError(
+            f"{info.filename} is {info.file_size / (1024 * 1024):.1f} MB, the limit is {max_file_bytes / (1024 * 1024):.0f} MB"
+        )
+    if info.file_size > MIN_RATIO_CHECK_BYTES and info.file_size / max(info.compress_size, 1) > max_compression_ratio:
+        raise ZipLimitError(f"{info.filename} has a compression ratio above {max_compression_ratio}:1")
+
+
+def read_member(zip_ref, info, max_file_bytes=DEFAULT_MAX_FILE_BYTES):
+    """Read one member in chunks, stopping as soon as it decompresses past `max_file_bytes`.
+
+    The declared size in the ZIP headers is not trusted: a forged header can't make this read more.
+    """
+    chunks = []
+    size = 0
+    with zip_ref.open(info) as member:
+        for chunk in iter(lambda: member.read(CHUNK_SIZE), b""):
+            size += len(chunk)
+            if size > max_file_bytes:
+                raise ZipLimitError(f"{info.filename} decompresses past {max_file_bytes / (1024 * 1024):.0f} MB")
+            chunks.append(chunk)
+    return b"".join(chunks)
+
+
+def current_rss_bytes():
+    """Resident set size of this process, or None where /proc is not available"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def peak_rss_bytes():
+    """Peak resident set size of this process since it started"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class MemoryBudget:
+    """Admission control for the file bytes a job holds in memory.
+
+    `reserve(nbytes)` blocks while the reserved bytes would exceed `max_bytes`, or while the process RSS is
+    above `max_rss_bytes`. A file larger than `max_bytes` is rejected with ZipLimitError, so the budget is a
+    hard cap. A file is admitted when nothing else is reserved even if RSS is above its cap, since nothing
+    would free memory to let it in. The peak reserved bytes, the peak sampled RSS and the number of polls
+    spent waiting on the RSS cap are kept for the run report.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_IN_FLIGHT_BYTES, max_rss_bytes=None, rss_poll_seconds=0.5):
+        self.max_bytes = max_bytes
+        self.max_rss_bytes = max_rss_bytes
+        self.rss_poll_seconds = rss_poll_seconds
+        self.reserved = 0
+        self.peak_reserved = 0
+        self.peak_rss = current_rss_bytes() or 0
+        self.rss_waits = 0
+        self._condition = threading.Condition()
+
+    def _sample_rss(self):
+        rss = current_rss_bytes()
+        if rss is not None:
+            self.peak_rss = max(self.peak_rss, rss)
+        return rss
+
+    def _over_rss_cap(self):
+        rss = self._sample_rss()
+        return self.max_rss_bytes is not None and rss is not None and rss > self.max_rss_bytes
+
+    def acquire(self, nbytes):
+        if nbytes > self.max_bytes:
+            raise ZipLimitError(
+                f"File of {nbytes / (1024 * 1024):.1f} MB is larger than the in-flight memory budget of "
+                f"{self.max_bytes / (1024 * 1024):.0f} MB"
+            )
+        with self._condition:
+            while self.reserved:
+                over_budget = self.reserved + nbytes > self.max_bytes
+                over_rss = self._over_rss_cap()
+                if not over_budget and not over_rss:
+                    break
+                if over_rss:
+                    self.rss_waits += 1
+                # Wake up periodically as well, RSS can drop without anyone releasing
+                self._condition.wait(self.rss_poll_seconds)
+            self.reserved += nbytes
+            self.peak_reserved = max(self.peak_reserved, self.reserved)
+            self._sample_rss()
+
+    def release(self, nbytes):
+        with self._condition:
+            self.reserved -= nbytes
+            self._condition.notify_all()
+
+    @contextmanager
+    def reserve(self, nbytes):
+        self.acquire(nbytes)
+        try:
+            yield
+        finally:
+            self.release(nbytes)
+
+    def release_when_done(self, nbytes, *futures):
+        """Release `nbytes` once every future has finished"""
+        remaining = [len(futures)]
+        lock = threading.Lock()
+
+        def on_done(future):
+            with lock:
+                remaining[0] -= 1
+                if remaining[0]:
+                    return
+            self.release(nbytes)
+
+        for future in futures:
+            future.add_done_callback(on_done)
+
+    def report(self):
+        """Memory figures of the run, in MB"""
+        self._sample_rss()
+        process_peak = peak_rss_bytes()
+        return {
+            "peak_rss_mb": round(self.peak_rss / (1024 * 1024), 1),
+            "process_peak_rss_mb": round(process_peak / (1024 * 1024), 1) if process_peak else None,
+            "peak_in_flight_mb": round(self.peak_reserved / (1024 * 1024), 1),
+            "rss_cap_waits": self.rss_waits,
+        }